@@ -0,0 +1,249 @@
+"""Stream a JSONL file of tickets through a process pool of triage agents.
+
+Usage::
+
+    python -m agent.bulk tickets.jsonl results.jsonl --workers 8 --resume
+
+Each input line is a JSON object whose ``--field`` (default ``description``)
+holds the ticket text; an optional ``id`` is copied to the output. Results
+are written in input order, and a checkpoint recording the input and output
+byte offsets is refreshed as chunks complete so an interrupted run can
+continue with ``--resume`` without duplicating output.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WORKER_AGENT = None
+
+Chunk = List[Tuple[int, bytes]]
+
+
+# ---------------------------------------------------------------------- #
+# Worker side
+# ---------------------------------------------------------------------- #
+def _init_worker() -> None:
+    """Build one TriageAgent per worker process."""
+    global _WORKER_AGENT
+    from app.config import get_settings
+    from app.factory import build_agent
+
+    _WORKER_AGENT = build_agent(get_settings())
+
+
+def _triage_chunk(chunk: Chunk, field: str) -> List[Tuple[str, bool]]:
+    """Triage a chunk of raw lines, returning (serialized record, is_error) pairs."""
+    assert _WORKER_AGENT is not None, "worker not initialised"
+    records: List[Tuple[str, bool]] = []
+    for line_no, raw in chunk:
+        record: Dict[str, object] = {"line": line_no, "id": None, "result": None, "error": None}
+        try:
+            ticket = json.loads(raw)
+            if isinstance(ticket, dict):
+                record["id"] = ticket.get("id")
+                description = ticket.get(field)
+            else:
+                description = ticket
+            if not isinstance(description, str):
+                raise ValueError(f"Missing string field '{field}'")
+            record["result"] = _WORKER_AGENT.triage(description)
+        except ValueError as exc:  # includes json.JSONDecodeError
+            record["error"] = str(exc)
+        except Exception:  # noqa: BLE001 - one bad line must not stop the run
+            logger.exception("Bulk triage failed for line %s", line_no)
+            record["error"] = "Triage failed"
+        records.append((json.dumps(record, ensure_ascii=False), record["error"] is not None))
+    return records
+
+
+# ---------------------------------------------------------------------- #
+# Driver side
+# ---------------------------------------------------------------------- #
+def _read_chunks(fh: BinaryIO, start_line: int, chunk_size: int) -> Iterator[Tuple[Chunk, int, int]]:
+    """Yield (chunk, end_offset, next_line) tuples, reading one line at a time."""
+    offset = fh.tell()
+    line_no = start_line
+    chunk: Chunk = []
+    pending = False
+    for raw in fh:
+        offset += len(raw)
+        line_no += 1
+        pending = True
+        if raw.strip():
+            chunk.append((line_no, raw))
+        if len(chunk) >= chunk_size:
+            yield chunk, offset, line_no
+            chunk = []
+            pending = False
+    if pending:
+        # Trailing lines (possibly all blank) still advance the checkpoint.
+        yield chunk, offset, line_no
+
+
+def _load_checkpoint(path: Path) -> Dict[str, int]:
+    with path.open("r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _write_checkpoint(path: Path, state: Dict[str, int]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        json.dump(state, fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+class _Progress:
+    def __init__(self, stream, interval: float) -> None:
+        self.stream = stream
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.processed = 0
+        self.errors = 0
+
+    def add(self, processed: int, errors: int) -> None:
+        self.processed += processed
+        self.errors += errors
+        now = time.perf_counter()
+        if self.interval > 0 and now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report("progress")
+
+    def report(self, label: str) -> None:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        print(
+            f"[{label}] processed={self.processed} errors={self.errors} "
+            f"elapsed={elapsed:.1f}s rate={self.processed / elapsed:.1f} tickets/s",
+            file=self.stream,
+            flush=True,
+        )
+
+
+def run(
+    input_path: Path,
+    output_path: Path,
+    workers: int = 0,
+    field: str = "description",
+    chunk_size: int = 64,
+    window: int = 0,
+    checkpoint_path: Optional[Path] = None,
+    checkpoint_every: int = 1,
+    resume: bool = False,
+    stats_interval: float = 5.0,
+    stats_stream=None,
+) -> Dict[str, int]:
+    """Triage ``input_path`` into ``output_path`` and return final counters."""
+    workers = workers or os.cpu_count() or 1
+    window = window or workers * 4
+    checkpoint_path = checkpoint_path or output_path.with_name(output_path.name + ".checkpoint")
+    fresh = {"input_offset": 0, "output_offset": 0, "line": 0, "processed": 0, "errors": 0}
+    state = dict(fresh)
+    if resume and checkpoint_path.exists():
+        state.update(_load_checkpoint(checkpoint_path))
+        written = output_path.stat().st_size if output_path.exists() else 0
+        if written < state["output_offset"]:
+            # The results the checkpoint vouches for are gone; seeking past the
+            # end would pad the file with NULs, so start over instead.
+            logger.warning(
+                "Output %s is shorter than its checkpoint (%s < %s bytes); restarting from line 0",
+                output_path,
+                written,
+                state["output_offset"],
+            )
+            state = dict(fresh)
+        else:
+            logger.info("Resuming bulk triage from line %s", state["line"])
+
+    progress = _Progress(stats_stream or sys.stderr, stats_interval)
+    in_flight: Deque[Tuple["Future[List[Tuple[str, bool]]]", int, int]] = deque()
+    chunks_since_checkpoint = 0
+
+    mode = "r+b" if resume and output_path.exists() else "wb"
+    with input_path.open("rb") as src, output_path.open(mode) as dst, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker
+    ) as pool:
+        src.seek(state["input_offset"])
+        # Drop anything written after the last checkpoint so no result is duplicated.
+        dst.seek(state["output_offset"])
+        dst.truncate()
+
+        def drain_one() -> None:
+            nonlocal chunks_since_checkpoint
+            future, end_offset, next_line = in_flight.popleft()
+            records = future.result()
+            errors = 0
+            for payload, is_error in records:
+                dst.write(payload.encode("utf-8") + b"\n")
+                errors += is_error
+            state["input_offset"] = end_offset
+            state["line"] = next_line
+            state["processed"] += len(records)
+            state["errors"] += errors
+            progress.add(len(records), errors)
+            chunks_since_checkpoint += 1
+            if chunks_since_checkpoint >= checkpoint_every:
+                dst.flush()
+                os.fsync(dst.fileno())
+                state["output_offset"] = dst.tell()
+                _write_checkpoint(checkpoint_path, state)
+                chunks_since_checkpoint = 0
+
+        for chunk, end_offset, next_line in _read_chunks(src, state["line"], chunk_size):
+            in_flight.append((pool.submit(_triage_chunk, chunk, field), end_offset, next_line))
+            if len(in_flight) >= window:
+                drain_one()
+        while in_flight:
+            drain_one()
+
+        dst.flush()
+        state["output_offset"] = dst.tell()
+        _write_checkpoint(checkpoint_path, state)
+
+    progress.report("done")
+    return state
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m agent.bulk", description=__doc__.split("\n\n")[0])
+    parser.add_argument("input", type=Path, help="JSONL file of tickets")
+    parser.add_argument("output", type=Path, help="JSONL file to write results to")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: CPU count)")
+    parser.add_argument("--field", default="description", help="JSON field holding the ticket text")
+    parser.add_argument("--chunk-size", type=int, default=64, help="lines sent to a worker per task")
+    parser.add_argument("--window", type=int, default=0, help="max chunks in flight (default: 4 x workers)")
+    parser.add_argument("--checkpoint", type=Path, default=None, help="checkpoint file (default: OUTPUT.checkpoint)")
+    parser.add_argument("--checkpoint-every", type=int, default=1, help="chunks between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint if present")
+    parser.add_argument("--stats-interval", type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    run(
+        args.input,
+        args.output,
+        workers=args.workers,
+        field=args.field,
+        chunk_size=args.chunk_size,
+        window=args.window,
+        checkpoint_path=args.checkpoint,
+        checkpoint_every=args.checkpoint_every,
+        resume=args.resume,
+        stats_interval=args.stats_interval,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
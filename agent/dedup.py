@@ -0,0 +1,131 @@
+import random
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from agent.metrics import REGISTRY
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+BandKey = Tuple[int, Tuple[int, ...]]
+# (expires_at, signature, band keys, triage result)
+_Entry = Tuple[float, Tuple[int, ...], List[BandKey], Dict[str, object]]
+
+DEDUP_LOOKUPS = REGISTRY.counter(
+    "triage_dedup_lookups_total",
+    "Near-duplicate index lookups by outcome.",
+    ("outcome",),
+)
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index over recently triaged tickets.
+
+    Each ticket's token set is reduced to a ``num_perm`` MinHash signature,
+    split into ``bands`` buckets for candidate retrieval. A candidate is a
+    near-duplicate when the estimated Jaccard similarity (the share of equal
+    signature slots) reaches ``threshold``. Entries expire after
+    ``ttl_seconds`` and the oldest are evicted beyond ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 64,
+        bands: int = 16,
+        ttl_seconds: float = 600.0,
+        max_entries: int = 10000,
+        seed: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # Insertion order == age, so expiry and eviction pop from the front.
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: Dict[BandKey, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, tokens: Iterable[str]) -> Tuple[int, ...]:
+        # crc32 rather than hash(): stable across processes and restarts.
+        hashes = [zlib.crc32(token.encode("utf-8")) for token in tokens]
+        if not hashes:
+            return ()
+        return tuple(
+            min((a * value + b) % _MERSENNE_PRIME for value in hashes) for a, b in self._permutations
+        )
+
+    def find(self, tokens: Iterable[str]) -> Optional[Dict[str, object]]:
+        """Return the stored result of the closest live near-duplicate, if any."""
+        signature = self.signature(tokens)
+        if not signature:
+            return None
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            best: Optional[Dict[str, object]] = None
+            best_score = 0.0
+            candidates: Set[int] = set()
+            for key in self._band_keys(signature):
+                candidates |= self._buckets.get(key, set())
+            for entry_id in candidates:
+                _, stored, _, result = self._entries[entry_id]
+                score = sum(1 for left, right in zip(signature, stored) if left == right) / self.num_perm
+                if score >= self.threshold and score > best_score:
+                    best, best_score = result, score
+        DEDUP_LOOKUPS.inc(outcome="hit" if best is not None else "miss")
+        return best
+
+    def add(self, tokens: Iterable[str], result: Dict[str, object]) -> None:
+        signature = self.signature(tokens)
+        if not signature:
+            return
+        now = self._clock()
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            self._expire(now)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (now + self.ttl_seconds, signature, band_keys, result)
+            for key in band_keys:
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[BandKey]:
+        return [(band, signature[band * self.rows : (band + 1) * self.rows]) for band in range(self.bands)]
+
+    def _expire(self, now: float) -> None:
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest[0] > now:
+                break
+            self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        entry_id, (_, _, band_keys, _) = self._entries.popitem(last=False)
+        for key in band_keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
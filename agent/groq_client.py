@@ -1,11 +1,19 @@
+import asyncio
 import json
 import logging
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional
 
+from agent.metrics import GROQ_CALL_SECONDS, GROQ_FALLBACKS
+from agent.resilience import OPEN, CircuitBreaker, CircuitOpenError, hedged_call, hedged_call_async
+from agent.response_cache import ResponseCache, normalize_description
 from agent.rules_classifier import RulesClassifier
+from agent.scheduler import GroqScheduler, RateLimitedError
 
 _ALLOWED_CATEGORIES = {"Billing", "Login", "Performance", "Bug", "Question", "Other"}
 _ALLOWED_SEVERITIES = {"Low", "Medium", "High", "Critical"}
+# Bump whenever a prompt changes so cached responses from the old wording miss.
+_PROMPT_VERSION = "1"
 _CLASSIFICATION_PROMPT = (
     "You are a support operations classifier. Extract structured JSON exactly as:\n"
     '{"summary": "...", "category": "...", "severity": "..."}\n'
@@ -13,6 +21,15 @@ _CLASSIFICATION_PROMPT = (
     "Valid severity: Low | Medium | High | Critical\n"
     "Make sure your response is only valid JSON with no extra words."
 )
+_FUSED_PROMPT = (
+    "You are a senior support engineer triaging a ticket. Using the ticket and the KB context, return JSON "
+    "exactly as:\n"
+    '{"summary": "...", "category": "...", "severity": "...", "next_step": "..."}\n'
+    "Valid category: Billing | Login | Performance | Bug | Question | Other\n"
+    "Valid severity: Low | Medium | High | Critical\n"
+    "next_step is 1-2 short actionable sentences focused on revenue, service continuity and user impact.\n"
+    "Make sure your response is only valid JSON with no extra words."
+)
 _NEXT_ACTION_PROMPT = (
     "You are a senior support engineer. In 1-2 short actionable sentences, advise what the support agent "
     "should do next based on issue severity, category and KB context. Focus on revenue, service continuity, "
@@ -28,23 +45,48 @@ class GroqAssistant:
         provider: str = "mock",
         api_key: Optional[str] = None,
         match_threshold: float = 0.35,
+        cache: Optional[ResponseCache] = None,
+        timeout: float = 10.0,
+        hedge_delay: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        base_url: Optional[str] = None,
+        fused: bool = False,
+        scheduler: Optional[GroqScheduler] = None,
     ) -> None:
         self.provider = (provider or "mock").lower()
         self.api_key = api_key
         self.logger = logging.getLogger(__name__)
         self.rules_fallback = RulesClassifier()
         self._client = None
+        self._async_client = None
         self._model = "llama3-8b-8192"
         self.match_threshold = match_threshold
+        self.cache = cache
+        # Latency budget per logical call (both hedged attempts share it).
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        self.breaker = breaker
+        # Fused mode asks for classification and next step in one completion.
+        self.fused = fused
+        # Severity-ordered admission under the Groq rate limits.
+        self.scheduler = scheduler
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
 
         if self.provider == "groq":
             if not api_key:
                 raise ValueError("GROQ_API_KEY must be set when LLM_PROVIDER=groq")
             try:
-                from groq import Groq
+                from groq import AsyncGroq, Groq
             except ImportError as exc:  # pragma: no cover - import guard
                 raise ImportError("groq package is required for Groq mode") from exc
-            self._client = Groq(api_key=api_key)
+            # Retries are disabled in the SDK: the latency budget, hedging and
+            # the circuit breaker below decide when to try again.
+            self._client = Groq(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+            # AsyncGroq keeps its own httpx connection pool, so in-flight
+            # calls on the async path do not tie up threadpool workers.
+            self._async_client = AsyncGroq(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+            if hedge_delay is not None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="groq-hedge")
 
     # ---------------------------------------------------------------------
     # Public API
@@ -58,26 +100,20 @@ class GroqAssistant:
         if self.provider != "groq":
             return self.rules_fallback.classify(text)
 
+        cache_key = self._cache_key("classify", text)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
         try:
-            completion = self._client.chat.completions.create(  # type: ignore[union-attr]
-                model=self._model,
-                messages=[
-                    {"role": "system", "content": _CLASSIFICATION_PROMPT},
-                    {"role": "user", "content": text},
-                ],
-                temperature=0.1,
-                response_format={"type": "json_object"},
-            )
-            payload = completion.choices[0].message.content
-            parsed = json.loads(payload)
+            content = self._request_completion("classify", self._classification_request(text), self._priority(text))
+            result = self._parse_classification(content, text)
         except Exception as exc:  # noqa: BLE001 - log + fallback is intentional
+            GROQ_FALLBACKS.inc(operation="classify")
             self.logger.warning("Groq classification failed; falling back to heuristics: %s", exc)
             return self.rules_fallback.classify(text)
-
-        summary = self._trim_summary(parsed.get("summary") or text)
-        category = self._normalize_category(parsed.get("category"))
-        severity = self._normalize_severity(parsed.get("severity"))
-        return {"summary": summary, "category": category, "severity": severity}
+        self._cache_set(cache_key, result)
+        return dict(result)
 
     def suggest_next_action(
         self,
@@ -90,35 +126,427 @@ class GroqAssistant:
         if self.provider != "groq":
             return self._rule_based_action(related_issues, severity)
 
-        kb_context = self._render_kb_context(related_issues)
+        cache_key = self._cache_key(
+            "next_action", description, category, severity, self._render_kb_context(related_issues)
+        )
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return str(cached)
+
         try:
-            completion = self._client.chat.completions.create(  # type: ignore[union-attr]
-                model=self._model,
-                messages=[
-                    {"role": "system", "content": _NEXT_ACTION_PROMPT},
-                    {
-                        "role": "user",
-                        "content": (
-                            f"Description: {description}\n"
-                            f"Category: {category}\n"
-                            f"Severity: {severity}\n"
-                            f"{kb_context}\n"
-                            "Respond with 1-2 short actionable sentences."
-                        ),
-                    },
-                ],
-                temperature=0.5,
-                max_tokens=150,
+            content = self._request_completion(
+                "next_action", self._next_action_request(description, category, severity, related_issues), severity
             )
-            content = completion.choices[0].message.content.strip()
-            return content.strip('"').strip("'").strip()[:200]
+            action = self.clean_next_action(content)
         except Exception as exc:  # noqa: BLE001
+            GROQ_FALLBACKS.inc(operation="next_action")
             self.logger.warning("Groq next-action failed; reverting to rules: %s", exc)
             return self._rule_based_action(related_issues, severity)
+        self._cache_set(cache_key, action)
+        return action
+
+    async def classify_ticket_async(self, description: str) -> Dict[str, str]:
+        """Async counterpart of ``classify_ticket`` on the pooled async client."""
+        text = description.strip()
+        if not text:
+            raise ValueError("Description cannot be empty")
+
+        if self.provider != "groq":
+            return self.rules_fallback.classify(text)
+
+        cache_key = self._cache_key("classify", text)
+        cached = await self._cache_aget(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        try:
+            content = await self._request_completion_async(
+                "classify", self._classification_request(text), self._priority(text)
+            )
+            result = self._parse_classification(content, text)
+        except Exception as exc:  # noqa: BLE001 - log + fallback is intentional
+            GROQ_FALLBACKS.inc(operation="classify")
+            self.logger.warning("Groq classification failed; falling back to heuristics: %s", exc)
+            return self.rules_fallback.classify(text)
+        await self._cache_aset(cache_key, result)
+        return dict(result)
+
+    async def suggest_next_action_async(
+        self,
+        description: str,
+        category: str,
+        severity: str,
+        related_issues: List[Dict[str, object]],
+    ) -> str:
+        """Async counterpart of ``suggest_next_action``."""
+        if self.provider != "groq":
+            return self._rule_based_action(related_issues, severity)
+
+        cache_key = self._cache_key(
+            "next_action", description, category, severity, self._render_kb_context(related_issues)
+        )
+        cached = await self._cache_aget(cache_key)
+        if cached is not None:
+            return str(cached)
+
+        try:
+            content = await self._request_completion_async(
+                "next_action", self._next_action_request(description, category, severity, related_issues), severity
+            )
+            action = self.clean_next_action(content)
+        except Exception as exc:  # noqa: BLE001
+            GROQ_FALLBACKS.inc(operation="next_action")
+            self.logger.warning("Groq next-action failed; reverting to rules: %s", exc)
+            return self._rule_based_action(related_issues, severity)
+        await self._cache_aset(cache_key, action)
+        return action
+
+    async def stream_next_action_async(
+        self,
+        description: str,
+        category: str,
+        severity: str,
+        related_issues: List[Dict[str, object]],
+    ) -> AsyncIterator[str]:
+        """Yield the next step as text deltas from Groq's streaming completions.
+
+        Cache hits and rules fallbacks are yielded as a single delta. A stream
+        that fails before its first token falls back to the rules; one that
+        fails midway ends early with what it already produced.
+        """
+        if self.provider != "groq":
+            yield self._rule_based_action(related_issues, severity)
+            return
+
+        cache_key = self._cache_key(
+            "next_action", description, category, severity, self._render_kb_context(related_issues)
+        )
+        cached = await self._cache_aget(cache_key)
+        if cached is not None:
+            yield str(cached)
+            return
+
+        parts: List[str] = []
+        admitted = False
+        try:
+            request = self._next_action_request(description, category, severity, related_issues)
+            await self._admit_async("next_action_stream", request, severity)
+            self._check_breaker("next_action_stream")
+            admitted = True
+            with GROQ_CALL_SECONDS.time(operation="next_action_stream"):
+                stream = await self._async_client.chat.completions.create(  # type: ignore[union-attr]
+                    **request, stream=True, timeout=self.timeout
+                )
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+        except Exception as exc:  # noqa: BLE001 - log + fallback is intentional
+            if not isinstance(exc, (CircuitOpenError, RateLimitedError)):
+                self._record_outcome(success=False)
+            GROQ_FALLBACKS.inc(operation="next_action_stream")
+            self.logger.warning("Groq next-action stream failed: %s", exc)
+            if not parts:
+                yield self._rule_based_action(related_issues, severity)
+            return
+        except BaseException:
+            # Cancelled, or closed by a consumer that stopped reading (GeneratorExit).
+            if admitted:
+                self._release_breaker()
+            raise
+        self._record_outcome(success=True)
+        action = self.clean_next_action("".join(parts))
+        if action:
+            await self._cache_aset(cache_key, action)
+        else:
+            yield self._rule_based_action(related_issues, severity)
+
+    def triage_fused(self, description: str, related_issues: List[Dict[str, object]]) -> Dict[str, str]:
+        """Return summary/category/severity/suggested_next_step from one Groq call.
+
+        Missing or unusable fields fall back to the rules engine individually.
+        """
+        text = description.strip()
+        if not text:
+            raise ValueError("Description cannot be empty")
+
+        if self.provider != "groq":
+            return self._fused_from_rules(text, related_issues)
+
+        cache_key = self._cache_key("fused", text, self._render_kb_context(related_issues))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        try:
+            content = self._request_completion("fused", self._fused_request(text, related_issues), self._priority(text))
+            result = self._parse_fused(content, text, related_issues)
+        except Exception as exc:  # noqa: BLE001 - log + fallback is intentional
+            GROQ_FALLBACKS.inc(operation="fused")
+            self.logger.warning("Groq fused triage failed; falling back to heuristics: %s", exc)
+            return self._fused_from_rules(text, related_issues)
+        self._cache_set(cache_key, result)
+        return dict(result)
+
+    async def triage_fused_async(
+        self, description: str, related_issues: List[Dict[str, object]]
+    ) -> Dict[str, str]:
+        """Async counterpart of ``triage_fused``."""
+        text = description.strip()
+        if not text:
+            raise ValueError("Description cannot be empty")
+
+        if self.provider != "groq":
+            return self._fused_from_rules(text, related_issues)
+
+        cache_key = self._cache_key("fused", text, self._render_kb_context(related_issues))
+        cached = await self._cache_aget(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        try:
+            content = await self._request_completion_async(
+                "fused", self._fused_request(text, related_issues), self._priority(text)
+            )
+            result = self._parse_fused(content, text, related_issues)
+        except Exception as exc:  # noqa: BLE001 - log + fallback is intentional
+            GROQ_FALLBACKS.inc(operation="fused")
+            self.logger.warning("Groq fused triage failed; falling back to heuristics: %s", exc)
+            return self._fused_from_rules(text, related_issues)
+        await self._cache_aset(cache_key, result)
+        return dict(result)
+
+    async def warm_up_async(self) -> bool:
+        """Open the pooled Groq connections before the first ticket needs them.
+
+        Issues one cheap ``models.list`` call per client so DNS, TCP and TLS
+        setup happen at startup. Failures are logged and reported as ``False``;
+        triage still works through the usual fallbacks.
+        """
+        if self.provider != "groq":
+            return True
+        try:
+            await self._async_client.models.list(timeout=self.timeout)  # type: ignore[union-attr]
+            await asyncio.to_thread(self._client.models.list, timeout=self.timeout)  # type: ignore[union-attr]
+        except Exception as exc:  # noqa: BLE001 - warm-up is best effort
+            self.logger.warning("Groq connection warm-up failed: %s", exc)
+            return False
+        return True
+
+    async def aclose(self) -> None:
+        """Release pooled connections held by the async client."""
+        if self._async_client is not None:
+            await self._async_client.close()
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False, cancel_futures=True)
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
+    def _request_completion(self, operation: str, request: Dict[str, object], priority: str = "Medium") -> str:
+        """Send one chat completion through the scheduler, breaker, budget and hedging policy."""
+        self._admit(operation, request, priority)
+        self._check_breaker(operation)
+
+        def create():
+            return self._client.chat.completions.create(**request, timeout=self.timeout)  # type: ignore[union-attr]
+
+        try:
+            with GROQ_CALL_SECONDS.time(operation=operation):
+                if self._hedge_pool is not None and self.hedge_delay is not None:
+                    completion = hedged_call(create, self._hedge_pool, self.hedge_delay, self.timeout)
+                else:
+                    completion = create()
+        except Exception:
+            self._record_outcome(success=False)
+            raise
+        except BaseException:
+            self._release_breaker()
+            raise
+        self._record_outcome(success=True)
+        return completion.choices[0].message.content
+
+    async def _request_completion_async(
+        self, operation: str, request: Dict[str, object], priority: str = "Medium"
+    ) -> str:
+        await self._admit_async(operation, request, priority)
+        self._check_breaker(operation)
+
+        def create():
+            return self._async_client.chat.completions.create(**request, timeout=self.timeout)  # type: ignore[union-attr]
+
+        try:
+            with GROQ_CALL_SECONDS.time(operation=operation):
+                completion = await hedged_call_async(create, self.hedge_delay, self.timeout)
+        except Exception:
+            self._record_outcome(success=False)
+            raise
+        except BaseException:
+            self._release_breaker()
+            raise
+        self._record_outcome(success=True)
+        return completion.choices[0].message.content
+
+    def _admit(self, operation: str, request: Dict[str, object], priority: str) -> None:
+        if self.scheduler is None:
+            return
+        # Do not queue behind the rate limit for a call the breaker will refuse.
+        if self.breaker is not None and self.breaker.state == OPEN:
+            raise CircuitOpenError(f"Groq circuit open; skipping {operation} call")
+        if not self.scheduler.acquire(priority, self._estimate_tokens(request)):
+            raise RateLimitedError(f"Groq scheduler did not admit {operation} ({priority})")
+
+    async def _admit_async(self, operation: str, request: Dict[str, object], priority: str) -> None:
+        if self.scheduler is None:
+            return
+        if self.breaker is not None and self.breaker.state == OPEN:
+            raise CircuitOpenError(f"Groq circuit open; skipping {operation} call")
+        if not await self.scheduler.acquire_async(priority, self._estimate_tokens(request)):
+            raise RateLimitedError(f"Groq scheduler did not admit {operation} ({priority})")
+
+    def _priority(self, text: str) -> str:
+        """Rules-estimated severity, used to order calls before Groq has classified them."""
+        if self.scheduler is None:
+            return "Medium"
+        return self.rules_fallback.classify(text)["severity"]
+
+    def _estimate_tokens(self, request: Dict[str, object]) -> float:
+        # ~4 characters per token for the prompt, plus the completion allowance.
+        messages: List[Dict[str, str]] = request.get("messages", [])  # type: ignore[assignment]
+        prompt_chars = sum(len(message.get("content", "")) for message in messages)
+        return prompt_chars / 4 + float(request.get("max_tokens", 0))  # type: ignore[arg-type]
+
+    def _check_breaker(self, operation: str) -> None:
+        if self.breaker is not None and not self.breaker.allow_request():
+            raise CircuitOpenError(f"Groq circuit open; skipping {operation} call")
+
+    def _record_outcome(self, success: bool) -> None:
+        if self.breaker is None:
+            return
+        if success:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def _release_breaker(self) -> None:
+        """A cancelled call says nothing about Groq's health, but must not keep its probe slot."""
+        if self.breaker is not None:
+            self.breaker.release()
+
+    def _cache_key(self, kind: str, description: str, *context: str) -> str:
+        return ResponseCache.make_key(
+            kind, self._model, _PROMPT_VERSION, normalize_description(description), *context
+        )
+
+    def _cache_get(self, key: str) -> Optional[object]:
+        if self.cache is None:
+            return None
+        return self.cache.get(key)
+
+    def _cache_set(self, key: str, value: object) -> None:
+        # Only successful Groq responses reach here; rules fallbacks are never cached.
+        if self.cache is not None:
+            self.cache.set(key, value)
+
+    async def _cache_aget(self, key: str) -> Optional[object]:
+        if self.cache is None:
+            return None
+        return await self.cache.aget(key)
+
+    async def _cache_aset(self, key: str, value: object) -> None:
+        if self.cache is not None:
+            await self.cache.aset(key, value)
+
+    def _classification_request(self, text: str) -> Dict[str, object]:
+        return {
+            "model": self._model,
+            "messages": [
+                {"role": "system", "content": _CLASSIFICATION_PROMPT},
+                {"role": "user", "content": text},
+            ],
+            "temperature": 0.1,
+            "response_format": {"type": "json_object"},
+        }
+
+    def _parse_classification(self, payload: str, text: str) -> Dict[str, str]:
+        parsed = json.loads(payload)
+        summary = self._trim_summary(parsed.get("summary") or text)
+        category = self._normalize_category(parsed.get("category"))
+        severity = self._normalize_severity(parsed.get("severity"))
+        return {"summary": summary, "category": category, "severity": severity}
+
+    def _next_action_request(
+        self,
+        description: str,
+        category: str,
+        severity: str,
+        related_issues: List[Dict[str, object]],
+    ) -> Dict[str, object]:
+        kb_context = self._render_kb_context(related_issues)
+        return {
+            "model": self._model,
+            "messages": [
+                {"role": "system", "content": _NEXT_ACTION_PROMPT},
+                {
+                    "role": "user",
+                    "content": (
+                        f"Description: {description}\n"
+                        f"Category: {category}\n"
+                        f"Severity: {severity}\n"
+                        f"{kb_context}\n"
+                        "Respond with 1-2 short actionable sentences."
+                    ),
+                },
+            ],
+            "temperature": 0.5,
+            "max_tokens": 150,
+        }
+
+    def clean_next_action(self, content: str) -> str:
+        """Normalise raw model text; public so streamed next steps are finalised the same way."""
+        return content.strip().strip('"').strip("'").strip()[:200]
+
+    def _fused_request(self, text: str, related_issues: List[Dict[str, object]]) -> Dict[str, object]:
+        return {
+            "model": self._model,
+            "messages": [
+                {"role": "system", "content": _FUSED_PROMPT},
+                {
+                    "role": "user",
+                    "content": f"Ticket: {text}\n{self._render_kb_context(related_issues)}",
+                },
+            ],
+            "temperature": 0.1,
+            "max_tokens": 300,
+            "response_format": {"type": "json_object"},
+        }
+
+    def _parse_fused(
+        self, payload: str, text: str, related_issues: List[Dict[str, object]]
+    ) -> Dict[str, str]:
+        parsed = json.loads(payload)
+        if not isinstance(parsed, dict):
+            raise ValueError("Fused response is not a JSON object")
+        rules = self.rules_fallback.classify(text)
+        summary = self._trim_summary(parsed.get("summary") or rules["summary"])
+        category = (
+            self._normalize_category(parsed["category"]) if parsed.get("category") else rules["category"]
+        )
+        severity = (
+            self._normalize_severity(parsed["severity"]) if parsed.get("severity") else rules["severity"]
+        )
+        next_step = parsed.get("next_step")
+        if isinstance(next_step, str) and next_step.strip():
+            next_step = self.clean_next_action(next_step)
+        else:
+            next_step = self._rule_based_action(related_issues, severity)
+        return {"summary": summary, "category": category, "severity": severity, "suggested_next_step": next_step}
+
+    def _fused_from_rules(self, text: str, related_issues: List[Dict[str, object]]) -> Dict[str, str]:
+        profile = self.rules_fallback.classify(text)
+        return {**profile, "suggested_next_step": self._rule_based_action(related_issues, profile["severity"])}
+
     def _rule_based_action(self, related_issues: List[Dict[str, object]], severity: str) -> str:
         """Simple deterministic fallback for suggested_next_step."""
         has_match = bool(related_issues) and related_issues[0].get("similarity", 0) >= self.match_threshold
@@ -0,0 +1,269 @@
+"""Durable background triage jobs backed by a local SQLite queue.
+
+``TriageJobQueue.submit`` stores tickets and returns job IDs immediately; a
+pool of worker threads claims queued jobs, runs them through the triage
+callable and writes the result back. Jobs live in SQLite (WAL mode), so
+queued work survives a restart, and claiming happens inside an ``IMMEDIATE``
+transaction so several processes can share one database file. A job still
+``running`` after ``lease_seconds`` (its process crashed or restarted) is
+claimed again.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from agent.metrics import REGISTRY
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+JOBS_DEPTH = REGISTRY.gauge("triage_jobs_queued", "Triage jobs waiting for a worker.")
+JOBS_BUSY_WORKERS = REGISTRY.gauge("triage_jobs_busy_workers", "Job workers currently processing a ticket.")
+JOBS_FINISHED = REGISTRY.counter("triage_jobs_finished_total", "Finished triage jobs by status.", ("status",))
+JOBS_SECONDS = REGISTRY.histogram("triage_job_seconds", "Time a worker spent on one triage job.")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS triage_jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT UNIQUE NOT NULL,
+    status TEXT NOT NULL,
+    description TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS triage_jobs_status ON triage_jobs (status, seq);
+"""
+
+
+class TriageJobQueue:
+    """SQLite-backed job queue with a fixed pool of worker threads."""
+
+    def __init__(
+        self,
+        path: Path,
+        triage: Callable[[str], Dict[str, object]],
+        workers: int = 4,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        # 0 workers: this process only enqueues (e.g. an API-only replica).
+        self.workers = max(0, workers)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.logger = logging.getLogger(__name__)
+        self._triage = triage
+        self._clock = clock
+        # ``_lock`` guards the busy counters only. Writes (submit, claim,
+        # finish) share ``_db`` under ``_write_lock`` and may wait up to the
+        # connection timeout for another process's write lock. Reads use
+        # their own WAL connection, so ``get``/``stats`` never queue behind them.
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._wakeup = threading.Condition(threading.Lock())
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._busy = 0
+        self._busy_seconds = 0.0
+        self._started_at: Optional[float] = None
+        self._db = self._open_db(self.path)
+        self._reader = self._connect(self.path)
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+    def submit(self, descriptions: Sequence[str]) -> List[str]:
+        """Persist one job per description and wake the workers."""
+        now = self._clock()
+        job_ids = [uuid.uuid4().hex for _ in descriptions]
+        with self._write_lock:
+            with self._transaction():
+                self._db.executemany(
+                    "INSERT INTO triage_jobs (id, status, description, created_at) VALUES (?, ?, ?, ?)",
+                    [(job_id, QUEUED, description, now) for job_id, description in zip(job_ids, descriptions)],
+                )
+        self._publish_depth()
+        with self._wakeup:
+            self._wakeup.notify(len(job_ids))
+        return job_ids
+
+    def get(self, job_id: str) -> Optional[Dict[str, object]]:
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT id, status, result, error, created_at, started_at, finished_at FROM triage_jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "status": row[1],
+            "result": json.loads(row[2]) if row[2] is not None else None,
+            "error": row[3],
+            "created_at": row[4],
+            "started_at": row[5],
+            "finished_at": row[6],
+        }
+
+    def start(self) -> "TriageJobQueue":
+        if self._threads:
+            return self
+        self._stopping.clear()
+        self._started_at = time.monotonic()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"triage-job-{index}", daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        self._publish_depth()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers after their current job; queued jobs stay queued."""
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def close(self) -> None:
+        self.stop()
+        with self._write_lock:
+            self._db.close()
+        with self._read_lock:
+            self._reader.close()
+
+    def stats(self) -> Dict[str, object]:
+        with self._read_lock:
+            counts = dict(self._reader.execute("SELECT status, COUNT(*) FROM triage_jobs GROUP BY status").fetchall())
+        with self._lock:
+            busy, busy_seconds = self._busy, self._busy_seconds
+        elapsed = time.monotonic() - self._started_at if self._started_at is not None else 0.0
+        return {
+            "workers": self.workers,
+            "busy_workers": busy,
+            # Share of worker time spent on jobs since start; near 1.0 means add workers.
+            "utilization": round(busy_seconds / (elapsed * self.workers), 4) if elapsed and self.workers else 0.0,
+            **{status: counts.get(status, 0) for status in (QUEUED, RUNNING, DONE, FAILED)},
+        }
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            job = self._claim()
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+            self._run(*job)
+
+    def _run(self, job_id: str, description: str) -> None:
+        with self._lock:
+            self._busy += 1
+            JOBS_BUSY_WORKERS.set(self._busy)
+        started = time.monotonic()
+        try:
+            result = self._triage(description)
+        except ValueError as exc:
+            self._finish(job_id, FAILED, error=str(exc))
+        except Exception:  # noqa: BLE001 - a bad job must not kill the worker
+            self.logger.exception("Triage job %s failed", job_id)
+            self._finish(job_id, FAILED, error="Triage failed")
+        else:
+            self._finish(job_id, DONE, result=result)
+        finally:
+            elapsed = time.monotonic() - started
+            JOBS_SECONDS.observe(elapsed)
+            with self._lock:
+                self._busy -= 1
+                self._busy_seconds += elapsed
+                JOBS_BUSY_WORKERS.set(self._busy)
+
+    def _claim(self) -> Optional[Tuple[str, str]]:
+        with self._write_lock:
+            try:
+                with self._transaction():
+                    # Jobs whose lease ran out (their worker or process died)
+                    # are claimed again.
+                    row = self._db.execute(
+                        "SELECT id, description FROM triage_jobs"
+                        " WHERE status = ? OR (status = ? AND started_at <= ?) ORDER BY seq LIMIT 1",
+                        (QUEUED, RUNNING, self._clock() - self.lease_seconds),
+                    ).fetchone()
+                    if row is not None:
+                        self._db.execute(
+                            "UPDATE triage_jobs SET status = ?, started_at = ? WHERE id = ?",
+                            (RUNNING, self._clock(), row[0]),
+                        )
+            except sqlite3.Error as exc:
+                self.logger.warning("Claiming a triage job failed: %s", exc)
+                return None
+        if row is not None:
+            self._publish_depth()
+        return (row[0], row[1]) if row is not None else None
+
+    def _finish(
+        self, job_id: str, status: str, result: Optional[Dict[str, object]] = None, error: Optional[str] = None
+    ) -> None:
+        with self._write_lock:
+            try:
+                with self._transaction():
+                    self._db.execute(
+                        "UPDATE triage_jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                        (status, json.dumps(result) if result is not None else None, error, self._clock(), job_id),
+                    )
+            except sqlite3.Error as exc:
+                # The job stays running and is claimed again once its lease expires.
+                self.logger.warning("Recording triage job %s as %s failed: %s", job_id, status, exc)
+                return
+        JOBS_FINISHED.inc(status=status)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """``BEGIN IMMEDIATE`` takes the write lock up front, so two processes
+        sharing the file cannot claim the same job."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            self._db.execute("COMMIT")
+        except BaseException:
+            # A failed COMMIT (e.g. still locked) leaves the transaction open.
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+            raise
+
+    def _publish_depth(self) -> None:
+        with self._read_lock:
+            (depth,) = self._reader.execute(
+                "SELECT COUNT(*) FROM triage_jobs WHERE status = ?", (QUEUED,)
+            ).fetchone()
+        JOBS_DEPTH.set(depth)
+
+    def _open_db(self, path: Path) -> sqlite3.Connection:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = self._connect(path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(_SCHEMA)
+        return db
+
+    def _connect(self, path: Path) -> sqlite3.Connection:
+        # Autocommit mode: every write goes through ``_transaction``.
+        return sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=30.0)
@@ -0,0 +1,224 @@
+"""Compact, mmap-able compiled KB index.
+
+``python -m agent.kb_index build-index kb/kb.json kb/kb.idx`` compiles the
+KB into one binary file:
+
+* a sorted, interned token vocabulary (offsets + UTF-8 blob),
+* array-backed postings (uint32 entry positions per token),
+* per-entry token counts,
+* packed entry records (length-prefixed UTF-8 fields).
+
+``CompiledKBIndex`` opens the file with ``mmap`` and exposes the same
+``entries`` / ``postings`` / ``token_counts`` surface as the in-memory
+index, so every uvicorn worker shares the page cache instead of holding
+its own copy of the parsed JSON.
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from agent.kb_search import HitRecord
+
+MAGIC = b"TKBI"
+VERSION = 1
+# magic, version, n_entries, n_tokens, then 7 section offsets.
+_HEADER = struct.Struct("<4sIII7Q")
+_U32 = struct.Struct("<I")
+_RECORD_FIELDS = ("id", "title", "category", "recommended_action")
+
+
+def _align(buffer: bytearray, boundary: int = 8) -> int:
+    buffer.extend(b"\0" * (-len(buffer) % boundary))
+    return len(buffer)
+
+
+def _pack_record(entry: Dict[str, object]) -> bytes:
+    parts: List[bytes] = []
+    symptoms = [str(symptom) for symptom in entry.get("symptoms", [])]  # type: ignore[union-attr]
+    fields = [str(entry.get(field, HitRecord.DEFAULTS.get(field, ""))) for field in _RECORD_FIELDS]
+    for value in fields + symptoms:
+        encoded = value.encode("utf-8")
+        parts.append(_U32.pack(len(encoded)))
+        parts.append(encoded)
+    return _U32.pack(len(symptoms)) + b"".join(parts)
+
+
+def compile_kb(entries: Sequence[Dict[str, object]], output_path: Path) -> Dict[str, int]:
+    """Write the compiled index for ``entries`` to ``output_path``."""
+    from agent.kb_search import KnowledgeBaseSearch
+
+    source = KnowledgeBaseSearch(entries=entries)._index
+    vocabulary = sorted(source.postings)
+
+    body = bytearray(_HEADER.size)
+    offsets: List[int] = []
+
+    offsets.append(_align(body))  # vocabulary offsets
+    blob = bytearray()
+    vocab_offsets = [0]
+    for token in vocabulary:
+        blob.extend(token.encode("utf-8"))
+        vocab_offsets.append(len(blob))
+    body.extend(struct.pack(f"<{len(vocab_offsets)}I", *vocab_offsets))
+    offsets.append(_align(body))  # vocabulary blob
+    body.extend(blob)
+
+    offsets.append(_align(body))  # postings offsets
+    posting_offsets = [0]
+    for token in vocabulary:
+        posting_offsets.append(posting_offsets[-1] + len(source.postings[token]))
+    body.extend(struct.pack(f"<{len(posting_offsets)}I", *posting_offsets))
+    offsets.append(_align(body))  # postings data
+    for token in vocabulary:
+        positions = source.postings[token]
+        body.extend(struct.pack(f"<{len(positions)}I", *positions))
+
+    offsets.append(_align(body))  # token counts
+    body.extend(struct.pack(f"<{len(source.token_counts)}I", *source.token_counts))
+
+    records = [_pack_record(entry) for entry in source.entries]
+    record_offsets = [0]
+    for record in records:
+        record_offsets.append(record_offsets[-1] + len(record))
+    offsets.append(_align(body))  # record offsets
+    body.extend(struct.pack(f"<{len(record_offsets)}Q", *record_offsets))
+    offsets.append(_align(body))  # record blob
+    for record in records:
+        body.extend(record)
+
+    body[: _HEADER.size] = _HEADER.pack(MAGIC, VERSION, len(records), len(vocabulary), *offsets)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    tmp_path.write_bytes(bytes(body))
+    tmp_path.replace(output_path)
+    return {"entries": len(records), "tokens": len(vocabulary), "bytes": len(body)}
+
+
+class _Postings:
+    """Read-only ``token -> positions`` view backed by the mmap."""
+
+    def __init__(self, index: "CompiledKBIndex") -> None:
+        self._index = index
+
+    def get(self, token: str, default: Sequence[int] = ()) -> Sequence[int]:
+        token_id = self._index.token_id(token)
+        if token_id is None:
+            return default
+        start, end = self._index._posting_offsets[token_id], self._index._posting_offsets[token_id + 1]
+        return self._index._postings[start:end]
+
+    def __contains__(self, token: str) -> bool:
+        return self._index.token_id(token) is not None
+
+    def __len__(self) -> int:
+        return self._index.n_tokens
+
+
+class _Entries:
+    """Lazily decoded sequence of entry dicts."""
+
+    def __init__(self, index: "CompiledKBIndex") -> None:
+        self._index = index
+
+    def __len__(self) -> int:
+        return self._index.n_entries
+
+    def __getitem__(self, position: int) -> Dict[str, object]:
+        if not 0 <= position < self._index.n_entries:
+            raise IndexError(position)
+        return self._index.record(position)
+
+    def __iter__(self) -> Iterator[Dict[str, object]]:
+        for position in range(len(self)):
+            yield self._index.record(position)
+
+
+class _Records(_Entries):
+    """Hit records decoded from the mmap on demand, like the entries themselves."""
+
+    def __getitem__(self, position: int) -> HitRecord:  # type: ignore[override]
+        return HitRecord(super().__getitem__(position))
+
+
+class CompiledKBIndex:
+    """mmap-backed index with the same lookup surface as the in-memory one."""
+
+    scorer = None
+    fuzzy = None
+    # Entries are decoded lazily, so symptoms are matched per candidate.
+    symptom_matcher = None
+    entry_symptoms = None
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, version, n_entries, n_tokens, *offsets = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a compiled KB index (version {VERSION})")
+        vocab_offsets, vocab_blob, posting_offsets, postings, token_counts, record_offsets, record_blob = offsets
+        self.n_entries = n_entries
+        self.n_tokens = n_tokens
+        self._vocab_offsets = view[vocab_offsets : vocab_offsets + 4 * (n_tokens + 1)].cast("I")
+        self._vocab_blob = vocab_blob
+        self._posting_offsets = view[posting_offsets : posting_offsets + 4 * (n_tokens + 1)].cast("I")
+        self._postings = view[postings : postings + 4 * self._posting_offsets[n_tokens]].cast("I")
+        self.token_counts = view[token_counts : token_counts + 4 * n_entries].cast("I")
+        self._record_offsets = view[record_offsets : record_offsets + 8 * (n_entries + 1)].cast("Q")
+        self._record_blob = record_blob
+        self.postings = _Postings(self)
+        self.entries = _Entries(self)
+        self.records = _Records(self)
+
+    def token_id(self, token: str) -> Optional[int]:
+        """Binary-search the sorted vocabulary without materialising it."""
+        target = token.encode("utf-8")
+        position = bisect.bisect_left(range(self.n_tokens), target, key=self._vocab_token)
+        if position < self.n_tokens and self._vocab_token(position) == target:
+            return position
+        return None
+
+    def record(self, position: int) -> Dict[str, object]:
+        offset = self._record_blob + self._record_offsets[position]
+        (n_symptoms,) = _U32.unpack_from(self._mmap, offset)
+        offset += 4
+        values: List[str] = []
+        for _ in range(len(_RECORD_FIELDS) + n_symptoms):
+            (length,) = _U32.unpack_from(self._mmap, offset)
+            offset += 4
+            values.append(self._mmap[offset : offset + length].decode("utf-8"))
+            offset += length
+        entry: Dict[str, object] = dict(zip(_RECORD_FIELDS, values))
+        entry["symptoms"] = values[len(_RECORD_FIELDS) :]
+        return entry
+
+    def _vocab_token(self, token_id: int) -> bytes:
+        start = self._vocab_blob + self._vocab_offsets[token_id]
+        end = self._vocab_blob + self._vocab_offsets[token_id + 1]
+        return self._mmap[start:end]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m agent.kb_index", description="Compiled KB index tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build-index", help="compile kb.json into an mmap-able index")
+    build.add_argument("kb", type=Path, help="source KB JSON file")
+    build.add_argument("output", type=Path, help="compiled index path (e.g. kb/kb.idx)")
+    args = parser.parse_args(argv)
+
+    with args.kb.open("r", encoding="utf-8") as fh:
+        entries = json.load(fh)
+    stats = compile_kb(entries, args.output)
+    print(f"wrote {args.output}: {stats['entries']} entries, {stats['tokens']} tokens, {stats['bytes']} bytes",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
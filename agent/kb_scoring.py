@@ -0,0 +1,259 @@
+import math
+import zlib
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+SCORING_BACKENDS = ("jaccard", "bm25", "fuzzy")
+
+
+class CorpusStats:
+    """Document frequencies and lengths over a whole KB.
+
+    A scorer built over one shard's slice takes the stats of the full KB, so
+    its idf, average length and vocabulary (and therefore its scores) match a
+    scorer built over every entry. Shards compute their own stats and the
+    parent merges them with ``+``.
+    """
+
+    __slots__ = ("n_docs", "total_length", "document_frequency")
+
+    def __init__(
+        self, n_docs: int = 0, total_length: int = 0, document_frequency: Optional[Dict[str, int]] = None
+    ) -> None:
+        self.n_docs = n_docs
+        self.total_length = total_length
+        self.document_frequency: Dict[str, int] = document_frequency if document_frequency is not None else {}
+
+    @classmethod
+    def from_tokens(cls, entry_tokens: Sequence[FrozenSet[str]]) -> "CorpusStats":
+        document_frequency: Dict[str, int] = {}
+        for tokens in entry_tokens:
+            for token in tokens:
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+        return cls(len(entry_tokens), sum(len(tokens) for tokens in entry_tokens), document_frequency)
+
+    def __add__(self, other: "CorpusStats") -> "CorpusStats":
+        document_frequency = dict(self.document_frequency)
+        for token, count in other.document_frequency.items():
+            document_frequency[token] = document_frequency.get(token, 0) + count
+        return CorpusStats(self.n_docs + other.n_docs, self.total_length + other.total_length, document_frequency)
+
+    @property
+    def avg_length(self) -> float:
+        return self.total_length / self.n_docs if self.n_docs else 1.0
+
+    @property
+    def vocabulary(self) -> List[str]:
+        return sorted(self.document_frequency)
+
+
+class BM25Scorer:
+    """Sparse BM25-weighted cosine scorer over KB entry token sets.
+
+    Entry rows hold BM25 weights (binary term frequency, since entries are
+    short keyword lists) normalized to unit length; a query is the unit
+    vector of its idf weights. A single sparse product therefore yields a
+    similarity in ``[0, 1]`` that stays comparable with
+    ``KB_SIMILARITY_THRESHOLD``.
+    """
+
+    def __init__(
+        self,
+        entry_tokens: Sequence[FrozenSet[str]],
+        k1: float = 1.2,
+        b: float = 0.75,
+        corpus: Optional[CorpusStats] = None,
+    ) -> None:
+        try:
+            import numpy as np
+            from scipy import sparse
+        except ImportError as exc:  # pragma: no cover - import guard
+            raise ImportError("numpy and scipy are required for KB_SCORING=bm25") from exc
+        self._np = np
+        self._sparse = sparse
+
+        # idf and the average length come from ``corpus`` (the whole KB when
+        # this scorer only covers a shard); rows are the local entries.
+        corpus = corpus if corpus is not None else CorpusStats.from_tokens(entry_tokens)
+        vocabulary = {token: column for column, token in enumerate(corpus.vocabulary)}
+        rows: List[int] = []
+        cols: List[int] = []
+        for position, tokens in enumerate(entry_tokens):
+            for token in tokens:
+                rows.append(position)
+                cols.append(vocabulary[token])
+
+        n_docs = len(entry_tokens)
+        self.vocabulary = vocabulary
+        df = np.asarray([corpus.document_frequency[token] for token in vocabulary], dtype=np.float64)
+        self.idf = np.log1p((corpus.n_docs - df + 0.5) / (df + 0.5))
+
+        lengths = np.asarray([len(tokens) for tokens in entry_tokens], dtype=np.float64)
+        avg_length = corpus.avg_length
+        row_index = np.asarray(rows, dtype=np.int64)
+        col_index = np.asarray(cols, dtype=np.int64)
+        saturation = (k1 + 1.0) / (1.0 + k1 * (1.0 - b + b * lengths[row_index] / max(avg_length, 1e-9)))
+        weights = self.idf[col_index] * saturation
+
+        matrix = sparse.csr_matrix((weights, (row_index, col_index)), shape=(n_docs, len(vocabulary)))
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        # Stored transposed (terms x entries) so queries @ matrix is one CSR product.
+        self._term_entry = sparse.diags(1.0 / norms).dot(matrix).T.tocsr()
+        self.n_docs = n_docs
+
+    def score_many(self, queries: Sequence[Set[str]]) -> List[Tuple["object", "object"]]:
+        """Return ``(positions, scores)`` arrays of non-zero matches per query."""
+        np = self._np
+        rows: List[int] = []
+        cols: List[int] = []
+        data: List[float] = []
+        for row, tokens in enumerate(queries):
+            # Sorted so the query norm sums in the same order in every process.
+            columns = sorted(self.vocabulary[token] for token in tokens if token in self.vocabulary)
+            if not columns:
+                continue
+            weights = self.idf[columns]
+            norm = math.sqrt(float(weights.dot(weights))) or 1.0
+            rows.extend([row] * len(columns))
+            cols.extend(columns)
+            data.extend((weights / norm).tolist())
+
+        query_matrix = self._sparse.csr_matrix(
+            (data, (rows, cols)), shape=(len(queries), len(self.vocabulary))
+        )
+        product = query_matrix.dot(self._term_entry).tocsr()
+        product.sort_indices()
+        results = []
+        for row in range(len(queries)):
+            start, end = product.indptr[row], product.indptr[row + 1]
+            scores = product.data[start:end]
+            keep = scores > 0
+            results.append((product.indices[start:end][keep], scores[keep]))
+        return results
+
+    def shortlist(self, positions, scores, limit: int, max_bonus: float):
+        """Return positions that can still reach the top ``limit`` after a bonus.
+
+        Uses argpartition to find the ``limit``-th best base score; anything
+        more than ``max_bonus`` below it cannot overtake it.
+        """
+        np = self._np
+        if limit <= 0 or len(scores) == 0:
+            return positions[:0], scores[:0]
+        if len(scores) > limit:
+            kth = scores[np.argpartition(-scores, limit - 1)[limit - 1]]
+            keep = scores >= kth - max_bonus - 1e-12
+            positions, scores = positions[keep], scores[keep]
+        return positions, scores
+
+
+class FuzzyScorer:
+    """Typo-tolerant token matcher: character n-gram vectors plus random-projection LSH.
+
+    Every KB token is padded with spaces and cut into character
+    ``ngram``-grams, which are hashed (crc32, so shard processes agree) into a
+    ``dim``-sized count vector of unit length; "loging" and "login" then share
+    most of their dimensions. ``tables`` hash tables each sign-project the
+    vectors onto ``bits`` random hyperplanes. A description token that is not
+    in the KB vocabulary is compared only against the vocabulary tokens
+    sharing one of its buckets, and is matched to the closest one whose
+    cosine reaches ``min_similarity``.
+    """
+
+    def __init__(
+        self,
+        entry_tokens: Sequence[FrozenSet[str]],
+        ngram: int = 2,
+        dim: int = 1024,
+        bits: int = 8,
+        tables: int = 32,
+        min_similarity: float = 0.6,
+        min_length: int = 4,
+        seed: int = 7,
+        corpus: Optional[CorpusStats] = None,
+    ) -> None:
+        try:
+            import numpy as np
+            from scipy import sparse
+        except ImportError as exc:  # pragma: no cover - import guard
+            raise ImportError("numpy and scipy are required for KB_SCORING=fuzzy") from exc
+        self._np = np
+        self.ngram = ngram
+        self.dim = dim
+        self.bits = bits
+        self.tables = tables
+        self.min_similarity = min_similarity
+        self.min_length = min_length
+
+        corpus = corpus if corpus is not None else CorpusStats.from_tokens(entry_tokens)
+        self.vocabulary: List[str] = corpus.vocabulary
+        self._known = frozenset(self.vocabulary)
+        rows: List[int] = []
+        cols: List[int] = []
+        for row, token in enumerate(self.vocabulary):
+            for column in self._columns(token):
+                rows.append(row)
+                cols.append(column)
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(self.vocabulary), dim)
+        )
+        matrix.sum_duplicates()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        self._vectors = sparse.diags(1.0 / norms).dot(matrix).tocsr().astype(np.float32)
+
+        self._hyperplanes = np.random.default_rng(seed).standard_normal((dim, tables * bits)).astype(np.float32)
+        self._bit_weights = 1 << np.arange(bits, dtype=np.int64)
+        self._buckets: List[Dict[int, "object"]] = []
+        keys = self._bucket_keys(np.asarray(self._vectors.dot(self._hyperplanes)))
+        for table in range(tables):
+            order = np.argsort(keys[:, table], kind="stable")
+            table_keys, starts = np.unique(keys[order, table], return_index=True)
+            self._buckets.append(dict(zip(table_keys.tolist(), np.split(order, starts[1:]))))
+
+    def match(self, tokens: Set[str]) -> Dict[str, float]:
+        """Map unknown ``tokens`` to KB vocabulary tokens: ``{kb_token: cosine}``.
+
+        Each description token contributes to at most one KB token; when
+        several land on the same one, the best cosine is kept.
+        """
+        matches: Dict[str, float] = {}
+        for token in tokens:
+            if token in self._known or len(token) < self.min_length:
+                continue
+            best = self._closest(token)
+            if best is not None and best[1] > matches.get(best[0], 0.0):
+                matches[best[0]] = best[1]
+        return matches
+
+    def _closest(self, token: str) -> Optional[Tuple[str, float]]:
+        np = self._np
+        columns, counts = np.unique(np.asarray(self._columns(token), dtype=np.int64), return_counts=True)
+        if not len(columns):
+            return None
+        weights = counts.astype(np.float32) / np.float32(np.sqrt(counts.dot(counts)))
+        keys = self._bucket_keys(weights.dot(self._hyperplanes[columns])[None, :])[0].tolist()
+        groups = [group for group in (self._buckets[table].get(key) for table, key in enumerate(keys)) if group is not None]
+        if not groups:
+            return None
+        candidates = np.unique(np.concatenate(groups))
+        query = np.zeros(self.dim, dtype=np.float32)
+        query[columns] = weights
+        cosines = self._vectors[candidates].dot(query)
+        best = int(np.argmax(cosines))
+        if cosines[best] < self.min_similarity:
+            return None
+        return self.vocabulary[int(candidates[best])], float(cosines[best])
+
+    def _columns(self, token: str) -> List[int]:
+        padded = f" {token} "
+        size = self.ngram
+        return [
+            zlib.crc32(padded[start : start + size].encode("utf-8")) % self.dim
+            for start in range(max(1, len(padded) - size + 1))
+        ]
+
+    def _bucket_keys(self, projections):
+        """Pack the sign bits of each table's projections into one integer key."""
+        signs = (projections > 0).reshape(len(projections), self.tables, self.bits)
+        return signs.astype(self._np.int64).dot(self._bit_weights)
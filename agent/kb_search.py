@@ -1,8 +1,103 @@
+import heapq
 import json
 import logging
+import os
 import re
+import threading
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Set
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from agent.kb_scoring import SCORING_BACKENDS, BM25Scorer, CorpusStats, FuzzyScorer
+from agent.kb_shards import ShardedIndex, ShardedIndexClosed
+from agent.multipattern import MultiPatternMatcher
+
+if TYPE_CHECKING:  # imported lazily: only needed when KB_INDEX_PATH is set
+    from agent.kb_index import CompiledKBIndex
+
+_SYMPTOM_BONUS = 0.1
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_tokens(text: str) -> Set[str]:
+    """Lower-cased alphanumeric token set shared by KB search and dedup."""
+    return set(_TOKEN_PATTERN.findall(text.lower()))
+
+
+class HitRecord:
+    """Response fields of one KB entry, built once per index; only the similarity varies.
+
+    Values are coerced to ``str`` here, so hits already match the
+    ``RelatedIssue`` schema and the API can serialize them without validation.
+    """
+
+    __slots__ = ("id", "title", "recommended_action")
+
+    # Also used by the compiled index, so both backends fill gaps the same way.
+    DEFAULTS = {"id": "UNKNOWN", "title": "Untitled", "recommended_action": ""}
+
+    def __init__(self, entry: Dict[str, object]) -> None:
+        for field in self.__slots__:
+            object.__setattr__(self, field, str(entry.get(field, self.DEFAULTS[field])))
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("HitRecord is immutable")
+
+    def hit(self, similarity: float) -> Dict[str, object]:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "recommended_action": self.recommended_action,
+            "similarity": similarity,
+        }
+
+
+class _KBIndex:
+    """Immutable snapshot of the KB and its inverted index.
+
+    Lookups read ``KnowledgeBaseSearch._index`` once and use that snapshot
+    throughout, so a reload only has to swap a single reference.
+    """
+
+    __slots__ = (
+        "entries",
+        "records",
+        "entry_tokens",
+        "token_counts",
+        "postings",
+        "scorer",
+        "fuzzy",
+        "entry_symptoms",
+        "symptom_matcher",
+    )
+
+    def __init__(
+        self,
+        entries: List[Dict[str, object]],
+        entry_tokens: List[FrozenSet[str]],
+        scoring: str = "jaccard",
+        corpus: Optional[CorpusStats] = None,
+    ) -> None:
+        self.entries = entries
+        self.records = [HitRecord(entry) for entry in entries]
+        self.entry_tokens = entry_tokens
+        self.token_counts = [len(tokens) for tokens in entry_tokens]
+        postings: Dict[str, List[int]] = {}
+        for position, tokens in enumerate(entry_tokens):
+            for token in tokens:
+                postings.setdefault(token, []).append(position)
+        self.postings = postings
+        # ``corpus`` is set for a shard: its scorers use whole-KB statistics.
+        self.scorer: Optional[BM25Scorer] = BM25Scorer(entry_tokens, corpus=corpus) if scoring == "bm25" else None
+        self.fuzzy: Optional[FuzzyScorer] = FuzzyScorer(entry_tokens, corpus=corpus) if scoring == "fuzzy" else None
+        # Normalized symptoms per entry plus one matcher over all of them, so
+        # a lookup scans the description once instead of once per symptom.
+        self.entry_symptoms: List[FrozenSet[str]] = [
+            frozenset(symptom.strip().lower() for symptom in entry.get("symptoms", []))  # type: ignore[union-attr]
+            for entry in entries
+        ]
+        self.symptom_matcher: Optional[MultiPatternMatcher] = MultiPatternMatcher(
+            symptom for symptoms in self.entry_symptoms for symptom in symptoms
+        )
 
 
 class KnowledgeBaseSearch:
@@ -12,57 +107,321 @@ class KnowledgeBaseSearch:
         self,
         kb_path: Optional[Path] = None,
         entries: Optional[Sequence[Dict[str, object]]] = None,
+        scoring: str = "jaccard",
+        index_path: Optional[Path] = None,
+        shards: int = 1,
     ) -> None:
-        if entries is None and kb_path is None:  # pragma: no cover - defensive
-            raise ValueError("Provide either kb_path or entries")
+        if entries is None and kb_path is None and index_path is None:  # pragma: no cover - defensive
+            raise ValueError("Provide kb_path, entries or index_path")
+        if scoring not in SCORING_BACKENDS:
+            raise ValueError(f"Unknown KB scoring backend '{scoring}'; expected one of {SCORING_BACKENDS}")
+        if index_path is not None and scoring != "jaccard":
+            raise ValueError("Compiled KB indexes only support jaccard scoring")
+        if index_path is not None and shards > 1:
+            raise ValueError("Compiled KB indexes cannot be sharded; use kb_path or entries")
         self.logger = logging.getLogger(__name__)
+        self.kb_path = kb_path
+        self.index_path = index_path
+        self.scoring = scoring
+        self.shards = max(1, shards)
+        self._sharded: Optional[ShardedIndex] = None
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self._file_signature: Optional[Tuple[int, int]] = None
+        self._index: "_KBIndex | CompiledKBIndex"
+        if index_path is not None:
+            from agent.kb_index import CompiledKBIndex
+
+            self._file_signature = self._signature(index_path)
+            self._index = CompiledKBIndex(index_path)
+            return
         if entries is not None:
-            self.kb = list(entries)
+            kb = list(entries)
         else:
             assert kb_path is not None  # narrow type
-            self.kb = self._load_kb(kb_path)
+            self._file_signature = self._signature(kb_path)
+            kb = self._load_kb(kb_path)
+        if self.shards > 1:
+            # Shard processes own the token sets; this process keeps only entries.
+            self._sharded = ShardedIndex(kb, self.shards, scoring)
+            self._index = _KBIndex([], [], "jaccard")
+            return
+        self._index = _KBIndex(kb, [frozenset(self._entry_tokens(entry)) for entry in kb], scoring)
+
+    @property
+    def kb(self) -> Sequence[Dict[str, object]]:
+        if self._sharded is not None:
+            return self._sharded.entries
+        return self._index.entries
 
     # ------------------------------------------------------------------ #
     # Public API
     # ------------------------------------------------------------------ #
     def lookup(self, description: str, limit: int = 3) -> List[Dict[str, object]]:
         """Return the most relevant KB entries for a description."""
+        if self._sharded is not None:
+            return self._sharded_lookup_many([description], limit)[0]
+        return self._lookup(self._index, description, limit)
+
+    def lookup_many(self, descriptions: Sequence[str], limit: int = 3) -> List[List[Dict[str, object]]]:
+        """Return ``lookup`` results for every description, in input order.
+
+        Identical descriptions are scored once and share the ranked result.
+        BM25 scores the whole batch with one sparse product; Jaccard ranks
+        each description on its own (see ``_rank_many``).
+        """
+        texts = list(dict.fromkeys(descriptions))
+        if self._sharded is not None:
+            ranked = self._sharded_lookup_many(texts, limit)
+        else:
+            index = self._index
+            ranked = [
+                [index.records[position].hit(similarity) for similarity, position in top]
+                for top in self._rank_many(index, texts, limit)
+            ]
+        unique = dict(zip(texts, ranked))
+        return [[dict(hit) for hit in unique[description]] for description in descriptions]
+
+    def ranked_hits(self, descriptions: Sequence[str], limit: int = 3) -> List[List[Tuple[float, int, Dict[str, object]]]]:
+        """``(similarity, KB position, hit)`` top-k per description; shard processes merge on these."""
+        index = self._index
+        return [
+            [(similarity, position, index.records[position].hit(similarity)) for similarity, position in top]
+            for top in self._rank_many(index, list(descriptions), limit)
+        ]
+
+    def reload(self, entries: Optional[Sequence[Dict[str, object]]] = None) -> Dict[str, int]:
+        """Rebuild the index from ``entries`` (or the KB file) and swap it in.
+
+        Entries whose content is unchanged reuse their token sets, so only
+        added or changed entries are re-tokenized. Lookups keep serving the
+        previous snapshot until the swap.
+        """
+        if self.index_path is not None and entries is None:
+            return self._reload_compiled(self.index_path)
+        with self._reload_lock:
+            if entries is None:
+                if self.kb_path is None:
+                    raise ValueError("KB was built from in-memory entries; pass entries to reload")
+                signature = self._signature(self.kb_path)
+                new_kb = self._load_kb(self.kb_path)
+            else:
+                signature = self._file_signature
+                new_kb = list(entries)
+
+            if self._sharded is not None:
+                return self._reload_sharded(new_kb, signature)
+            current = self._index
+            if not isinstance(current, _KBIndex):
+                raise ValueError("A compiled KB index is reloaded from its file, not from entries")
+            previous: Dict[object, Tuple[Dict[str, object], FrozenSet[str]]] = {
+                entry.get("id"): (entry, tokens) for entry, tokens in zip(current.entries, current.entry_tokens)
+            }
+            stats = {"entries": len(new_kb), "added": 0, "changed": 0, "unchanged": 0, "removed": 0}
+            entry_tokens: List[FrozenSet[str]] = []
+            seen: Set[object] = set()
+            for entry in new_kb:
+                entry_id = entry.get("id")
+                seen.add(entry_id)
+                known = previous.get(entry_id)
+                if known is not None and known[0] == entry:
+                    entry_tokens.append(known[1])
+                    stats["unchanged"] += 1
+                    continue
+                entry_tokens.append(frozenset(self._entry_tokens(entry)))
+                stats["changed" if known is not None else "added"] += 1
+            stats["removed"] = len(set(previous) - seen)
+
+            self._index = _KBIndex(new_kb, entry_tokens, self.scoring)
+            self._file_signature = signature
+        self.logger.info("KB reloaded", extra=stats)
+        return stats
+
+    def reload_if_changed(self) -> Optional[Dict[str, int]]:
+        """Reload from disk when the KB file's mtime or size has changed."""
+        source = self._source_path()
+        if source is None:
+            return None
+        try:
+            signature = self._signature(source)
+        except OSError as exc:
+            self.logger.warning("Cannot stat KB file %s: %s", source, exc)
+            return None
+        if signature == self._file_signature:
+            return None
+        return self.reload()
+
+    def start_watching(self, interval: float = 2.0) -> None:
+        """Poll the KB file in a daemon thread and reload it when it changes."""
+        if self._source_path() is None:
+            raise ValueError("Only file-backed KBs can be watched")
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="kb-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def close(self) -> None:
+        """Stop the watcher and shut down shard processes, if any."""
+        self.stop_watching()
+        if self._sharded is not None:
+            self._sharded.close()
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+    def _source_path(self) -> Optional[Path]:
+        return self.index_path if self.index_path is not None else self.kb_path
+
+    def _reload_compiled(self, index_path: Path) -> Dict[str, int]:
+        from agent.kb_index import CompiledKBIndex
+
+        with self._reload_lock:
+            signature = self._signature(index_path)
+            # The previous mapping stays valid for in-flight lookups and is
+            # unmapped once the last reference to it is dropped.
+            self._index = CompiledKBIndex(index_path)
+            self._file_signature = signature
+        stats = {"entries": len(self._index.entries)}
+        self.logger.info("Compiled KB index reloaded", extra=stats)
+        return stats
+
+    def _reload_sharded(self, new_kb: List[Dict[str, object]], signature: Optional[Tuple[int, int]]) -> Dict[str, int]:
+        """Repartition into fresh shard processes, then retire the old ones.
+
+        Called with ``_reload_lock`` held.
+        """
+        assert self._sharded is not None  # narrow type
+        previous = {entry.get("id"): entry for entry in self._sharded.entries}
+        stats = {"entries": len(new_kb), "added": 0, "changed": 0, "unchanged": 0, "removed": 0}
+        seen: Set[object] = set()
+        for entry in new_kb:
+            seen.add(entry.get("id"))
+            known = previous.get(entry.get("id"))
+            stats["added" if known is None else "unchanged" if known == entry else "changed"] += 1
+        stats["removed"] = len(set(previous) - seen)
+
+        retired, self._sharded = self._sharded, ShardedIndex(new_kb, self.shards, self.scoring)
+        self._file_signature = signature
+        # Waits for lookups already running on the old shards; later callers
+        # that still hold the old index are sent to the new one.
+        retired.close(wait=True)
+        self.logger.info("Sharded KB reloaded", extra=stats)
+        return stats
+
+    def _sharded_lookup_many(self, texts: Sequence[str], limit: int) -> List[List[Dict[str, object]]]:
+        while True:
+            sharded = self._sharded
+            assert sharded is not None  # narrow type
+            try:
+                return sharded.lookup_many(texts, limit)
+            except ShardedIndexClosed:
+                if self._sharded is sharded:
+                    raise  # closed for good, not replaced by a reload
+                # A reload retired this index after we picked it up; retry on the new one.
+
+    def _lookup(self, index: "_KBIndex | CompiledKBIndex", description: str, limit: int) -> List[Dict[str, object]]:
+        top = self._rank(index, description, limit)
+        return [index.records[position].hit(similarity) for similarity, position in top]
+
+    def _rank_many(
+        self, index: "_KBIndex | CompiledKBIndex", texts: Sequence[str], limit: int
+    ) -> List[List[Tuple[float, int]]]:
+        """``(similarity, position)`` top-k for every text, best first."""
+        if index.scorer is None:
+            # Jaccard stays a per-description loop on purpose. Scoring each
+            # candidate (union size, symptom bonus, rounding) is most of the
+            # cost, and that work is per description whatever the batching.
+            # Walking the postings of tokens shared across the batch once
+            # measured slower than walking them per text, because the counts
+            # must then be split back out per description.
+            return [self._rank(index, text, limit) for text in texts]
+        # One sparse matrix product scores every description.
+        matches = index.scorer.score_many([self._normalize_tokens(text) for text in texts])
+        return [
+            self._rank_weighted(index, text, positions, scores, limit)
+            for text, (positions, scores) in zip(texts, matches)
+        ]
+
+    def _rank(self, index: "_KBIndex | CompiledKBIndex", description: str, limit: int) -> List[Tuple[float, int]]:
         desc_tokens = self._normalize_tokens(description)
         if not desc_tokens:
             return []
 
-        ranked: List[Dict[str, object]] = []
-        for entry in self.kb:
-            entry_tokens = self._entry_tokens(entry)
-            union = desc_tokens | entry_tokens
-            if not union:
-                continue
+        if index.scorer is not None:
+            positions, scores = index.scorer.score_many([desc_tokens])[0]
+            return self._rank_weighted(index, description, positions, scores, limit)
 
-            overlap = desc_tokens & entry_tokens
-            base_score = len(overlap) / len(union)
-            if base_score == 0:
-                continue
+        # Count how many description tokens each entry shares; entries that
+        # never appear in a posting list would score 0 and are skipped.
+        overlaps: Dict[int, float] = {}
+        for token in desc_tokens:
+            for position in index.postings.get(token, ()):
+                overlaps[position] = overlaps.get(position, 0) + 1
+
+        # Fuzzy mode: a description token matched to a KB token by n-gram
+        # cosine counts as that fraction of a shared token. KB tokens the
+        # description already contains exactly were counted above, so each
+        # KB token contributes at most 1.
+        if index.fuzzy is not None:
+            for token, similarity in index.fuzzy.match(desc_tokens).items():
+                if token in desc_tokens:
+                    continue
+                for position in index.postings.get(token, ()):
+                    overlaps[position] = overlaps.get(position, 0) + similarity
+
+        symptom_hit = self._symptom_checker(index, description)
+        scored: List[Tuple[float, int]] = []
+        for position in sorted(overlaps):
+            overlap = overlaps[position]
+            union = len(desc_tokens) + index.token_counts[position] - overlap
+            base_score = overlap / union
 
             symptom_bonus = 0.0
-            if self._symptom_hit(description, entry.get("symptoms", [])):
-                symptom_bonus = 0.1
+            if symptom_hit(position):
+                symptom_bonus = _SYMPTOM_BONUS
 
             score = min(base_score + symptom_bonus, 1.0)
-            ranked.append(
-                {
-                    "id": entry.get("id", "UNKNOWN"),
-                    "title": entry.get("title", "Untitled"),
-                    "recommended_action": entry.get("recommended_action", ""),
-                    "similarity": round(score, 3),
-                }
-            )
-
-        ranked.sort(key=lambda item: item["similarity"], reverse=True)
-        return ranked[:limit]
+            scored.append((round(score, 3), position))
+
+        # nlargest keeps KB order for ties, matching a stable descending sort.
+        return heapq.nlargest(limit, scored, key=lambda item: item[0])
+
+    def _rank_weighted(
+        self, index: "_KBIndex | CompiledKBIndex", description: str, positions, scores, limit: int
+    ) -> List[Tuple[float, int]]:
+        """Apply the symptom bonus to BM25 matches and keep the top ``limit``."""
+        assert index.scorer is not None  # narrow type
+        positions, scores = index.scorer.shortlist(positions, scores, limit, _SYMPTOM_BONUS)
+        symptom_hit = self._symptom_checker(index, description)
+        scored: List[Tuple[float, int]] = []
+        for position, base_score in zip(positions.tolist(), scores.tolist()):
+            symptom_bonus = 0.0
+            if symptom_hit(position):
+                symptom_bonus = _SYMPTOM_BONUS
+            scored.append((round(min(base_score + symptom_bonus, 1.0), 3), position))
+        return heapq.nsmallest(limit, scored, key=lambda item: (-item[0], item[1]))
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop_watching.wait(interval):
+            try:
+                self.reload_if_changed()
+            except Exception as exc:  # noqa: BLE001 - keep serving the old index
+                self.logger.error("KB reload failed; keeping previous index: %s", exc)
+
+    def _signature(self, kb_path: Path) -> Tuple[int, int]:
+        stat = os.stat(kb_path)
+        return stat.st_mtime_ns, stat.st_size
 
-    # ------------------------------------------------------------------ #
-    # Internals
-    # ------------------------------------------------------------------ #
     def _load_kb(self, kb_path: Path) -> List[Dict[str, object]]:
         try:
             with kb_path.open("r", encoding="utf-8") as fh:
@@ -72,7 +431,7 @@ class KnowledgeBaseSearch:
             raise
 
     def _normalize_tokens(self, text: str) -> Set[str]:
-        return set(re.findall(r"[a-z0-9]+", text.lower()))
+        return normalize_tokens(text)
 
     def _entry_tokens(self, entry: Dict[str, object]) -> Set[str]:
         tokens: Set[str] = set()
@@ -83,6 +442,16 @@ class KnowledgeBaseSearch:
             tokens |= self._normalize_tokens(symptom)
         return tokens
 
+    def _symptom_checker(self, index: "_KBIndex | CompiledKBIndex", description: str) -> Callable[[int], bool]:
+        """Return ``position -> bool``: does any symptom of that entry occur in the description?"""
+        if index.symptom_matcher is None:
+            return lambda position: self._symptom_hit(description, index.entries[position].get("symptoms", []))
+        found = index.symptom_matcher.find(description.lower())
+        if not found:
+            return lambda position: False
+        entry_symptoms = index.entry_symptoms
+        return lambda position: not found.isdisjoint(entry_symptoms[position])
+
     def _symptom_hit(self, description: str, symptoms: Iterable[str]) -> bool:
         text = description.lower()
         for symptom in symptoms:
@@ -0,0 +1,142 @@
+"""Scatter-gather KB search over a pool of shard processes.
+
+The KB is split into ``N`` contiguous slices, each served by its own
+single-worker process holding a regular ``KnowledgeBaseSearch``. A query is
+sent to every shard, each shard returns its local top-k as
+``(similarity, local position, hit)``, and the parent merges them into the
+global top-k. Contiguous slices mean ``offset + local position`` is the
+global KB position, so ties break in KB order exactly as in one process.
+
+BM25 and fuzzy scoring depend on the whole KB (idf, average length, the
+vocabulary typos are matched against). Each shard reports ``CorpusStats``
+for its slice, and the parent sends back the merged stats that every shard
+builds its scorer from, so scores also match one process.
+"""
+
+import heapq
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from agent.kb_scoring import CorpusStats
+    from agent.kb_search import KnowledgeBaseSearch
+
+ShardHit = Tuple[float, int, Dict[str, object]]
+
+_SHARD: Optional["KnowledgeBaseSearch"] = None
+
+
+class ShardedIndexClosed(RuntimeError):
+    """Raised by lookups on a ``ShardedIndex`` that has been closed."""
+
+
+def _init_shard(entries: List[Dict[str, object]]) -> None:
+    """Tokenize and index a slice; scorers come later from ``_shard_use_scoring``."""
+    global _SHARD
+    from agent.kb_search import KnowledgeBaseSearch
+
+    _SHARD = KnowledgeBaseSearch(entries=entries)
+
+
+def _shard_corpus_stats() -> "CorpusStats":
+    from agent.kb_scoring import CorpusStats
+
+    assert _SHARD is not None, "shard not initialised"
+    return CorpusStats.from_tokens(_SHARD._index.entry_tokens)
+
+
+def _shard_use_scoring(scoring: str, corpus: "CorpusStats") -> None:
+    from agent.kb_search import _KBIndex
+
+    assert _SHARD is not None, "shard not initialised"
+    index = _SHARD._index
+    _SHARD.scoring = scoring
+    _SHARD._index = _KBIndex(index.entries, index.entry_tokens, scoring, corpus)
+
+
+def _shard_size() -> int:
+    assert _SHARD is not None, "shard not initialised"
+    return len(_SHARD.kb)
+
+
+def _shard_rank_many(descriptions: Sequence[str], limit: int) -> List[List[ShardHit]]:
+    assert _SHARD is not None, "shard not initialised"
+    return _SHARD.ranked_hits(descriptions, limit)
+
+
+class ShardedIndex:
+    """Partition ``entries`` across ``shards`` processes and merge their top-k."""
+
+    def __init__(self, entries: Sequence[Dict[str, object]], shards: int, scoring: str = "jaccard") -> None:
+        self.entries = list(entries)
+        size = -(-len(self.entries) // shards) if self.entries else 0
+        self._offsets: List[int] = []
+        self._pools: List[ProcessPoolExecutor] = []
+        # Lookups in flight, so close(wait=True) can drain them first.
+        self._state = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+        # spawn, not fork: the API process runs threads (watcher, to_thread).
+        context = multiprocessing.get_context("spawn")
+        for start in range(0, len(self.entries), size or 1):
+            self._offsets.append(start)
+            self._pools.append(
+                ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=context,
+                    initializer=_init_shard,
+                    initargs=(self.entries[start : start + size],),
+                )
+            )
+        # Build every shard now so the first query is not the one paying for it.
+        for pool in self._pools:
+            pool.submit(_shard_size).result()
+        if scoring != "jaccard" and self._pools:
+            shard_stats = [pool.submit(_shard_corpus_stats) for pool in self._pools]
+            corpus = sum((future.result() for future in shard_stats[1:]), shard_stats[0].result())
+            for future in [pool.submit(_shard_use_scoring, scoring, corpus) for pool in self._pools]:
+                future.result()
+
+    def __len__(self) -> int:
+        return len(self._pools)
+
+    def lookup(self, description: str, limit: int) -> List[Dict[str, object]]:
+        return self.lookup_many([description], limit)[0]
+
+    def lookup_many(self, descriptions: Sequence[str], limit: int) -> List[List[Dict[str, object]]]:
+        """Scatter the whole batch to every shard, then merge per description."""
+        with self._state:
+            if self._closed:
+                raise ShardedIndexClosed("sharded KB index is closed")
+            self._in_flight += 1
+        try:
+            if not self._pools:
+                return [[] for _ in descriptions]
+            texts = list(descriptions)
+            futures = [pool.submit(_shard_rank_many, texts, limit) for pool in self._pools]
+            per_shard = [future.result() for future in futures]
+        finally:
+            with self._state:
+                self._in_flight -= 1
+                self._state.notify_all()
+        merged: List[List[Dict[str, object]]] = []
+        for slot in range(len(texts)):
+            candidates = [
+                (similarity, offset + position, hit)
+                for offset, ranked in zip(self._offsets, per_shard)
+                for similarity, position, hit in ranked[slot]
+            ]
+            top = heapq.nsmallest(limit, candidates, key=lambda item: (-item[0], item[1]))
+            merged.append([hit for _, _, hit in top])
+        return merged
+
+    def close(self, wait: bool = False) -> None:
+        """Refuse new lookups; with ``wait``, let running ones finish before shutdown."""
+        with self._state:
+            self._closed = True
+            if wait:
+                self._state.wait_for(lambda: not self._in_flight)
+        for pool in self._pools:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,85 @@
+"""Single-pass multi-pattern substring matching.
+
+``MultiPatternMatcher`` answers "which of these patterns occur anywhere in
+the text" with one scan, replacing loops of ``pattern in text`` checks. The
+patterns are folded into a trie and the trie is compiled into one regular
+expression, so the scan runs inside the C regex engine rather than a
+per-character Python loop (which measured slower than the loops it would
+replace for ticket-sized texts).
+
+At every position of the text a lookahead reports the longest pattern that
+starts there. Any other pattern occurring at that position is a prefix of
+it, and any pattern occurring inside it is one of its substrings; both are
+precomputed per pattern (``_implied``), so expanding the reported matches
+yields exactly the set of patterns that ``pattern in text`` would find.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+_END = ""
+
+
+class MultiPatternMatcher:
+    """Find every pattern that occurs in a text in one pass."""
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: FrozenSet[str] = frozenset(pattern for pattern in patterns if pattern)
+        self._trie: Dict[str, dict] = {}
+        for pattern in self.patterns:
+            node = self._trie
+            for char in pattern:
+                node = node.setdefault(char, {})
+            node[_END] = {}
+        self._regex = re.compile(f"(?=({self._trie_pattern(self._trie)}))", re.DOTALL) if self.patterns else None
+        # pattern -> the other patterns it contains; only non-empty entries
+        # are stored, which keeps ``find`` cheap for prefix-free keyword sets.
+        self._implied: Dict[str, FrozenSet[str]] = {}
+        # Shorter patterns first, so every substring's closure is ready.
+        for pattern in sorted(self.patterns, key=len):
+            implied: Set[str] = set(self._prefixes(pattern))
+            implied |= self._longest_matches(pattern, start=1)
+            for contained in list(implied):
+                implied |= self._implied.get(contained, frozenset())
+            if implied:
+                self._implied[pattern] = frozenset(implied)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def find(self, text: str) -> Set[str]:
+        """Return every pattern that is a substring of ``text``."""
+        found = self._longest_matches(text)
+        if self._implied:
+            for match in list(found):
+                contained = self._implied.get(match)
+                if contained is not None:
+                    found |= contained
+        return found
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+    def _longest_matches(self, text: str, start: int = 0) -> Set[str]:
+        if self._regex is None:
+            return set()
+        return set(self._regex.findall(text, start))
+
+    def _prefixes(self, pattern: str) -> List[str]:
+        """Patterns that are proper prefixes of ``pattern``."""
+        prefixes: List[str] = []
+        node = self._trie
+        for length, char in enumerate(pattern[:-1], start=1):
+            node = node[char]
+            if _END in node:
+                prefixes.append(pattern[:length])
+        return prefixes
+
+    def _trie_pattern(self, node: Dict[str, dict]) -> str:
+        # Children are tried before the end marker, so each position yields
+        # its longest pattern (regex alternation is ordered, not longest-match).
+        branches = [re.escape(char) + self._trie_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if _END in node else body
@@ -0,0 +1,152 @@
+"""Sampling stack profiler for on-demand request profiling.
+
+``StackProfiler`` runs a daemon thread that, while at least one profiled
+request is in flight, snapshots every thread's Python stack through
+``sys._current_frames()`` each ``interval`` seconds. Stacks are folded into
+``thread;outer;...;inner`` strings and counted in ``bucket_seconds`` buckets,
+so ``collapsed()`` can render the last ``window_seconds`` in the collapsed
+format read by flamegraph.pl and speedscope.
+
+Sampling is statistical: it sees whatever runs while a profiled request is
+active, including other requests on the same event loop. Threads parked in a
+``threading``/``queue``/``selectors`` wait or an idle thread-pool worker are
+skipped so idle pools and the event loop's poll do not dominate the output.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from agent.metrics import REGISTRY
+
+PROFILED_REQUESTS = REGISTRY.counter(
+    "triage_profiled_requests_total",
+    "Requests profiled by the sampling profiler; trigger is sample or header.",
+    ("trigger",),
+)
+
+_IDLE_MODULES = frozenset({"threading.py", "queue.py", "selectors.py"})
+# Leaf frames that block in C: a ThreadPoolExecutor worker waiting for work.
+_IDLE_FRAMES = frozenset({("thread.py", "_worker")})
+
+
+def _frame_name(code) -> str:
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{os.path.basename(code.co_filename)}:{name}"
+
+
+class StackProfiler:
+    """Aggregate sampled stacks over a rolling time window."""
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        window_seconds: float = 300.0,
+        bucket_seconds: float = 10.0,
+        max_depth: int = 128,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.interval = interval
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.max_depth = max_depth
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._active = 0
+        self._thread: Optional[threading.Thread] = None
+        # (bucket start, stack -> samples), oldest first.
+        self._buckets: Deque[Tuple[float, Counter]] = deque()
+        self._requests = 0
+
+    @contextmanager
+    def profile(self, trigger: str = "sample") -> Iterator[None]:
+        """Sample all threads while the ``with`` block runs."""
+        PROFILED_REQUESTS.inc(trigger=trigger)
+        with self._lock:
+            self._active += 1
+            self._requests += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="stack-profiler", daemon=True)
+                self._thread.start()
+            self._wake.notify()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def sample(self) -> None:
+        """Take one snapshot of every other thread's stack."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == own or self._idle(frame):
+                continue
+            parts = []
+            while frame is not None and len(parts) < self.max_depth:
+                parts.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            parts.append(names.get(ident, f"thread-{ident}"))
+            stacks.append(";".join(reversed(parts)))
+        if not stacks:
+            return
+        now = self._clock()
+        start = now - now % self.bucket_seconds
+        with self._lock:
+            if not self._buckets or self._buckets[-1][0] != start:
+                self._buckets.append((start, Counter()))
+            self._buckets[-1][1].update(stacks)
+            self._expire(now)
+
+    def collapsed(self) -> str:
+        """``stack count`` lines for the current window, most sampled first."""
+        totals: Counter = Counter()
+        with self._lock:
+            self._expire(self._clock())
+            for _, counts in self._buckets:
+                totals.update(counts)
+        return "".join(f"{stack} {count}\n" for stack, count in totals.most_common())
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            self._expire(self._clock())
+            samples = sum(sum(counts.values()) for _, counts in self._buckets)
+            return {
+                "active_requests": self._active,
+                "profiled_requests": self._requests,
+                "samples": samples,
+                "window_seconds": self.window_seconds,
+                "interval": self.interval,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+    def _expire(self, now: float) -> None:
+        """Drop buckets that ended before the window; call with ``_lock`` held."""
+        while self._buckets and self._buckets[0][0] + self.bucket_seconds <= now - self.window_seconds:
+            self._buckets.popleft()
+
+    def _idle(self, frame) -> bool:
+        module = os.path.basename(frame.f_code.co_filename)
+        return module in _IDLE_MODULES or (module, frame.f_code.co_name) in _IDLE_FRAMES
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                # Park until a profiled request starts; the thread costs
+                # nothing while nobody is being profiled.
+                while not self._active:
+                    self._wake.wait()
+            self.sample()
+            time.sleep(self.interval)
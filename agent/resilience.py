@@ -0,0 +1,188 @@
+"""Circuit breaker and hedged-call helpers for outbound LLM requests."""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from agent.metrics import REGISTRY
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = REGISTRY.gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state (0=closed, 1=half_open, 2=open).",
+    ("breaker",),
+)
+CIRCUIT_TRANSITIONS = REGISTRY.counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state transitions.",
+    ("breaker", "state"),
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider while its breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with half-open probing.
+
+    ``failure_threshold`` consecutive failures open the circuit. After
+    ``reset_timeout`` seconds up to ``half_open_max_calls`` probe calls are
+    let through; a successful probe closes the circuit, a failed one opens
+    it again.
+    """
+
+    def __init__(
+        self,
+        name: str = "groq",
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.logger = logging.getLogger(__name__)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        CIRCUIT_STATE.set(_STATE_CODES[CLOSED], breaker=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._opened_at = self._clock()
+                self._transition(OPEN)
+                return
+            self._failures += 1
+            if self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                self._transition(OPEN)
+
+    def release(self) -> None:
+        """Free a half-open probe slot for a call that ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            self._maybe_half_open()
+            return {"name": self.name, "state": self._state, "consecutive_failures": self._failures}
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._probes_in_flight = 0
+            self._transition(HALF_OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        self.logger.warning("Circuit breaker %s: %s -> %s", self.name, self._state, state)
+        self._state = state
+        CIRCUIT_STATE.set(_STATE_CODES[state], breaker=self.name)
+        CIRCUIT_TRANSITIONS.inc(breaker=self.name, state=state)
+
+
+def hedged_call(
+    call: Callable[[], T], executor: ThreadPoolExecutor, hedge_delay: float, budget: float
+) -> T:
+    """Run ``call``; if it has not finished after ``hedge_delay`` start a second copy.
+
+    Returns the first successful result. Raises ``TimeoutError`` when neither
+    attempt succeeds within ``budget`` seconds, or the last error otherwise.
+    """
+    deadline = time.monotonic() + budget
+    attempts = [executor.submit(call)]
+    done, _ = wait(attempts, timeout=min(hedge_delay, budget))
+    if not done:
+        attempts.append(executor.submit(call))
+    return _first_success(attempts, deadline)
+
+
+def _first_success(attempts: "list[Future[T]]", deadline: float) -> T:
+    pending = set(attempts)
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            for future in pending:
+                future.cancel()
+            raise TimeoutError("LLM call exceeded its latency budget")
+        for future in done:
+            if future.exception() is None:
+                for other in pending:
+                    other.cancel()
+                return future.result()
+            error = future.exception()
+    assert error is not None
+    raise error
+
+
+async def hedged_call_async(
+    call: Callable[[], Awaitable[T]], hedge_delay: Optional[float], budget: float
+) -> T:
+    """Async counterpart of ``hedged_call``; ``hedge_delay=None`` disables hedging."""
+    deadline = time.monotonic() + budget
+    attempts = [asyncio.ensure_future(call())]
+    try:
+        if hedge_delay is not None:
+            done, _ = await asyncio.wait(attempts, timeout=min(hedge_delay, budget))
+            if not done:
+                attempts.append(asyncio.ensure_future(call()))
+        pending = set(attempts)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=max(0.0, deadline - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                raise TimeoutError("LLM call exceeded its latency budget")
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        for task in attempts:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_description(text: str) -> str:
+    """Case- and whitespace-insensitive form used for cache keys."""
+    return _WHITESPACE.sub(" ", text.strip().lower())
+
+
+# Disk rows are trimmed back to the cap every this many writes (and on open).
+_PRUNE_EVERY = 256
+
+
+class ResponseCache:
+    """Bounded LRU cache with TTL expiry and an optional SQLite tier.
+
+    Values must be JSON-serializable. The in-memory tier is checked first;
+    on a miss the SQLite tier (if configured) is consulted and a hit is
+    promoted back into memory with its stored expiry. The SQLite tier holds
+    at most ``max_disk_entries`` rows; expired rows and the rows closest to
+    expiry are pruned. ``aget``/``aset`` run the SQLite I/O in a worker
+    thread so async callers never block the event loop on disk.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_seconds: float = 3600.0,
+        sqlite_path: Optional[Path] = None,
+        clock: Callable[[], float] = time.time,
+        max_disk_entries: int = 100_000,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if max_disk_entries < 1:
+            raise ValueError("max_disk_entries must be at least 1")
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger(__name__)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Serializes use of the shared SQLite connection; never held together
+        # with ``_lock`` so memory hits do not wait on disk I/O.
+        self._db_lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_writes = 0
+        if sqlite_path is not None:
+            self._db = self._open_db(Path(sqlite_path))
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        digest = hashlib.sha256("\x1f".join(parts).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[object]:
+        found, value = self._memory_get(key)
+        if found:
+            return value
+        return self._promote(key, self._db_get(key))
+
+    async def aget(self, key: str) -> Optional[object]:
+        """``get`` with the SQLite lookup run off the event loop."""
+        found, value = self._memory_get(key)
+        if found:
+            return value
+        row = await asyncio.to_thread(self._db_get, key) if self._db is not None else None
+        return self._promote(key, row)
+
+    def set(self, key: str, value: object) -> None:
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self._db is not None:
+            self._db_set(key, value, expires_at)
+
+    async def aset(self, key: str, value: object) -> None:
+        """``set`` with the SQLite write run off the event loop."""
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self._db is not None:
+            await asyncio.to_thread(self._db_set, key, value, expires_at)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, "size": len(self._memory)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+    def _memory_get(self, key: str) -> Tuple[bool, Optional[object]]:
+        """Return ``(True, value)`` on a live memory hit; without SQLite a miss is final."""
+        now = self._clock()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return True, value
+                del self._memory[key]
+            if self._db is None:
+                self._counters["misses"] += 1
+                return True, None
+        return False, None
+
+    def _promote(self, key: str, row: Optional[Tuple[float, object]]) -> Optional[object]:
+        with self._lock:
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            expires_at, value = row
+            self._remember(key, value, expires_at)
+            self._counters["hits"] += 1
+            self._counters["disk_hits"] += 1
+            return value
+
+    def _remember(self, key: str, value: object, expires_at: float) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _open_db(self, path: Path) -> sqlite3.Connection:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(path), check_same_thread=False)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS llm_cache_expires_at ON llm_cache (expires_at)")
+        self._prune(db)
+        db.commit()
+        return db
+
+    def _prune(self, db: sqlite3.Connection) -> None:
+        """Delete expired rows, then the soonest-to-expire rows beyond the cap."""
+        db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (self._clock(),))
+        db.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+
+    def _db_get(self, key: str) -> Optional[Tuple[float, object]]:
+        """Return ``(expires_at, value)`` for a live SQLite row."""
+        if self._db is None:
+            return None
+        now = self._clock()
+        with self._db_lock:
+            try:
+                row = self._db.execute(
+                    "SELECT expires_at, value FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[0] <= now:
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                    return None
+            except sqlite3.Error as exc:
+                self.logger.warning("LLM cache read failed: %s", exc)
+                return None
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _db_set(self, key: str, value: object, expires_at: float) -> None:
+        with self._db_lock:
+            try:
+                self._db.execute(  # type: ignore[union-attr]
+                    "INSERT OR REPLACE INTO llm_cache (key, expires_at, value) VALUES (?, ?, ?)",
+                    (key, expires_at, json.dumps(value)),
+                )
+                self._disk_writes += 1
+                if self._disk_writes % _PRUNE_EVERY == 0:
+                    self._prune(self._db)  # type: ignore[arg-type]
+                self._db.commit()  # type: ignore[union-attr]
+            except sqlite3.Error as exc:
+                self.logger.warning("LLM cache write failed: %s", exc)
@@ -1,5 +1,10 @@
 import re
-from typing import Dict
+from typing import Dict, Set
+
+from agent.multipattern import MultiPatternMatcher
+
+SUMMARY_MAX_CHARS = 160
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
 
 
 class RulesClassifier:
@@ -20,32 +25,41 @@ class RulesClassifier:
         "Low": ("typo", "cosmetic", "question", "minor"),
     }
 
+    def __init__(self) -> None:
+        # One matcher over every keyword: a ticket is scanned once and the
+        # precedence order is applied to the set of keywords found.
+        self._matcher = MultiPatternMatcher(
+            [keyword for keywords in self.CATEGORY_KEYWORDS.values() for keyword in keywords]
+            + [keyword for keywords in self.SEVERITY_KEYWORDS.values() for keyword in keywords]
+            + ["bug", "error"]
+        )
+
     def classify(self, description: str) -> Dict[str, str]:
         normalized = description.strip()
         summary = self._build_summary(normalized)
-        lower_text = normalized.lower()
+        found = self._matcher.find(normalized.lower())
 
-        category = self._detect_category(lower_text)
-        severity = self._detect_severity(lower_text)
+        category = self._detect_category(found)
+        severity = self._detect_severity(found)
 
         return {"summary": summary, "category": category, "severity": severity}
 
     def _build_summary(self, text: str) -> str:
-        sentences = re.split(r"(?<=[.!?])\s+", text)
-        first_sentence = sentences[0] if sentences else text
-        return first_sentence[:160]
+        # Only the head of the text can end up in the summary, so look for the
+        # first sentence break there instead of splitting the whole ticket.
+        match = _SENTENCE_BREAK.search(text, 0, SUMMARY_MAX_CHARS + 1)
+        return text[: match.start() if match else SUMMARY_MAX_CHARS]
 
-    def _detect_category(self, lower_text: str) -> str:
+    def _detect_category(self, found: Set[str]) -> str:
         for category, keywords in self.CATEGORY_KEYWORDS.items():
-            if any(keyword in lower_text for keyword in keywords):
+            if not found.isdisjoint(keywords):
                 return category
-        if "bug" in lower_text or "error" in lower_text:
+        if "bug" in found or "error" in found:
             return "Bug"
         return "Other"
 
-    def _detect_severity(self, lower_text: str) -> str:
+    def _detect_severity(self, found: Set[str]) -> str:
         for severity in ("Critical", "High", "Medium", "Low"):
-            keywords = self.SEVERITY_KEYWORDS[severity]
-            if any(keyword in lower_text for keyword in keywords):
+            if not found.isdisjoint(self.SEVERITY_KEYWORDS[severity]):
                 return severity
         return "Medium"
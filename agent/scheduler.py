@@ -0,0 +1,242 @@
+"""Severity-aware admission control for outbound Groq calls.
+
+``GroqScheduler`` sits in front of every completion request. Calls queue by
+the rules-estimated ticket severity (Critical first, FIFO within a level) and
+are released only while the request and token buckets sized to the Groq
+quota have capacity. Each severity has its own maximum queue wait, and once
+the queue is saturated Medium/Low work is shed immediately; either way the
+caller falls back to the rules engine instead of waiting on the LLM.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from agent.metrics import REGISTRY
+
+SEVERITY_PRIORITY = {"Critical": 0, "High": 1, "Medium": 2, "Low": 3}
+DEFAULT_MAX_WAIT = {"Critical": 10.0, "High": 5.0, "Medium": 1.0, "Low": 0.25}
+
+SCHEDULER_DECISIONS = REGISTRY.counter(
+    "groq_scheduler_decisions_total",
+    "Groq admission decisions by severity (admitted, timeout or shed).",
+    ("severity", "outcome"),
+)
+SCHEDULER_WAIT_SECONDS = REGISTRY.histogram(
+    "groq_scheduler_wait_seconds",
+    "Time Groq calls spent queued before admission.",
+    ("severity",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+SCHEDULER_QUEUE_DEPTH = REGISTRY.gauge(
+    "groq_scheduler_queue_depth",
+    "Groq calls currently waiting for admission.",
+)
+
+
+class RateLimitedError(RuntimeError):
+    """Raised instead of calling Groq when the scheduler does not admit a call."""
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic) -> None:
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def available(self) -> float:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return self._tokens
+
+    def take(self, amount: float) -> None:
+        self._tokens -= amount
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 when they already are)."""
+        # Requests larger than the bucket are admitted once it is full.
+        missing = min(amount, self.capacity) - self.available()
+        return max(0.0, missing / self.rate)
+
+
+class _Waiter:
+    __slots__ = ("rank", "seq", "severity", "cost", "granted", "abandoned", "event", "future", "loop")
+
+    def __init__(self, rank: int, seq: int, severity: str, cost: float) -> None:
+        self.rank = rank
+        self.seq = seq
+        self.severity = severity
+        self.cost = cost
+        self.granted = False
+        self.abandoned = False
+        self.event: Optional[threading.Event] = None
+        self.future: "Optional[asyncio.Future[None]]" = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.rank, self.seq) < (other.rank, other.seq)
+
+    def wake(self) -> None:
+        if self.event is not None:
+            self.event.set()
+        elif self.loop is not None and self.future is not None:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class GroqScheduler:
+    """Priority queue plus request/token buckets in front of Groq.
+
+    ``requests_per_minute`` and the optional ``tokens_per_minute`` mirror the
+    Groq quota; ``max_queue`` is the depth at which the queue counts as
+    saturated and severities at or below ``shed_from`` are rejected outright.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: Optional[float] = None,
+        max_queue: int = 64,
+        max_wait: Optional[Dict[str, float]] = None,
+        shed_from: str = "Medium",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_queue = max_queue
+        self.max_wait = {**DEFAULT_MAX_WAIT, **(max_wait or {})}
+        self.shed_rank = SEVERITY_PRIORITY[shed_from]
+        self._clock = clock
+        self._requests = TokenBucket(requests_per_minute / 60.0, max(1.0, requests_per_minute / 60.0), clock)
+        self._tokens = (
+            TokenBucket(tokens_per_minute / 60.0, max(1.0, tokens_per_minute / 60.0), clock)
+            if tokens_per_minute
+            else None
+        )
+        self._lock = threading.Lock()
+        self._queue: List[_Waiter] = []
+        self._queued = 0
+        self._sequence = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def acquire(self, severity: str, cost: float = 0.0) -> bool:
+        """Block until the call is admitted; ``False`` if it timed out or was shed."""
+        waiter = self._enqueue(severity, cost)
+        if waiter is None:
+            return False
+        waiter.event = threading.Event()
+        started = self._clock()
+        deadline = started + self.max_wait.get(waiter.severity, 0.0)
+        while True:
+            retry_in = self._dispatch()
+            if waiter.granted:
+                return self._admitted(waiter, started)
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                return self._give_up(waiter, started)
+            waiter.event.wait(min(remaining, retry_in) if retry_in is not None else remaining)
+            waiter.event.clear()
+
+    async def acquire_async(self, severity: str, cost: float = 0.0) -> bool:
+        """Async counterpart of ``acquire``; waits without blocking the event loop."""
+        waiter = self._enqueue(severity, cost)
+        if waiter is None:
+            return False
+        waiter.loop = asyncio.get_running_loop()
+        started = self._clock()
+        deadline = started + self.max_wait.get(waiter.severity, 0.0)
+        while True:
+            waiter.future = waiter.loop.create_future()
+            retry_in = self._dispatch()
+            if waiter.granted:
+                return self._admitted(waiter, started)
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                return self._give_up(waiter, started)
+            timeout = min(remaining, retry_in) if retry_in is not None else remaining
+            await asyncio.wait({waiter.future}, timeout=timeout)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "queued": self._queued,
+                "request_tokens": round(self._requests.available(), 3),
+                "llm_tokens": round(self._tokens.available(), 3) if self._tokens is not None else None,
+            }
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+    def _enqueue(self, severity: str, cost: float) -> Optional[_Waiter]:
+        severity = severity if severity in SEVERITY_PRIORITY else "Medium"
+        rank = SEVERITY_PRIORITY[severity]
+        with self._lock:
+            if self._queued >= self.max_queue and rank >= self.shed_rank:
+                SCHEDULER_DECISIONS.inc(severity=severity, outcome="shed")
+                return None
+            waiter = _Waiter(rank, next(self._sequence), severity, cost)
+            heapq.heappush(self._queue, waiter)
+            self._queued += 1
+            SCHEDULER_QUEUE_DEPTH.set(self._queued)
+        return waiter
+
+    def _dispatch(self) -> Optional[float]:
+        """Admit queued calls in priority order while the buckets allow.
+
+        Returns the seconds until the head of the queue could be admitted, or
+        ``None`` when the queue is empty.
+        """
+        with self._lock:
+            while self._queue:
+                head = self._queue[0]
+                if head.abandoned:
+                    heapq.heappop(self._queue)
+                    continue
+                wait = self._requests.wait_time(1.0)
+                if self._tokens is not None and head.cost:
+                    wait = max(wait, self._tokens.wait_time(head.cost))
+                if wait > 0:
+                    return wait
+                heapq.heappop(self._queue)
+                self._queued -= 1
+                SCHEDULER_QUEUE_DEPTH.set(self._queued)
+                self._requests.take(1.0)
+                if self._tokens is not None and head.cost:
+                    self._tokens.take(head.cost)
+                head.granted = True
+                head.wake()
+            return None
+
+    def _give_up(self, waiter: _Waiter, started: float) -> bool:
+        with self._lock:
+            if not waiter.granted:
+                waiter.abandoned = True
+                self._queued -= 1
+                SCHEDULER_QUEUE_DEPTH.set(self._queued)
+        if waiter.granted:  # admitted between the deadline check and the lock
+            return self._admitted(waiter, started)
+        # The abandoned head may have been blocking cheaper calls behind it.
+        self._dispatch()
+        SCHEDULER_DECISIONS.inc(severity=waiter.severity, outcome="timeout")
+        return False
+
+    def _admitted(self, waiter: _Waiter, started: float) -> bool:
+        SCHEDULER_WAIT_SECONDS.observe(self._clock() - started, severity=waiter.severity)
+        SCHEDULER_DECISIONS.inc(severity=waiter.severity, outcome="admitted")
+        return True
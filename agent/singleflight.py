@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Tuple, TypeVar
+
+from agent.metrics import REGISTRY
+
+T = TypeVar("T")
+
+SINGLE_FLIGHT_CALLS = REGISTRY.counter(
+    "triage_single_flight_calls_total",
+    "Calls through single-flight coalescing; role is leader (ran the work) or follower (shared it).",
+    ("path", "role"),
+)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: object = None
+        self.error: "BaseException | None" = None
+
+
+class SingleFlight:
+    """Share one in-flight computation between concurrent callers with the same key.
+
+    The first caller for a key (the leader) runs the work; callers arriving
+    while it is running (followers) wait for and receive the same result or
+    exception. Nothing is kept once the call finishes, so this only merges
+    requests that overlap in time. Threads and each event loop coalesce
+    separately.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: Dict[Tuple[asyncio.AbstractEventLoop, str], "asyncio.Task[object]"] = {}
+        self._counts = {"leaders": 0, "followers": 0}
+
+    def do(self, key: str, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """Run ``fn`` once per concurrent ``key``; returns ``(result, shared)``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._count("sync", leader)
+        assert call is not None  # narrow type
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True  # type: ignore[return-value]
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False  # type: ignore[return-value]
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Async counterpart of ``do``.
+
+        The work runs in its own task, so a cancelled caller (e.g. a client
+        that disconnected) does not cancel it for the others.
+        """
+        loop = asyncio.get_running_loop()
+        slot = (loop, key)
+        with self._lock:
+            task = self._tasks.get(slot)
+            leader = task is None
+            if leader:
+                task = self._tasks[slot] = loop.create_task(fn())  # type: ignore[arg-type]
+                task.add_done_callback(lambda _: self._forget(slot))
+            self._count("async", leader)
+        assert task is not None  # narrow type
+        return await asyncio.shield(task), not leader  # type: ignore[return-value]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counts, "in_flight": len(self._calls) + len(self._tasks)}
+
+    def _forget(self, slot: Tuple[asyncio.AbstractEventLoop, str]) -> None:
+        with self._lock:
+            self._tasks.pop(slot, None)
+
+    def _count(self, path: str, leader: bool) -> None:
+        role = "leader" if leader else "follower"
+        self._counts[f"{role}s"] += 1
+        SINGLE_FLIGHT_CALLS.inc(path=path, role=role)
@@ -1,8 +1,15 @@
+import asyncio
 import logging
-from typing import Dict, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
 
+from agent.dedup import NearDuplicateIndex
 from agent.groq_client import GroqAssistant
-from agent.kb_search import KnowledgeBaseSearch
+from agent.kb_search import KnowledgeBaseSearch, normalize_tokens
+from agent.metrics import TRIAGE_SECONDS, TRIAGE_STAGE_SECONDS
+from agent.response_cache import normalize_description
+from agent.singleflight import SingleFlight
 
 
 class TriageAgent:
@@ -14,32 +21,270 @@ class TriageAgent:
         kb_search: KnowledgeBaseSearch,
         match_threshold: float = 0.35,
         max_related: int = 3,
+        batch_concurrency: int = 8,
+        dedup_index: Optional[NearDuplicateIndex] = None,
+        single_flight: Optional[SingleFlight] = None,
     ) -> None:
         self.llm_client = llm_client
         self.kb_search = kb_search
         self.match_threshold = match_threshold
         self.max_related = max_related
+        self.batch_concurrency = max(1, batch_concurrency)
+        self.dedup_index = dedup_index
+        self.single_flight = single_flight
         self.logger = logging.getLogger(__name__)
 
     def triage(self, description: str) -> Dict[str, object]:
         """Primary entry point used by both FastAPI and Streamlit."""
+        clean_text = self._clean_description(description)
+        if self.single_flight is None:
+            return self._triage(clean_text)
+        result, shared = self.single_flight.do(normalize_description(clean_text), lambda: self._triage(clean_text))
+        return self._copy_result(result) if shared else result
+
+    async def triage_async(self, description: str) -> Dict[str, object]:
+        """Async pipeline: KB lookup runs in a worker thread alongside classification."""
+        clean_text = self._clean_description(description)
+        if self.single_flight is None:
+            return await self._triage_async(clean_text)
+        result, shared = await self.single_flight.do_async(
+            normalize_description(clean_text), lambda: self._triage_async(clean_text)
+        )
+        return self._copy_result(result) if shared else result
+
+    def _triage(self, clean_text: str) -> Dict[str, object]:
+        self.logger.debug("Triage started", extra={"chars": len(clean_text)})
+        tokens = normalize_tokens(clean_text)
+        duplicate = self._find_duplicate(tokens)
+        if duplicate is not None:
+            return duplicate
+        started = time.perf_counter()
+
+        if self._use_fused():
+            result = self._complete_fused(clean_text, self._lookup(clean_text))
+        else:
+            profile = self._classify(clean_text)
+            kb_hits = self._lookup(clean_text)
+            result = self._complete(clean_text, profile, kb_hits)
+        return self._remember(tokens, self._observe(started, result))
+
+    async def _triage_async(self, clean_text: str) -> Dict[str, object]:
+        self.logger.debug("Async triage started", extra={"chars": len(clean_text)})
+        tokens = normalize_tokens(clean_text)
+        duplicate = self._find_duplicate(tokens)
+        if duplicate is not None:
+            return duplicate
+        started = time.perf_counter()
+        provider = self.llm_client.provider
+
+        if self._use_fused():
+            kb_hits = await asyncio.to_thread(self._lookup, clean_text)
+            with TRIAGE_STAGE_SECONDS.time(stage="fused", provider=provider):
+                fused = await self.llm_client.triage_fused_async(clean_text, kb_hits)
+            return self._remember(tokens, self._observe(started, self._fused_result(fused, kb_hits)))
+
+        async def classify() -> Dict[str, str]:
+            with TRIAGE_STAGE_SECONDS.time(stage="classify", provider=provider):
+                return await self.llm_client.classify_ticket_async(clean_text)
+
+        profile, kb_hits = await asyncio.gather(classify(), asyncio.to_thread(self._lookup, clean_text))
+        known_issue = self._is_known_issue(kb_hits)
+
+        with TRIAGE_STAGE_SECONDS.time(stage="next_action", provider=provider):
+            if self._should_request_llm(profile["severity"]):
+                next_step = await self.llm_client.suggest_next_action_async(
+                    clean_text, profile["category"], profile["severity"], kb_hits
+                )
+            else:
+                next_step = self._fallback_action(known_issue, profile["severity"])
+
+        result = self._build_result(profile, kb_hits, known_issue, next_step)
+        return self._remember(tokens, self._observe(started, result))
+
+    async def triage_stream(self, description: str) -> AsyncIterator[Tuple[str, Dict[str, object]]]:
+        """Yield ``(event, data)`` pairs as each part of the triage becomes available.
+
+        Events arrive in order: a rules-based ``classification`` marked
+        ``provisional``, ``related_issues``, the final ``classification`` (not
+        provisional), one or more ``next_step`` deltas and finally ``result``
+        with the complete triage. The LLM classification runs while the first
+        two events are sent. A reused duplicate has its final classification
+        at hand, so it skips the provisional one. Streaming always uses the
+        two-call pipeline, even in fused mode, so the next step can be streamed
+        on its own.
+        """
+        clean_text = self._clean_description(description)
+        tokens = normalize_tokens(clean_text)
+        duplicate = self._find_duplicate(tokens)
+        if duplicate is not None:
+            yield "related_issues", {
+                "related_issues": duplicate["related_issues"],
+                "known_issue": duplicate["known_issue"],
+            }
+            yield "classification", {
+                **{key: duplicate[key] for key in ("summary", "category", "severity")},
+                "provisional": False,
+            }
+            yield "next_step", {"delta": duplicate["suggested_next_step"]}
+            yield "result", duplicate
+            return
+        started = time.perf_counter()
+        provider = self.llm_client.provider
+
+        async def classify() -> Dict[str, str]:
+            with TRIAGE_STAGE_SECONDS.time(stage="classify", provider=provider):
+                return await self.llm_client.classify_ticket_async(clean_text)
+
+        lookup = asyncio.ensure_future(asyncio.to_thread(self._lookup, clean_text))
+        classification = asyncio.ensure_future(classify())
+        try:
+            yield "classification", {**self.llm_client.rules_fallback.classify(clean_text), "provisional": True}
+            kb_hits = await lookup
+            known_issue = self._is_known_issue(kb_hits)
+            yield "related_issues", {"related_issues": kb_hits, "known_issue": known_issue}
+            profile = await classification
+        finally:
+            lookup.cancel()
+            classification.cancel()
+        yield "classification", {**profile, "provisional": False}
+
+        with TRIAGE_STAGE_SECONDS.time(stage="next_action", provider=provider):
+            if self._should_request_llm(profile["severity"]):
+                deltas: List[str] = []
+                async for delta in self.llm_client.stream_next_action_async(
+                    clean_text, profile["category"], profile["severity"], kb_hits
+                ):
+                    deltas.append(delta)
+                    yield "next_step", {"delta": delta}
+                next_step = self.llm_client.clean_next_action("".join(deltas))
+            else:
+                next_step = self._fallback_action(known_issue, profile["severity"])
+                yield "next_step", {"delta": next_step}
+
+        result = self._build_result(profile, kb_hits, known_issue, next_step)
+        yield "result", self._remember(tokens, self._observe(started, result))
+
+    async def warm_up_async(self) -> Dict[str, object]:
+        """Touch the KB index, rules and LLM connections so the first ticket is not cold."""
+        started = time.perf_counter()
+        # One throwaway lookup pages in the index (and the compiled file, if mmapped).
+        await asyncio.to_thread(self.kb_search.lookup, "warm up login checkout error", self.max_related)
+        self.llm_client.rules_fallback.classify("warm up")
+        llm_connected = await self.llm_client.warm_up_async()
+        return {"seconds": time.perf_counter() - started, "llm_connected": llm_connected}
+
+    def triage_many(
+        self, descriptions: Sequence[str], max_concurrency: Optional[int] = None
+    ) -> List[Dict[str, object]]:
+        """Triage a batch of tickets, returning one outcome per input in order.
+
+        Each outcome is ``{"index", "result", "error"}``; a ticket that fails
+        validation or processing only sets its own ``error``.
+        """
+        outcomes: List[Dict[str, object]] = [
+            {"index": index, "result": None, "error": None} for index in range(len(descriptions))
+        ]
+        pending: List[int] = []
+        clean_texts: List[str] = []
+        for index, description in enumerate(descriptions):
+            try:
+                clean_texts.append(self._clean_description(description))
+            except ValueError as exc:
+                outcomes[index]["error"] = str(exc)
+                continue
+            pending.append(index)
+
+        if not pending:
+            return outcomes
+
+        self.logger.debug("Batch triage started", extra={"tickets": len(pending)})
+        with TRIAGE_STAGE_SECONDS.time(stage="kb_lookup_batch", provider=self.llm_client.provider):
+            kb_hits = self.kb_search.lookup_many(clean_texts, limit=self.max_related)
+
+        def run(slot: int) -> Dict[str, object]:
+            if self.single_flight is None:
+                return complete(slot)
+            result, shared = self.single_flight.do(normalize_description(clean_texts[slot]), lambda: complete(slot))
+            return self._copy_result(result) if shared else result
+
+        def complete(slot: int) -> Dict[str, object]:
+            clean_text = clean_texts[slot]
+            tokens = normalize_tokens(clean_text)
+            duplicate = self._find_duplicate(tokens)
+            if duplicate is not None:
+                return duplicate
+            started = time.perf_counter()
+            if self._use_fused():
+                result = self._complete_fused(clean_text, kb_hits[slot])
+            else:
+                result = self._complete(clean_text, self._classify(clean_text), kb_hits[slot])
+            return self._remember(tokens, self._observe(started, result))
+
+        workers = min(max_concurrency or self.batch_concurrency, len(pending))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="triage-batch") as pool:
+            futures = [pool.submit(run, slot) for slot in range(len(pending))]
+            for index, future in zip(pending, futures):
+                try:
+                    outcomes[index]["result"] = future.result()
+                except ValueError as exc:
+                    outcomes[index]["error"] = str(exc)
+                except Exception:  # noqa: BLE001 - isolate failures per ticket
+                    self.logger.exception("Batch triage item %s failed", index)
+                    outcomes[index]["error"] = "Triage failed"
+        return outcomes
+
+    # ------------------------------------------------------------------ #
+    # Helpers
+    # ------------------------------------------------------------------ #
+    def _clean_description(self, description: str) -> str:
         clean_text = description.strip()
         if len(clean_text) < 10:
             raise ValueError("Description must be at least 10 characters long")
+        return clean_text
 
-        self.logger.debug("Triage started", extra={"chars": len(clean_text)})
+    def _complete(
+        self, clean_text: str, profile: Dict[str, str], kb_hits: List[Dict[str, object]]
+    ) -> Dict[str, object]:
+        """Derive known-issue status and next step from classification + KB hits."""
+        known_issue = self._is_known_issue(kb_hits)
 
-        profile = self.llm_client.classify_ticket(clean_text)
-        kb_hits = self.kb_search.lookup(clean_text, limit=self.max_related)
-        known_issue = bool(kb_hits) and kb_hits[0]["similarity"] >= self.match_threshold
+        with TRIAGE_STAGE_SECONDS.time(stage="next_action", provider=self.llm_client.provider):
+            if self._should_request_llm(profile["severity"]):
+                next_step = self.llm_client.suggest_next_action(
+                    clean_text, profile["category"], profile["severity"], kb_hits
+                )
+            else:
+                next_step = self._fallback_action(known_issue, profile["severity"])
 
-        if self._should_request_llm(profile["severity"]):
-            next_step = self.llm_client.suggest_next_action(
-                clean_text, profile["category"], profile["severity"], kb_hits
-            )
-        else:
-            next_step = self._fallback_action(known_issue, profile["severity"])
+        return self._build_result(profile, kb_hits, known_issue, next_step)
+
+    def _classify(self, clean_text: str) -> Dict[str, str]:
+        with TRIAGE_STAGE_SECONDS.time(stage="classify", provider=self.llm_client.provider):
+            return self.llm_client.classify_ticket(clean_text)
+
+    def _lookup(self, clean_text: str) -> List[Dict[str, object]]:
+        with TRIAGE_STAGE_SECONDS.time(stage="kb_lookup", provider=self.llm_client.provider):
+            return self.kb_search.lookup(clean_text, limit=self.max_related)
+
+    def _observe(self, started: float, result: Dict[str, object]) -> Dict[str, object]:
+        TRIAGE_SECONDS.observe(
+            time.perf_counter() - started,
+            provider=self.llm_client.provider,
+            category=str(result["category"]),
+            severity=str(result["severity"]),
+        )
+        return result
 
+    def _is_known_issue(self, kb_hits: List[Dict[str, object]]) -> bool:
+        return bool(kb_hits) and kb_hits[0]["similarity"] >= self.match_threshold
+
+    def _build_result(
+        self,
+        profile: Dict[str, str],
+        kb_hits: List[Dict[str, object]],
+        known_issue: bool,
+        next_step: str,
+    ) -> Dict[str, object]:
         return {
             **profile,
             "related_issues": kb_hits,
@@ -47,9 +292,38 @@ class TriageAgent:
             "suggested_next_step": next_step,
         }
 
-    # ------------------------------------------------------------------ #
-    # Helpers
-    # ------------------------------------------------------------------ #
+    def _find_duplicate(self, tokens: Set[str]) -> Optional[Dict[str, object]]:
+        """Return a copy of a recent near-identical ticket's result, if any."""
+        if self.dedup_index is None:
+            return None
+        stored = self.dedup_index.find(tokens)
+        if stored is None:
+            return None
+        self.logger.debug("Reusing triage result of a near-duplicate ticket")
+        return self._copy_result(stored)
+
+    def _remember(self, tokens: Set[str], result: Dict[str, object]) -> Dict[str, object]:
+        if self.dedup_index is not None:
+            self.dedup_index.add(tokens, self._copy_result(result))
+        return result
+
+    def _copy_result(self, result: Dict[str, object]) -> Dict[str, object]:
+        related = result["related_issues"]
+        return {**result, "related_issues": [dict(hit) for hit in related]}  # type: ignore[union-attr]
+
+    def _use_fused(self) -> bool:
+        return self.llm_client.provider == "groq" and getattr(self.llm_client, "fused", False)
+
+    def _complete_fused(self, clean_text: str, kb_hits: List[Dict[str, object]]) -> Dict[str, object]:
+        """One LLM round-trip for classification and next step, grounded on KB hits."""
+        with TRIAGE_STAGE_SECONDS.time(stage="fused", provider=self.llm_client.provider):
+            fused = self.llm_client.triage_fused(clean_text, kb_hits)
+        return self._fused_result(fused, kb_hits)
+
+    def _fused_result(self, fused: Dict[str, str], kb_hits: List[Dict[str, object]]) -> Dict[str, object]:
+        profile = {key: fused[key] for key in ("summary", "category", "severity")}
+        return self._build_result(profile, kb_hits, self._is_known_issue(kb_hits), fused["suggested_next_step"])
+
     def _should_request_llm(self, severity: str) -> bool:
         """LLM handles High/Critical tickets or whenever Groq mode is enabled."""
         return self.llm_client.provider == "groq" or severity in {"High", "Critical"}
@@ -1,6 +1,6 @@
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic import BaseSettings, Field
 
@@ -10,11 +10,49 @@ class Settings(BaseSettings):
 
     app_name: str = Field("Support Triage Agent", env="APP_NAME")
     environment: str = Field("development", env="ENVIRONMENT")
+    startup_warmup: bool = Field(True, env="STARTUP_WARMUP")
     kb_path: Path = Field(Path("kb") / "kb.json", env="KB_PATH")
+    kb_scoring: str = Field("jaccard", env="KB_SCORING")
+    kb_index_path: Optional[Path] = Field(None, env="KB_INDEX_PATH")
+    kb_shards: int = Field(1, env="KB_SHARDS")
+    kb_watch_interval_seconds: float = Field(0.0, env="KB_WATCH_INTERVAL_SECONDS")
     kb_similarity_threshold: float = Field(0.35, env="KB_SIMILARITY_THRESHOLD")
     max_related_results: int = Field(3, env="MAX_RELATED_RESULTS")
+    batch_max_size: int = Field(500, env="BATCH_MAX_SIZE")
+    batch_max_concurrency: int = Field(8, env="BATCH_MAX_CONCURRENCY")
+    jobs_db_path: Path = Field(Path("data") / "triage_jobs.sqlite3", env="JOBS_DB_PATH")
+    jobs_workers: int = Field(4, env="JOBS_WORKERS")
     llm_provider: str = Field("mock", env="LLM_PROVIDER")
     groq_api_key: Optional[str] = Field(None, env="GROQ_API_KEY")
+    groq_base_url: Optional[str] = Field(None, env="GROQ_BASE_URL")
+    groq_timeout_seconds: float = Field(10.0, env="GROQ_TIMEOUT_SECONDS")
+    groq_hedge_delay_seconds: Optional[float] = Field(None, env="GROQ_HEDGE_DELAY_SECONDS")
+    groq_fused_mode: bool = Field(False, env="GROQ_FUSED_MODE")
+    groq_rate_limit_rpm: Optional[float] = Field(None, env="GROQ_RATE_LIMIT_RPM")
+    groq_rate_limit_tpm: Optional[float] = Field(None, env="GROQ_RATE_LIMIT_TPM")
+    groq_queue_max: int = Field(64, env="GROQ_QUEUE_MAX")
+    groq_queue_max_wait: Dict[str, float] = Field(
+        {"Critical": 10.0, "High": 5.0, "Medium": 1.0, "Low": 0.25}, env="GROQ_QUEUE_MAX_WAIT"
+    )
+    groq_breaker_failure_threshold: int = Field(5, env="GROQ_BREAKER_FAILURE_THRESHOLD")
+    groq_breaker_reset_seconds: float = Field(30.0, env="GROQ_BREAKER_RESET_SECONDS")
+    groq_breaker_half_open_probes: int = Field(1, env="GROQ_BREAKER_HALF_OPEN_PROBES")
+    coalesce_enabled: bool = Field(True, env="COALESCE_ENABLED")
+    dedup_enabled: bool = Field(False, env="DEDUP_ENABLED")
+    dedup_threshold: float = Field(0.85, env="DEDUP_THRESHOLD")
+    dedup_ttl_seconds: float = Field(600.0, env="DEDUP_TTL_SECONDS")
+    dedup_max_entries: int = Field(10000, env="DEDUP_MAX_ENTRIES")
+    llm_cache_enabled: bool = Field(True, env="LLM_CACHE_ENABLED")
+    llm_cache_max_entries: int = Field(2048, env="LLM_CACHE_MAX_ENTRIES")
+    llm_cache_ttl_seconds: float = Field(3600.0, env="LLM_CACHE_TTL_SECONDS")
+    llm_cache_path: Optional[Path] = Field(None, env="LLM_CACHE_PATH")
+    llm_cache_max_disk_entries: int = Field(100_000, env="LLM_CACHE_MAX_DISK_ENTRIES")
+    profiling_enabled: bool = Field(False, env="PROFILING_ENABLED")
+    profiling_sample_rate: float = Field(0.01, env="PROFILING_SAMPLE_RATE")
+    profiling_header: str = Field("X-Triage-Profile", env="PROFILING_HEADER")
+    profiling_token: Optional[str] = Field(None, env="PROFILING_TOKEN")
+    profiling_interval_seconds: float = Field(0.005, env="PROFILING_INTERVAL_SECONDS")
+    profiling_window_seconds: float = Field(300.0, env="PROFILING_WINDOW_SECONDS")
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,82 @@
+from typing import Optional
+
+from app.config import Settings
+from agent.dedup import NearDuplicateIndex
+from agent.groq_client import GroqAssistant
+from agent.kb_search import KnowledgeBaseSearch
+from agent.resilience import CircuitBreaker
+from agent.response_cache import ResponseCache
+from agent.scheduler import GroqScheduler
+from agent.singleflight import SingleFlight
+from agent.triage_agent import TriageAgent
+
+
+def build_llm_cache(settings: Settings) -> Optional[ResponseCache]:
+    """Return the configured LLM response cache, or None when disabled."""
+    if not settings.llm_cache_enabled:
+        return None
+    return ResponseCache(
+        max_entries=settings.llm_cache_max_entries,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        sqlite_path=settings.llm_cache_path,
+        max_disk_entries=settings.llm_cache_max_disk_entries,
+    )
+
+
+def build_dedup_index(settings: Settings) -> Optional[NearDuplicateIndex]:
+    """Return the near-duplicate ticket index, or None when disabled."""
+    if not settings.dedup_enabled:
+        return None
+    return NearDuplicateIndex(
+        threshold=settings.dedup_threshold,
+        ttl_seconds=settings.dedup_ttl_seconds,
+        max_entries=settings.dedup_max_entries,
+    )
+
+
+def build_scheduler(settings: Settings) -> Optional[GroqScheduler]:
+    """Return the Groq admission scheduler, or None when no rate limit is configured."""
+    if not settings.groq_rate_limit_rpm:
+        return None
+    return GroqScheduler(
+        requests_per_minute=settings.groq_rate_limit_rpm,
+        tokens_per_minute=settings.groq_rate_limit_tpm,
+        max_queue=settings.groq_queue_max,
+        max_wait=settings.groq_queue_max_wait,
+    )
+
+
+def build_agent(settings: Settings) -> TriageAgent:
+    """Wire a TriageAgent from settings; shared by FastAPI and Streamlit."""
+    llm_client = GroqAssistant(
+        provider=settings.llm_provider,
+        api_key=settings.groq_api_key,
+        match_threshold=settings.kb_similarity_threshold,
+        cache=build_llm_cache(settings),
+        timeout=settings.groq_timeout_seconds,
+        hedge_delay=settings.groq_hedge_delay_seconds,
+        breaker=CircuitBreaker(
+            name="groq",
+            failure_threshold=settings.groq_breaker_failure_threshold,
+            reset_timeout=settings.groq_breaker_reset_seconds,
+            half_open_max_calls=settings.groq_breaker_half_open_probes,
+        ),
+        base_url=settings.groq_base_url,
+        fused=settings.groq_fused_mode,
+        scheduler=build_scheduler(settings),
+    )
+    if settings.kb_index_path is not None:
+        kb = KnowledgeBaseSearch(index_path=settings.kb_index_path)
+    else:
+        kb = KnowledgeBaseSearch(kb_path=settings.kb_path, scoring=settings.kb_scoring, shards=settings.kb_shards)
+    if settings.kb_watch_interval_seconds > 0:
+        kb.start_watching(settings.kb_watch_interval_seconds)
+    return TriageAgent(
+        llm_client=llm_client,
+        kb_search=kb,
+        match_threshold=settings.kb_similarity_threshold,
+        max_related=settings.max_related_results,
+        batch_concurrency=settings.batch_max_concurrency,
+        dedup_index=build_dedup_index(settings),
+        single_flight=SingleFlight() if settings.coalesce_enabled else None,
+    )
@@ -1,36 +1,133 @@
+import json
 import logging
+import random
+import secrets
+import time
+from typing import AsyncIterator, Callable, Dict, Mapping, Optional
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
 from app.config import Settings, get_settings
-from app.schemas import HealthResponse, TriageRequest, TriageResponse
-from agent.groq_client import GroqAssistant
-from agent.kb_search import KnowledgeBaseSearch
+from app.factory import build_agent
+from app.responses import FastJSONResponse, batch_payload, dumps, triage_payload
+from app.schemas import (
+    BatchTriageRequest,
+    BatchTriageResponse,
+    HealthResponse,
+    TriageJobRequest,
+    TriageJobsAccepted,
+    TriageJobStatus,
+    TriageRequest,
+    TriageResponse,
+)
+from agent.jobs import TriageJobQueue
+from agent.metrics import REGISTRY, TRIAGE_STAGE_SECONDS
+from agent.profiling import StackProfiler
 from agent.triage_agent import TriageAgent
 
 logger = logging.getLogger("support_triage.app")
 
+STARTUP_SECONDS = REGISTRY.gauge(
+    "app_startup_seconds",
+    "Seconds spent per startup phase; first_request is measured from when app.main finished loading.",
+    ("phase",),
+)
+
 
 def get_agent(settings: Settings = Depends(get_settings)) -> TriageAgent:
     """Construct and cache the triage agent."""
     if not hasattr(get_agent, "_agent"):
         logger.info("Bootstrapping triage agent", extra={"provider": settings.llm_provider})
-        llm_client = GroqAssistant(
-            provider=settings.llm_provider,
-            api_key=settings.groq_api_key,
-            match_threshold=settings.kb_similarity_threshold,
-        )
-        kb = KnowledgeBaseSearch(kb_path=settings.kb_path)
-        get_agent._agent = TriageAgent(
-            llm_client=llm_client,
-            kb_search=kb,
-            match_threshold=settings.kb_similarity_threshold,
-            max_related=settings.max_related_results,
-        )
+        get_agent._agent = build_agent(settings)
     return get_agent._agent  # type: ignore[attr-defined]
 
 
+def get_job_queue(
+    settings: Settings = Depends(get_settings), agent: TriageAgent = Depends(get_agent)
+) -> TriageJobQueue:
+    """Open the persistent job queue and start its workers on first use."""
+    if not hasattr(get_job_queue, "_queue"):
+        queue = TriageJobQueue(settings.jobs_db_path, agent.triage, workers=settings.jobs_workers)
+        get_job_queue._queue = queue.start()
+    return get_job_queue._queue  # type: ignore[attr-defined]
+
+
 app = FastAPI(title="Support Triage Agent")
+app.state.ready = False
+app.state.first_request_seconds = None
+app.state.profiler = None
+_LOADED_AT = time.perf_counter()
+
+
+def profile_trigger(
+    path: str, headers: Mapping[str, str], settings: Settings, draw: Callable[[], float] = random.random
+) -> Optional[str]:
+    """``"header"``, ``"sample"`` or None: should this request be profiled?"""
+    # Header triggering needs a token; without one any client could profile.
+    requested = headers.get(settings.profiling_header)
+    if requested and settings.profiling_token and secrets.compare_digest(requested, settings.profiling_token):
+        return "header"
+    if path.startswith("/triage") and draw() < settings.profiling_sample_rate:
+        return "sample"
+    return None
+
+
+async def profile_requests(request: Request, call_next):
+    """Sample stacks while a chosen request runs; streamed bodies are covered until the headers."""
+    trigger = profile_trigger(request.url.path, request.headers, get_settings())
+    if trigger is None:
+        return await call_next(request)
+    with app.state.profiler.profile(trigger):
+        return await call_next(request)
+
+
+def install_profiler(settings: Settings) -> None:
+    """Add the profiling middleware; it is only registered when enabled, so requests pay nothing otherwise."""
+    if not settings.profiling_enabled:
+        return
+    app.state.profiler = StackProfiler(
+        interval=settings.profiling_interval_seconds, window_seconds=settings.profiling_window_seconds
+    )
+    app.middleware("http")(profile_requests)
+
+
+install_profiler(get_settings())
+
+
+def _record_first_request() -> None:
+    if app.state.first_request_seconds is None:
+        app.state.first_request_seconds = time.perf_counter() - _LOADED_AT
+        STARTUP_SECONDS.set(app.state.first_request_seconds, phase="first_request")
+
+
+@app.on_event("startup")
+async def warm_up() -> None:
+    """Build the agent and open its connections before reporting ready."""
+    settings = get_settings()
+    if settings.startup_warmup:
+        started = time.perf_counter()
+        agent = get_agent(settings)
+        outcome = await agent.warm_up_async()
+        STARTUP_SECONDS.set(time.perf_counter() - started, phase="warmup")
+        logger.info("Triage agent warmed up", extra=outcome)
+    if settings.jobs_workers > 0 and settings.jobs_db_path.exists():
+        # Resume jobs persisted before a restart without waiting for a request.
+        # A deployment that never used jobs gets no database or worker threads
+        # until the first /triage/jobs request.
+        get_job_queue(settings, get_agent(settings))
+    app.state.ready = True
+
+
+@app.on_event("shutdown")
+async def close_llm_client() -> None:
+    queue = getattr(get_job_queue, "_queue", None)
+    if queue is not None:
+        queue.stop(timeout=5.0)
+    agent = getattr(get_agent, "_agent", None)
+    if agent is not None:
+        agent.kb_search.close()
+        await agent.llm_client.aclose()
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -38,12 +135,133 @@ def health(settings: Settings = Depends(get_settings)) -> HealthResponse:
     return HealthResponse(environment=settings.environment)
 
 
-@app.post("/triage", response_model=TriageResponse)
-def triage_ticket(
+@app.get("/ready", response_model=HealthResponse)
+def ready(settings: Settings = Depends(get_settings)):
+    """Readiness probe: 503 until the startup warm-up has finished."""
+    if not app.state.ready:
+        return JSONResponse(status_code=503, content={"status": "starting", "environment": settings.environment})
+    return HealthResponse(environment=settings.environment)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/admin/cache")
+def cache_stats(agent: TriageAgent = Depends(get_agent)) -> Dict[str, object]:
+    cache = agent.llm_client.cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/admin/coalescing")
+def coalescing_stats(agent: TriageAgent = Depends(get_agent)) -> Dict[str, object]:
+    if agent.single_flight is None:
+        return {"enabled": False}
+    return {"enabled": True, **agent.single_flight.stats()}
+
+
+@app.get("/admin/jobs")
+def job_stats(queue: TriageJobQueue = Depends(get_job_queue)) -> Dict[str, object]:
+    return queue.stats()
+
+
+@app.get("/admin/profile", response_class=PlainTextResponse)
+def download_profile(clear: bool = False) -> PlainTextResponse:
+    """Collapsed stacks (flamegraph.pl / speedscope input) sampled over the profiling window."""
+    profiler: Optional[StackProfiler] = app.state.profiler
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled; set PROFILING_ENABLED=true")
+    body = profiler.collapsed()
+    if clear:
+        profiler.clear()
+    stats = profiler.stats()
+    headers = {"X-Profile-Samples": str(stats["samples"]), "X-Profiled-Requests": str(stats["profiled_requests"])}
+    return PlainTextResponse(body, headers=headers)
+
+
+@app.post("/admin/kb/reload")
+def reload_kb(agent: TriageAgent = Depends(get_agent)) -> Dict[str, int]:
+    """Rebuild the KB index from disk; in-flight lookups keep the old snapshot."""
+    try:
+        return agent.kb_search.reload()
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"KB reload failed: {exc}") from exc
+
+
+@app.post("/triage", response_model=TriageResponse, response_class=FastJSONResponse)
+async def triage_ticket(
     request: TriageRequest, agent: TriageAgent = Depends(get_agent)
-) -> TriageResponse:
+) -> FastJSONResponse:
     try:
-        result = agent.triage(request.description)
+        result = await agent.triage_async(request.description)
     except ValueError as exc:  # pragma: no cover - defensive
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return TriageResponse(**result)
+    with TRIAGE_STAGE_SECONDS.time(stage="response_serialization", provider=agent.llm_client.provider):
+        response = FastJSONResponse(triage_payload(result))
+    _record_first_request()
+    return response
+
+
+@app.post("/triage/stream")
+async def triage_stream(request: TriageRequest, agent: TriageAgent = Depends(get_agent)) -> StreamingResponse:
+    """Server-Sent Events in the order documented on ``TriageAgent.triage_stream``."""
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event, data in agent.triage_stream(request.description):
+                if event == "result":
+                    data = triage_payload(data)
+                    _record_first_request()
+                yield f"event: {event}\ndata: {dumps(data).decode('utf-8')}\n\n"
+        except Exception:  # noqa: BLE001 - headers are already sent; report in-band
+            logger.exception("Streaming triage failed")
+            yield f"event: error\ndata: {json.dumps({'detail': 'Triage failed'})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/triage/batch", response_model=BatchTriageResponse, response_class=FastJSONResponse)
+def triage_batch(
+    request: BatchTriageRequest,
+    agent: TriageAgent = Depends(get_agent),
+    settings: Settings = Depends(get_settings),
+) -> FastJSONResponse:
+    if len(request.descriptions) > settings.batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds the maximum of {settings.batch_max_size} tickets",
+        )
+    outcomes = agent.triage_many(request.descriptions)
+    response = FastJSONResponse(batch_payload(outcomes))
+    _record_first_request()
+    return response
+
+
+@app.post("/triage/jobs", response_model=TriageJobsAccepted, status_code=status.HTTP_202_ACCEPTED)
+def submit_triage_jobs(
+    request: TriageJobRequest,
+    queue: TriageJobQueue = Depends(get_job_queue),
+    settings: Settings = Depends(get_settings),
+) -> TriageJobsAccepted:
+    tickets = request.tickets()
+    if len(tickets) > settings.batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Job submission exceeds the maximum of {settings.batch_max_size} tickets",
+        )
+    return TriageJobsAccepted(job_ids=queue.submit(tickets))
+
+
+@app.get("/triage/jobs/{job_id}", response_model=TriageJobStatus)
+def get_triage_job(job_id: str, queue: TriageJobQueue = Depends(get_job_queue)) -> TriageJobStatus:
+    job = queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return TriageJobStatus(**job)
@@ -0,0 +1,57 @@
+"""Fast JSON serialization for payloads the triage pipeline builds itself.
+
+``FastJSONResponse`` encodes with orjson when it is installed and falls back
+to a compact ``json.dumps``. The triage routes hand it plain dicts shaped by
+``triage_payload`` instead of re-validating the agent's output through the
+pydantic response models, which stay on the routes for the OpenAPI schema.
+"""
+
+import json
+from typing import Any, Dict, Optional, Sequence
+
+from fastapi.responses import JSONResponse
+
+from app.schemas import TriageResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+_TRIAGE_FIELDS = tuple(TriageResponse.__fields__)
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def triage_payload(result: Dict[str, object]) -> Dict[str, object]:
+    """``TriageResponse`` fields of a result produced by ``TriageAgent``, without validation.
+
+    Trusted because the agent only emits normalized labels, bools and KB hits
+    built from ``HitRecord``; anything from outside the pipeline must still go
+    through the pydantic models.
+    """
+    return {field: result[field] for field in _TRIAGE_FIELDS}
+
+
+def batch_payload(outcomes: Sequence[Dict[str, object]]) -> Dict[str, object]:
+    """``BatchTriageResponse`` body for ``TriageAgent.triage_many`` outcomes."""
+    results = []
+    for outcome in outcomes:
+        result: Optional[Dict[str, object]] = outcome["result"]  # type: ignore[assignment]
+        results.append(
+            {
+                "index": outcome["index"],
+                "result": triage_payload(result) if result is not None else None,
+                "error": outcome["error"],
+            }
+        )
+    return {"results": results}
@@ -1,5 +1,6 @@
-from typing import List
-from pydantic import BaseModel, Field, validator
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, root_validator, validator
 
 
 class TriageRequest(BaseModel):
@@ -29,6 +30,55 @@ class TriageResponse(BaseModel):
     suggested_next_step: str
 
 
+class BatchTriageRequest(BaseModel):
+    # Raw strings so a single short description becomes a per-item error
+    # instead of rejecting the whole batch.
+    descriptions: List[str] = Field(..., min_items=1)
+
+
+class BatchTriageItem(BaseModel):
+    index: int
+    result: Optional[TriageResponse] = None
+    error: Optional[str] = None
+
+
+class BatchTriageResponse(BaseModel):
+    results: List[BatchTriageItem]
+
+
+class TriageJobRequest(BaseModel):
+    """One ticket (``description``) or many (``descriptions``)."""
+
+    description: Optional[str] = None
+    descriptions: Optional[List[str]] = None
+
+    @root_validator(skip_on_failure=True)
+    def exactly_one_source(cls, values):
+        single, many = values.get("description"), values.get("descriptions")
+        if (single is None) == (many is None):
+            raise ValueError("Provide either description or descriptions")
+        if many is not None and not many:
+            raise ValueError("descriptions must not be empty")
+        return values
+
+    def tickets(self) -> List[str]:
+        return [self.description] if self.description is not None else list(self.descriptions or [])
+
+
+class TriageJobsAccepted(BaseModel):
+    job_ids: List[str]
+
+
+class TriageJobStatus(BaseModel):
+    id: str
+    status: str
+    result: Optional[TriageResponse] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
 class HealthResponse(BaseModel):
     status: str = "ok"
     environment: str
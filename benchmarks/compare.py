@@ -0,0 +1,66 @@
+"""Compare two benchmark result files and flag regressions.
+
+Usage::
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.15
+
+Exits with status 1 when any shared benchmark's mean latency grew by more
+than the threshold.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def _key(result: Dict[str, object]) -> Tuple[str, str]:
+    return str(result["name"]), json.dumps(result["params"], sort_keys=True)
+
+
+def compare(baseline: Dict[str, object], candidate: Dict[str, object], threshold: float) -> List[Dict[str, object]]:
+    """Return one row per benchmark present in both reports."""
+    before = {_key(result): result for result in baseline["results"]}  # type: ignore[union-attr]
+    rows: List[Dict[str, object]] = []
+    for result in candidate["results"]:  # type: ignore[union-attr]
+        previous = before.get(_key(result))
+        if previous is None or not previous["mean_us"]:
+            continue
+        change = (result["mean_us"] - previous["mean_us"]) / previous["mean_us"]
+        rows.append(
+            {
+                "name": result["name"],
+                "params": result["params"],
+                "baseline_us": previous["mean_us"],
+                "candidate_us": result["mean_us"],
+                "change": change,
+                "regression": change > threshold,
+            }
+        )
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare", description="Compare benchmark runs.")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    rows = compare(
+        json.loads(args.baseline.read_text(encoding="utf-8")),
+        json.loads(args.candidate.read_text(encoding="utf-8")),
+        args.threshold,
+    )
+    for row in rows:
+        params = ",".join(f"{key}={value}" for key, value in row["params"].items())
+        flag = "REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['name']:<16} {params:<32} {row['baseline_us']:>10.1f}us -> "
+            f"{row['candidate_us']:>10.1f}us ({row['change']:+.1%}) {flag}"
+        )
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
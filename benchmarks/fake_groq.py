@@ -0,0 +1,254 @@
+"""Local stand-in for the Groq/OpenAI chat-completions endpoint.
+
+Usage::
+
+    python -m benchmarks.fake_groq --port 8099 --latency 0.2
+    python -m benchmarks.fake_groq --latency lognormal:0.2:0.6 --error-rate 0.01 --rate-limit-rate 0.05
+    GROQ_BASE_URL=http://127.0.0.1:8099 LLM_PROVIDER=groq GROQ_API_KEY=fake uvicorn app.main:app
+
+JSON-mode requests get a classification payload derived from the rules
+engine; other requests get a short next-step sentence, sent as SSE chunks
+when the request sets ``stream``. A seeded share of requests can be answered
+with a 500 or, immediately and with ``Retry-After``, a 429.
+
+Latency specs: ``0.2`` (fixed), ``uniform:LOW:HIGH``, ``exp:MEAN`` and
+``lognormal:MEDIAN:SIGMA``, all in seconds.
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+from agent.rules_classifier import RulesClassifier
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+MODELS_PATH = "/openai/v1/models"
+
+LatencySampler = Callable[[random.Random], float]
+
+
+def parse_latency(spec: Union[float, str]) -> LatencySampler:
+    """Turn a latency spec (see module docstring) into a sampler of seconds."""
+    if isinstance(spec, (int, float)):
+        return lambda rng: float(spec)
+    kind, _, args = spec.partition(":")
+    try:
+        if not args:
+            value = float(kind)
+            return lambda rng: value
+        params = [float(arg) for arg in args.split(":")]
+        if kind == "uniform":
+            low, high = params
+            return lambda rng: rng.uniform(low, high)
+        if kind == "exp":
+            (mean,) = params
+            return lambda rng: rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+        if kind == "lognormal":
+            median, sigma = params
+            return lambda rng: rng.lognormvariate(math.log(median), sigma)
+    except ValueError as exc:
+        raise ValueError(f"invalid latency spec {spec!r}") from exc
+    raise ValueError(f"invalid latency spec {spec!r}")
+
+
+class FakeGroqServer:
+    """Threaded HTTP server answering chat-completion requests after a delay."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Union[float, str] = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests = 0
+        self.statuses: Dict[int, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._rules = RulesClassifier()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGroqServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-groq", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeGroqServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    # ------------------------------------------------------------------ #
+    # Response generation
+    # ------------------------------------------------------------------ #
+    def respond(self, body: Dict[str, object]) -> Tuple[int, Dict[str, object]]:
+        """Return (status, payload) for a parsed request body."""
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+            delay = self.latency(self._rng)
+        if roll < self.rate_limit_rate:
+            status, payload = 429, _error("Rate limit reached for requests", "requests", "rate_limit_exceeded")
+        else:
+            if delay > 0:
+                time.sleep(delay)
+            if roll < self.rate_limit_rate + self.error_rate:
+                status, payload = 500, _error("Internal server error", "internal_server_error")
+            else:
+                status, payload = 200, self.completion(body)
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+        return status, payload
+
+    def completion(self, body: Dict[str, object]) -> Dict[str, object]:
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": self.content(body)}, "finish_reason": "stop"}
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    def content(self, body: Dict[str, object]) -> str:
+        messages = body.get("messages") or []
+        user_text = str(messages[-1].get("content", "")) if messages else ""  # type: ignore[union-attr]
+        if body.get("response_format"):
+            return json.dumps(self._rules.classify(user_text))
+        return "Attach the matching KB article and follow up with the customer."
+
+    def chunks(self, body: Dict[str, object]) -> Iterator[Dict[str, object]]:
+        """Split the completion into word-sized ``chat.completion.chunk`` payloads."""
+        words = re.findall(r"\S+\s*", self.content(body))
+        for position, word in enumerate(words):
+            finish_reason = "stop" if position == len(words) - 1 else None
+            yield {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": finish_reason}],
+            }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                if self.path.rstrip("/") != MODELS_PATH:
+                    self._send(404, {"error": {"message": "not found"}})
+                    return
+                self._send(200, {"object": "list", "data": [{"id": "fake", "object": "model", "owned_by": "fake"}]})
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server API
+                if self.path.rstrip("/") != COMPLETIONS_PATH:
+                    self._send(404, {"error": {"message": "not found"}})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send(400, {"error": {"message": "invalid JSON"}})
+                    return
+                status, payload = server.respond(body)
+                if status == 200 and body.get("stream"):
+                    self._stream(server.chunks(body))
+                    return
+                self._send(status, payload, [("Retry-After", "1")] if status == 429 else ())
+
+            def _stream(self, chunks: Iterator[Dict[str, object]]) -> None:
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.end_headers()
+                    for chunk in chunks:
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _send(self, status: int, payload: Dict[str, object], headers: Sequence[Tuple[str, str]] = ()) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    for name, value in headers:
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (e.g. timed out or hedged)
+
+            def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+                return
+
+        return Handler
+
+
+def _error(message: str, error_type: str, code: Optional[str] = None) -> Dict[str, object]:
+    return {"error": {"message": message, "type": error_type, "code": code}}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.fake_groq", description="Run a fake Groq server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", default="0", help="seconds to wait before answering, or a distribution spec")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with a 429")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = FakeGroqServer(
+        args.host,
+        args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    print(f"fake Groq listening on {server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+"""Seeded generators for synthetic KB entries and ticket text."""
+
+import random
+from typing import Dict, Iterator, List
+
+_TOPICS: Dict[str, Dict[str, List[str]]] = {
+    "Billing": {
+        "nouns": ["invoice", "charge", "refund", "card", "subscription", "plan", "receipt", "payment"],
+        "problems": ["double charge", "refund pending", "invoice missing", "card declined", "wrong amount"],
+    },
+    "Login": {
+        "nouns": ["password", "2fa", "sso", "session", "account", "device", "token", "email"],
+        "problems": ["reset email", "locked out", "device mismatch", "session expired", "sso redirect loop"],
+    },
+    "Performance": {
+        "nouns": ["dashboard", "api", "report", "export", "search", "sync", "latency", "query"],
+        "problems": ["slow", "timeout", "high latency", "rate limit", "degraded throughput"],
+    },
+    "Bug": {
+        "nouns": ["checkout", "upload", "webhook", "layout", "editor", "notification", "widget", "mobile"],
+        "problems": ["500 error", "crash", "stacktrace", "blank page", "ui bug"],
+    },
+    "Question": {
+        "nouns": ["feature", "integration", "setting", "permission", "workspace", "docs", "billing", "team"],
+        "problems": ["how to", "where is", "can i", "question about", "help with"],
+    },
+}
+_FILLER = ["the", "our", "my", "all", "since", "today", "again", "customers", "users", "please", "urgent"]
+_SEVERITY_HINTS = ["outage", "down for everyone", "data loss", "failure", "intermittent", "minor", "cosmetic", ""]
+_ACTIONS = [
+    "Escalate to payments team",
+    "Check email queue and resend via admin",
+    "Collect traces and notify performance squad",
+    "Attach screenshot and assign to web team",
+    "Share the relevant help center article",
+]
+
+
+def generate_kb(size: int, seed: int = 0) -> List[Dict[str, object]]:
+    """Return ``size`` KB entries; identical for the same seed."""
+    rng = random.Random(seed)
+    categories = list(_TOPICS)
+    entries: List[Dict[str, object]] = []
+    for number in range(size):
+        category = rng.choice(categories)
+        topic = _TOPICS[category]
+        nouns = rng.sample(topic["nouns"], 3)
+        problem = rng.choice(topic["problems"])
+        # A per-entry tag keeps large KBs from collapsing into a few duplicates.
+        tag = f"{rng.choice(nouns)}{number % 997}"
+        entries.append(
+            {
+                "id": f"KB-{number:07d}",
+                "title": f"{nouns[0].capitalize()} {problem} on {nouns[1]} {tag}",
+                "category": category,
+                "symptoms": [problem, nouns[0], f"{nouns[1]} {nouns[2]}", tag][: rng.randint(2, 4)],
+                "recommended_action": rng.choice(_ACTIONS),
+            }
+        )
+    return entries
+
+
+def generate_tickets(count: int, seed: int = 1) -> Iterator[str]:
+    """Yield realistic-looking ticket descriptions, including noisy IDs."""
+    rng = random.Random(seed)
+    categories = list(_TOPICS)
+    for _ in range(count):
+        topic = _TOPICS[rng.choice(categories)]
+        words = rng.sample(topic["nouns"], 2) + rng.sample(_FILLER, 3)
+        rng.shuffle(words)
+        sentence = f"{rng.choice(topic['problems']).capitalize()} with {' '.join(words)}"
+        hint = rng.choice(_SEVERITY_HINTS)
+        order = f"order #{rng.randint(100000, 999999)}"
+        tail = rng.choice(["", " Can you help?", " This blocks our release.", " Seen on Safari and Chrome."])
+        yield f"{sentence} {hint} ({order}).{tail}".replace("  ", " ")
@@ -0,0 +1,173 @@
+"""Open-loop load driver for ``POST /triage``.
+
+Usage::
+
+    python -m benchmarks.load --rps 50 --duration 20 --latency lognormal:0.2:0.5 --rate-limit-rate 0.05
+    python -m benchmarks.load --url http://127.0.0.1:8000 --rps 200 --duration 60
+
+Without ``--url`` the driver runs offline: it starts a local fake Groq server,
+points ``app.main:app`` at it in groq mode and sends requests through the
+ASGI app in-process. Requests are launched on a fixed schedule whatever the
+response times, so queueing shows up in the latency percentiles. Fallbacks to
+the rules are read from ``groq_fallbacks_total`` on ``/metrics`` before and
+after the run.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from benchmarks.generators import generate_tickets
+
+_FALLBACK_SAMPLE = re.compile(r'^groq_fallbacks_total\{operation="([^"]+)"\} (\S+)$', re.MULTILINE)
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def parse_fallbacks(metrics_text: str) -> Dict[str, float]:
+    return {operation: float(value) for operation, value in _FALLBACK_SAMPLE.findall(metrics_text)}
+
+
+async def _fallbacks(client) -> Dict[str, float]:
+    response = await client.get("/metrics")
+    response.raise_for_status()
+    return parse_fallbacks(response.text)
+
+
+async def drive(client, tickets: Sequence[str], rps: float, duration: float) -> Dict[str, object]:
+    """Send ``rps`` requests per second for ``duration`` seconds and summarize them."""
+    total = max(1, int(rps * duration))
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async def send(description: str) -> None:
+        started = time.perf_counter()
+        try:
+            response = await client.post("/triage", json={"description": description})
+            outcome = str(response.status_code)
+        except Exception as exc:  # noqa: BLE001 - counted, the run goes on
+            outcome = type(exc).__name__
+        if outcome == "200":
+            latencies.append(time.perf_counter() - started)
+        statuses[outcome] = statuses.get(outcome, 0) + 1
+
+    before = await _fallbacks(client)
+    started = time.perf_counter()
+    tasks = []
+    for index in range(total):
+        delay = started + index / rps - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(tickets[index % len(tickets)])))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    after = await _fallbacks(client)
+
+    ordered = sorted(latencies)
+    succeeded = len(ordered)
+    fallbacks = {operation: after[operation] - before.get(operation, 0.0) for operation in sorted(after)}
+    return {
+        "requests": total,
+        "target_rps": rps,
+        "elapsed_s": elapsed,
+        "throughput_rps": succeeded / elapsed if elapsed else 0.0,
+        "statuses": statuses,
+        "p50_ms": percentile(ordered, 0.50) * 1e3,
+        "p95_ms": percentile(ordered, 0.95) * 1e3,
+        "p99_ms": percentile(ordered, 0.99) * 1e3,
+        "max_ms": (ordered[-1] if ordered else 0.0) * 1e3,
+        "fallbacks": {operation: int(count) for operation, count in fallbacks.items() if count},
+        "fallback_rate": {
+            operation: count / succeeded if succeeded else 0.0 for operation, count in fallbacks.items() if count
+        },
+    }
+
+
+async def run_remote(url: str, tickets: Sequence[str], rps: float, duration: float, timeout: float):
+    import httpx
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        return await drive(client, tickets, rps, duration)
+
+
+async def run_offline(tickets: Sequence[str], rps: float, duration: float, timeout: float):
+    """Drive ``app.main:app`` in-process; the caller has pointed it at a fake Groq server."""
+    import httpx
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(app=app, base_url="http://load", timeout=timeout) as client:
+            return await drive(client, tickets, rps, duration)
+
+
+def offline_environment(base_url: str, scratch: Path, fused: bool = False) -> Dict[str, str]:
+    """Settings that route ``app.main:app`` to the fake server with caching and reuse off."""
+    return {
+        "LLM_PROVIDER": "groq",
+        "GROQ_API_KEY": "fake",
+        "GROQ_BASE_URL": base_url,
+        "GROQ_FUSED_MODE": str(fused).lower(),
+        "LLM_CACHE_ENABLED": "false",
+        "DEDUP_ENABLED": "false",
+        "COALESCE_ENABLED": "false",
+        "JOBS_WORKERS": "0",
+        "JOBS_DB_PATH": str(scratch / "jobs.sqlite3"),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description="Load-test POST /triage.")
+    parser.add_argument("--url", help="base URL of a running server (default: app.main:app in-process)")
+    parser.add_argument("--rps", type=float, default=20.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to keep sending")
+    parser.add_argument("--timeout", type=float, default=30.0, help="client timeout per request")
+    parser.add_argument("--tickets", type=int, default=1000, help="distinct synthetic tickets to cycle through")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="also write the report as JSON")
+    offline = parser.add_argument_group("offline mode (fake Groq server)")
+    offline.add_argument("--latency", default="0.2", help="fake Groq latency, e.g. 0.2 or exp:0.2")
+    offline.add_argument("--error-rate", type=float, default=0.0)
+    offline.add_argument("--rate-limit-rate", type=float, default=0.0)
+    offline.add_argument("--fused", action="store_true", help="run the app with GROQ_FUSED_MODE=true")
+    args = parser.parse_args(argv)
+    if args.rps <= 0:
+        parser.error("--rps must be positive")
+
+    tickets = list(generate_tickets(args.tickets, seed=args.seed))
+    if args.url:
+        report = asyncio.run(run_remote(args.url, tickets, args.rps, args.duration, args.timeout))
+    else:
+        import tempfile
+
+        from benchmarks.fake_groq import FakeGroqServer
+
+        fake = FakeGroqServer(
+            latency=args.latency, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed
+        )
+        with fake, tempfile.TemporaryDirectory() as scratch:
+            os.environ.update(offline_environment(fake.base_url, Path(scratch), fused=args.fused))
+            report = asyncio.run(run_offline(tickets, args.rps, args.duration, args.timeout))
+            report["fake_groq_statuses"] = dict(fake.statuses)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"saved {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,230 @@
+"""Run the benchmark suite and save results as JSON.
+
+Usage::
+
+    python -m benchmarks.run --sizes 1000 10000 100000 --output bench.json
+    python -m benchmarks.compare baseline.json bench.json
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from benchmarks.generators import generate_kb, generate_tickets
+
+Result = Dict[str, object]
+
+
+def summarize(name: str, samples_ns: Sequence[int], **params: object) -> Result:
+    """Turn per-operation timings into a comparable result record."""
+    ordered = sorted(samples_ns)
+    total_s = sum(ordered) / 1e9
+    return {
+        "name": name,
+        "params": params,
+        "ops": len(ordered),
+        "mean_us": statistics.fmean(ordered) / 1e3,
+        "p50_us": ordered[len(ordered) // 2] / 1e3,
+        "p95_us": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] / 1e3,
+        "ops_per_sec": len(ordered) / total_s if total_s else 0.0,
+    }
+
+
+def time_calls(fn: Callable[[str], object], inputs: Sequence[str], warmup: int = 20) -> List[int]:
+    for text in inputs[:warmup]:
+        fn(text)
+    samples: List[int] = []
+    clock = time.perf_counter_ns
+    for text in inputs:
+        start = clock()
+        fn(text)
+        samples.append(clock() - start)
+    return samples
+
+
+def scoring_backends() -> List[str]:
+    backends = ["jaccard"]
+    try:
+        import scipy  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        backends.append("bm25")
+    return backends
+
+
+def bench_kb_search(sizes: Sequence[int], tickets: Sequence[str], seed: int) -> List[Result]:
+    from agent.kb_search import KnowledgeBaseSearch
+
+    results: List[Result] = []
+    for size in sizes:
+        entries = generate_kb(size, seed=seed)
+        for scoring in scoring_backends():
+            start = time.perf_counter_ns()
+            search = KnowledgeBaseSearch(entries=entries, scoring=scoring)
+            results.append(summarize("kb_build", [time.perf_counter_ns() - start], kb_size=size, scoring=scoring))
+            samples = time_calls(lambda text: search.lookup(text, limit=3), tickets)
+            results.append(summarize("kb_lookup", samples, kb_size=size, scoring=scoring))
+
+            start = time.perf_counter_ns()
+            search.lookup_many(tickets, limit=3)
+            elapsed = time.perf_counter_ns() - start
+            batch = summarize("kb_lookup_many", [elapsed], kb_size=size, scoring=scoring, batch=len(tickets))
+            batch["ops_per_sec"] = len(tickets) / (elapsed / 1e9) if elapsed else 0.0
+            results.append(batch)
+    return results
+
+
+def bench_rules(tickets: Sequence[str]) -> List[Result]:
+    from agent.rules_classifier import RulesClassifier
+
+    classifier = RulesClassifier()
+    return [summarize("rules_classify", time_calls(classifier.classify, tickets))]
+
+
+def _mock_agent(size: int, seed: int):
+    from agent.groq_client import GroqAssistant
+    from agent.kb_search import KnowledgeBaseSearch
+    from agent.triage_agent import TriageAgent
+
+    kb = KnowledgeBaseSearch(entries=generate_kb(size, seed=seed))
+    return TriageAgent(GroqAssistant(provider="mock"), kb)
+
+
+def bench_triage(sizes: Sequence[int], tickets: Sequence[str], seed: int) -> List[Result]:
+    results: List[Result] = []
+    for size in sizes:
+        agent = _mock_agent(size, seed)
+        results.append(summarize("triage_mock", time_calls(agent.triage, tickets), kb_size=size))
+    return results
+
+
+def bench_api(sizes: Sequence[int], tickets: Sequence[str], seed: int) -> List[Result]:
+    import httpx
+
+    from app.main import app, get_agent
+
+    async def drive(agent) -> List[int]:
+        app.dependency_overrides[get_agent] = lambda: agent
+        samples: List[int] = []
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+                for index, text in enumerate(tickets):
+                    start = time.perf_counter_ns()
+                    response = await client.post("/triage", json={"description": text})
+                    response.raise_for_status()
+                    if index >= 20:  # first requests are warm-up
+                        samples.append(time.perf_counter_ns() - start)
+        finally:
+            app.dependency_overrides.pop(get_agent, None)
+        return samples
+
+    results: List[Result] = []
+    for size in sizes:
+        samples = asyncio.run(drive(_mock_agent(size, seed)))
+        results.append(summarize("api_triage", samples, kb_size=size))
+    return results
+
+
+_STARTUP_PROBE = """
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    ready = time.perf_counter()
+    client.post("/triage", json={"description": "Checkout keeps failing with 500 error"}).raise_for_status()
+    done = time.perf_counter()
+print(json.dumps({"import": imported - started, "ready": ready - started, "first_request": done - started}))
+"""
+
+
+def bench_startup(runs: int = 3) -> List[Result]:
+    """Cold-process import, ready and time-to-first-request timings."""
+    phases: Dict[str, List[int]] = {"import": [], "ready": [], "first_request": []}
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as scratch:
+            env = {**os.environ, "JOBS_DB_PATH": str(Path(scratch) / "jobs.sqlite3")}
+            output = subprocess.run(
+                [sys.executable, "-c", _STARTUP_PROBE], capture_output=True, text=True, check=True, env=env
+            ).stdout
+        timings = json.loads(output.strip().splitlines()[-1])
+        for phase, seconds in timings.items():
+            phases[phase].append(int(seconds * 1e9))
+    return [summarize(f"startup_{phase}", samples, runs=runs) for phase, samples in phases.items()]
+
+
+SUITES: Dict[str, Callable[..., List[Result]]] = {
+    "kb": lambda sizes, tickets, seed: bench_kb_search(sizes, tickets, seed),
+    "rules": lambda sizes, tickets, seed: bench_rules(tickets),
+    "triage": bench_triage,
+    "api": bench_api,
+    "startup": lambda sizes, tickets, seed: bench_startup(),
+}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(
+    sizes: Sequence[int], ticket_count: int, seed: int, suites: Sequence[str]
+) -> Dict[str, object]:
+    tickets = list(generate_tickets(ticket_count, seed=seed + 1))
+    results: List[Result] = []
+    for suite in suites:
+        print(f"running {suite} ...", file=sys.stderr, flush=True)
+        results.extend(SUITES[suite](sizes, tickets, seed))
+    return {
+        "meta": {
+            "created_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "tickets": ticket_count,
+            "sizes": list(sizes),
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Run triage benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="KB sizes to generate")
+    parser.add_argument("--tickets", type=int, default=500, help="tickets per measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--suite", choices=sorted(SUITES), nargs="+", default=list(SUITES))
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.sizes, args.tickets, args.seed, args.suite)
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    for result in report["results"]:  # type: ignore[union-attr]
+        params = ",".join(f"{key}={value}" for key, value in result["params"].items())
+        print(
+            f"{result['name']:<16} {params:<32} mean={result['mean_us']:>10.1f}us "
+            f"p95={result['p95_us']:>10.1f}us {result['ops_per_sec']:>10.1f} ops/s"
+        )
+    print(f"saved {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
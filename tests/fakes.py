@@ -0,0 +1,40 @@
+"""Test doubles for the Groq SDK client."""
+
+import asyncio
+from types import SimpleNamespace
+
+from agent.groq_client import GroqAssistant
+
+
+def _completion(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class FakeCompletions:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return _completion(response)
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    async def create(self, **kwargs):  # type: ignore[override]
+        await asyncio.sleep(0)
+        return super().create(**kwargs)
+
+
+def groq_assistant(responses, async_client: bool = False) -> GroqAssistant:
+    assistant = GroqAssistant(provider="groq", api_key="test-key")
+    completions = FakeAsyncCompletions(responses) if async_client else FakeCompletions(responses)
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    if async_client:
+        assistant._async_client = fake
+    else:
+        assistant._client = fake
+    return assistant
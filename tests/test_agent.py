@@ -1,4 +1,10 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agent.groq_client import GroqAssistant
 from agent.kb_search import KnowledgeBaseSearch
+from agent.singleflight import SingleFlight
 from agent.triage_agent import TriageAgent
 
 
@@ -83,3 +89,115 @@ def test_unknown_issue_severe_escalation():
 
     assert result["known_issue"] is False
     assert result["suggested_next_step"] == "Escalate to backend team"
+
+
+def test_triage_many_preserves_order_and_reports_item_errors():
+    kb_entries = [
+        {
+            "id": "KB1",
+            "title": "Checkout failure 500",
+            "category": "Bug",
+            "symptoms": ["checkout", "500", "card"],
+            "recommended_action": "Escalate to payments",
+        }
+    ]
+    agent = build_agent("High", kb_entries, threshold=0.2)
+
+    outcomes = agent.triage_many(
+        ["Checkout keeps failing with 500 error on card payments", "   tiny   ", "Nothing matches this description"],
+        max_concurrency=2,
+    )
+
+    assert [outcome["index"] for outcome in outcomes] == [0, 1, 2]
+    assert outcomes[0]["result"]["related_issues"][0]["id"] == "KB1"
+    assert outcomes[1]["result"] is None
+    assert outcomes[1]["error"] == "Description must be at least 10 characters long"
+    assert outcomes[2]["result"]["known_issue"] is False
+
+
+def test_triage_async_matches_sync_pipeline():
+    kb = KnowledgeBaseSearch(
+        entries=[
+            {
+                "id": "KB1",
+                "title": "Checkout failure 500",
+                "category": "Bug",
+                "symptoms": ["checkout", "500", "card"],
+                "recommended_action": "Escalate to payments",
+            }
+        ]
+    )
+    agent = TriageAgent(GroqAssistant(provider="mock"), kb, match_threshold=0.2)
+    description = "Checkout crash with 500 error on card payments"
+
+    assert asyncio.run(agent.triage_async(description)) == agent.triage(description)
+
+
+def test_triage_stream_sends_provisional_results_before_the_llm_classification():
+    class GatedLLM(GroqAssistant):
+        async def classify_ticket_async(self, description: str):
+            await released.wait()
+            return {"summary": "From the LLM", "category": "Bug", "severity": "Low"}
+
+    kb = KnowledgeBaseSearch(
+        entries=[{"id": "KB1", "title": "Checkout failure 500", "category": "Bug", "symptoms": ["checkout", "500"]}]
+    )
+    agent = TriageAgent(GatedLLM(provider="mock"), kb, match_threshold=0.2)
+
+    async def collect():
+        events = []
+        async for event, data in agent.triage_stream("Checkout crash with 500 error, outage for everyone"):
+            events.append((event, data))
+            # The LLM only answers once the KB hits are out.
+            if event == "related_issues":
+                released.set()
+        return events
+
+    released = asyncio.Event()
+    events = asyncio.run(asyncio.wait_for(collect(), timeout=5))
+
+    assert [name for name, _ in events][:3] == ["classification", "related_issues", "classification"]
+    assert events[0][1]["provisional"] is True and events[0][1]["severity"] == "Critical"
+    assert events[1][1]["related_issues"][0]["id"] == "KB1"
+    assert events[2][1] == {"summary": "From the LLM", "category": "Bug", "severity": "Low", "provisional": False}
+    assert events[-1][1]["severity"] == "Low"
+
+
+class SlowCountingLLM(StubLLMClient):
+    def __init__(self) -> None:
+        super().__init__("stub summary", "Bug", "Critical")
+        self.calls = 0
+
+    def classify_ticket(self, description: str):
+        self.calls += 1
+        time.sleep(0.2)
+        return super().classify_ticket(description)
+
+    async def classify_ticket_async(self, description: str):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return super().classify_ticket(description)
+
+    async def suggest_next_action_async(self, *args):
+        return self.suggest_next_action(*args)
+
+
+def test_single_flight_coalesces_concurrent_identical_tickets():
+    llm = SlowCountingLLM()
+    flight = SingleFlight()
+    agent = TriageAgent(llm, KnowledgeBaseSearch(entries=[]), single_flight=flight)
+    text = "Checkout is DOWN for every customer"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        sync_results = list(pool.map(agent.triage, [text, text.lower(), "  " + text, text]))
+    assert llm.calls == 1
+    assert all(result == sync_results[0] for result in sync_results)
+    assert sync_results[0] is not sync_results[1]
+
+    async def burst():
+        return await asyncio.gather(*(agent.triage_async(text) for _ in range(5)))
+
+    async_results = asyncio.run(burst())
+    assert llm.calls == 2
+    assert all(result == async_results[0] for result in async_results)
+    assert flight.stats() == {"leaders": 2, "followers": 7, "in_flight": 0}
@@ -1,11 +1,28 @@
+import asyncio
+import json
+import time
+
+import pytest
 from fastapi.testclient import TestClient
 
-from app.main import app
+from agent.jobs import TriageJobQueue
+from app.main import app, get_agent, get_job_queue
+from app.config import get_settings
 
 
 client = TestClient(app)
 
 
+@pytest.fixture
+def job_queue(tmp_path):
+    """Point the app at a throwaway job database instead of data/."""
+    queue = TriageJobQueue(tmp_path / "jobs.sqlite3", get_agent(get_settings()).triage, workers=2, poll_interval=0.05)
+    get_job_queue._queue = queue.start()
+    yield queue
+    del get_job_queue._queue
+    queue.close()
+
+
 def test_triage_endpoint_success():
     payload = {"description": "Checkout keeps failing with 500 error when paying by card"}
     response = client.post("/triage", json=payload)
@@ -17,6 +34,140 @@ def test_triage_endpoint_success():
     assert isinstance(data["related_issues"], list)
 
 
+def test_triage_response_matches_schema_without_revalidation():
+    from app.schemas import TriageResponse
+
+    payload = {"description": "Checkout keeps failing with 500 error when paying by card"}
+    response = client.post("/triage", json=payload)
+
+    data = response.json()
+    assert response.headers["content-type"] == "application/json"
+    assert TriageResponse(**data).dict() == data
+    assert data["related_issues"] and all(isinstance(hit["id"], str) for hit in data["related_issues"])
+
+
+def test_profile_endpoint_is_absent_when_profiling_is_disabled():
+    assert client.get("/admin/profile").status_code == 404
+
+
 def test_triage_endpoint_validation_error():
     response = client.post("/triage", json={"description": "too short"})
     assert response.status_code == 422
+
+
+def test_triage_batch_keeps_order_and_isolates_errors():
+    payload = {
+        "descriptions": [
+            "Checkout keeps failing with 500 error when paying by card",
+            "short",
+            "Password reset email never arrives for my account",
+        ]
+    }
+    response = client.post("/triage/batch", json=payload)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["index"] for item in results] == [0, 1, 2]
+    assert results[0]["error"] is None and results[0]["result"]["category"] == "Bug"
+    assert results[1]["result"] is None and "at least 10 characters" in results[1]["error"]
+    assert results[2]["result"]["category"] == "Login"
+
+
+def test_triage_batch_rejects_empty_batch():
+    response = client.post("/triage/batch", json={"descriptions": []})
+    assert response.status_code == 422
+
+
+def test_admin_kb_reload_reports_diff():
+    response = client.post("/admin/kb/reload")
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["unchanged"] == stats["entries"] > 0
+
+
+def test_metrics_endpoint_exposes_stage_histograms():
+    client.post("/triage", json={"description": "Checkout keeps failing with 500 error when paying by card"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert 'triage_stage_seconds_count{stage="kb_lookup",provider="mock"}' in response.text
+    assert 'triage_seconds_count{provider="mock",category="Bug",severity="High"}' in response.text
+
+
+def test_startup_warm_up_marks_ready_and_records_timings(job_queue):
+    app.state.ready = False
+    assert client.get("/ready").status_code == 503
+
+    with TestClient(app) as started:
+        assert started.get("/ready").json() == {"status": "ok", "environment": "development"}
+        started.post("/triage", json={"description": "Checkout keeps failing with 500 error"})
+        metrics = started.get("/metrics").text
+
+    assert 'app_startup_seconds{phase="warmup"}' in metrics
+    assert 'app_startup_seconds{phase="first_request"}' in metrics
+
+
+def _sse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_triage_stream_emits_events_in_order():
+    payload = {"description": "Checkout is down with 500 error for every customer"}
+    response = client.post("/triage/stream", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(response.text)
+    names = [name for name, _ in events]
+    assert names[:3] == ["classification", "related_issues", "classification"] and names[-1] == "result"
+    assert set(names[3:-1]) == {"next_step"}
+    assert events[0][1]["provisional"] is True and events[2][1]["provisional"] is False
+
+    result = events[-1][1]
+    assert result["category"] == events[2][1]["category"]
+    assert result["related_issues"] == events[1][1]["related_issues"]
+    assert result["suggested_next_step"] == "".join(data["delta"] for name, data in events if name == "next_step")
+
+
+def test_startup_leaves_the_job_queue_closed_until_it_is_used(tmp_path, monkeypatch):
+    from app.main import warm_up
+
+    path = tmp_path / "jobs.sqlite3"
+    monkeypatch.setenv("JOBS_DB_PATH", str(path))
+    get_settings.cache_clear()
+    try:
+        asyncio.run(warm_up())
+    finally:
+        get_settings.cache_clear()
+
+    assert not path.exists()
+    assert not hasattr(get_job_queue, "_queue")
+
+
+def test_triage_jobs_are_accepted_then_processed(job_queue):
+    response = client.post(
+        "/triage/jobs",
+        json={"descriptions": ["Checkout keeps failing with 500 error", "short"]},
+    )
+    assert response.status_code == 202
+    done_id, failed_id = response.json()["job_ids"]
+
+    deadline = time.monotonic() + 5
+    while job_queue.stats()["done"] + job_queue.stats()["failed"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    done = client.get(f"/triage/jobs/{done_id}").json()
+    assert done["status"] == "done" and done["result"]["category"] == "Bug"
+    failed = client.get(f"/triage/jobs/{failed_id}").json()
+    assert failed["status"] == "failed" and "at least 10 characters" in failed["error"]
+    assert client.get("/triage/jobs/unknown").status_code == 404
+    assert client.post("/triage/jobs", json={}).status_code == 422
+
+    stats = client.get("/admin/jobs").json()
+    assert stats["workers"] == 2 and stats["queued"] == 0 and stats["done"] == 1
@@ -0,0 +1,85 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.compare import compare
+from benchmarks.fake_groq import FakeGroqServer, parse_latency
+from benchmarks.generators import generate_kb, generate_tickets
+from benchmarks.load import drive
+from benchmarks.run import run_suite
+
+
+def test_generators_are_seeded():
+    assert generate_kb(50, seed=3) == generate_kb(50, seed=3)
+    assert generate_kb(50, seed=3) != generate_kb(50, seed=4)
+    assert list(generate_tickets(20, seed=5)) == list(generate_tickets(20, seed=5))
+    assert all(len(text) >= 10 for text in generate_tickets(100))
+
+
+def test_run_suite_and_compare_flag_regressions():
+    report = run_suite(sizes=[50], ticket_count=30, seed=0, suites=["kb", "rules", "triage"])
+    names = {result["name"] for result in report["results"]}
+    assert {"kb_lookup", "rules_classify", "triage_mock"} <= names
+
+    slower = {"results": [dict(result, mean_us=result["mean_us"] * 2) for result in report["results"]]}
+    rows = compare(report, slower, threshold=0.5)
+    assert rows and all(row["regression"] for row in rows)
+
+
+def test_startup_suite_measures_cold_process():
+    report = run_suite(sizes=[50], ticket_count=5, seed=0, suites=["startup"])
+    names = {result["name"] for result in report["results"]}
+    assert names == {"startup_import", "startup_ready", "startup_first_request"}
+
+
+def _post_completion(base_url):
+    import urllib.error
+    import urllib.request
+
+    from benchmarks.fake_groq import COMPLETIONS_PATH
+
+    request = urllib.request.Request(
+        base_url + COMPLETIONS_PATH, data=json.dumps({"messages": []}).encode(), method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, dict(response.headers)
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers)
+
+
+def test_fake_groq_injects_rate_limits_and_errors():
+    with FakeGroqServer(rate_limit_rate=1.0) as server:
+        status, headers = _post_completion(server.base_url)
+        assert status == 429 and headers["Retry-After"] == "1"
+    with FakeGroqServer(error_rate=1.0, latency="uniform:0:0.01") as server:
+        assert _post_completion(server.base_url)[0] == 500
+        assert server.statuses == {500: 1}
+    with pytest.raises(ValueError):
+        parse_latency("gamma:1")
+
+
+class _StubClient:
+    """Answers /triage like the app would and counts one fallback per call."""
+
+    def __init__(self):
+        self.fallbacks = 0
+
+    async def get(self, path):
+        text = f'groq_fallbacks_total{{operation="classify"}} {self.fallbacks}\n'
+        return SimpleNamespace(text=text, raise_for_status=lambda: None)
+
+    async def post(self, path, json):
+        self.fallbacks += 1
+        return SimpleNamespace(status_code=200)
+
+
+def test_load_driver_reports_latency_throughput_and_fallbacks():
+    report = asyncio.run(drive(_StubClient(), ["ticket"], rps=200, duration=0.1))
+
+    assert report["requests"] == 20 and report["statuses"] == {"200": 20}
+    assert report["fallbacks"] == {"classify": 20}
+    assert report["fallback_rate"] == {"classify": 1.0}
+    assert 0 <= report["p50_ms"] <= report["p95_ms"] <= report["p99_ms"] <= report["max_ms"]
@@ -0,0 +1,70 @@
+import io
+import json
+
+from agent import bulk
+
+
+def _write_tickets(path, descriptions):
+    with path.open("w", encoding="utf-8") as fh:
+        for index, description in enumerate(descriptions):
+            fh.write(json.dumps({"id": f"T{index}", "description": description}) + "\n")
+
+
+def _read_results(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_bulk_run_writes_results_in_input_order(tmp_path):
+    source = tmp_path / "tickets.jsonl"
+    _write_tickets(source, ["Checkout fails with 500 error on card", "short", "Password reset email missing"] * 5)
+    target = tmp_path / "results.jsonl"
+
+    state = bulk.run(source, target, workers=2, chunk_size=2, stats_stream=io.StringIO())
+
+    results = _read_results(target)
+    assert [record["line"] for record in results] == list(range(1, 16))
+    assert [record["id"] for record in results[:3]] == ["T0", "T1", "T2"]
+    assert results[1]["error"] == "Description must be at least 10 characters long"
+    assert results[2]["result"]["category"] == "Login"
+    assert state["processed"] == 15 and state["errors"] == 5
+
+
+def test_bulk_resume_skips_checkpointed_lines_without_duplicates(tmp_path):
+    source = tmp_path / "tickets.jsonl"
+    _write_tickets(source, [f"Dashboard slow for tenant number {n}" for n in range(6)])
+    target = tmp_path / "results.jsonl"
+    bulk.run(source, target, workers=1, chunk_size=2, stats_stream=io.StringIO())
+    complete = target.read_bytes()
+
+    # Simulate a crash after the first chunk: checkpoint at line 2, plus a
+    # partially written third record that must be discarded on resume.
+    first_two = b"".join(complete.splitlines(keepends=True)[:2])
+    source_offset = sum(len(line) for line in source.read_bytes().splitlines(keepends=True)[:2])
+    target.write_bytes(first_two + b'{"line": 3, "trunc')
+    checkpoint = target.with_name(target.name + ".checkpoint")
+    checkpoint.write_text(
+        json.dumps(
+            {"input_offset": source_offset, "output_offset": len(first_two), "line": 2, "processed": 2, "errors": 0}
+        )
+    )
+
+    state = bulk.run(source, target, workers=1, chunk_size=2, resume=True, stats_stream=io.StringIO())
+
+    assert target.read_bytes() == complete
+    assert state["processed"] == 6
+
+
+def test_bulk_resume_restarts_when_output_is_shorter_than_checkpoint(tmp_path):
+    source = tmp_path / "tickets.jsonl"
+    _write_tickets(source, [f"Dashboard slow for tenant number {n}" for n in range(4)])
+    target = tmp_path / "results.jsonl"
+    bulk.run(source, target, workers=1, chunk_size=2, stats_stream=io.StringIO())
+    complete = target.read_bytes()
+
+    # The checkpoint survives but the output it refers to was lost.
+    target.unlink()
+    state = bulk.run(source, target, workers=1, chunk_size=2, resume=True, stats_stream=io.StringIO())
+
+    assert b"\x00" not in target.read_bytes()
+    assert target.read_bytes() == complete
+    assert state["processed"] == 4
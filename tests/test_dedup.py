@@ -0,0 +1,61 @@
+from agent.dedup import NearDuplicateIndex
+from agent.kb_search import KnowledgeBaseSearch, normalize_tokens
+from agent.triage_agent import TriageAgent
+
+TICKET = (
+    "Checkout page returns a 500 error when customers pay with a saved card on the mobile app, "
+    "order {order} failed at {time} and the customer was charged twice"
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_near_duplicates_match_and_distinct_tickets_do_not():
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add(normalize_tokens(TICKET.format(order="A-1001", time="10:02")), {"severity": "High"})
+
+    assert index.find(normalize_tokens(TICKET.format(order="A-2044", time="10:05"))) == {"severity": "High"}
+    assert index.find(normalize_tokens("Password reset email never arrives for my account")) is None
+
+
+def test_entries_expire_and_memory_is_bounded():
+    clock = FakeClock()
+    index = NearDuplicateIndex(threshold=0.8, ttl_seconds=60, max_entries=2, clock=clock)
+    for number in range(3):
+        index.add(normalize_tokens(f"ticket number {number} " * 3 + "unique words here"), {"n": number})
+    assert len(index) == 2
+
+    clock.now = 61
+    assert index.find(normalize_tokens("ticket number 2 unique words here")) is None
+    assert len(index) == 0
+
+
+class CountingLLM:
+    provider = "mock"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def classify_ticket(self, description):
+        self.calls += 1
+        return {"summary": "s", "category": "Bug", "severity": "High"}
+
+    def suggest_next_action(self, description, category, severity, related_issues):
+        return "Escalate to backend team"
+
+
+def test_triage_reuses_result_for_near_duplicate_ticket():
+    llm = CountingLLM()
+    agent = TriageAgent(llm, KnowledgeBaseSearch(entries=[]), dedup_index=NearDuplicateIndex(threshold=0.8))
+
+    first = agent.triage(TICKET.format(order="A-1001", time="10:02"))
+    second = agent.triage(TICKET.format(order="A-7777", time="10:04"))
+
+    assert first == second
+    assert llm.calls == 1
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+from agent.kb_search import KnowledgeBaseSearch
+from agent.triage_agent import TriageAgent
+from tests.fakes import groq_assistant
+
+
+def test_classify_normalizes_groq_payload():
+    payload = json.dumps({"summary": "Card declined", "category": "billing", "severity": "HIGH"})
+    assistant = groq_assistant([payload])
+
+    result = assistant.classify_ticket("Card declined at checkout for every customer")
+
+    assert result == {"summary": "Card declined", "category": "Billing", "severity": "High"}
+
+
+def test_classify_async_falls_back_to_rules_on_error():
+    assistant = groq_assistant([RuntimeError("boom")], async_client=True)
+
+    result = asyncio.run(assistant.classify_ticket_async("Major outage: dashboard is down for everyone"))
+
+    assert result["severity"] == "Critical"
+
+
+def test_suggest_next_action_async_trims_quotes():
+    assistant = groq_assistant(['"Refund the duplicate charge."'], async_client=True)
+
+    action = asyncio.run(assistant.suggest_next_action_async("Charged twice", "Billing", "High", []))
+
+    assert action == "Refund the duplicate charge."
+
+
+def test_fused_triage_normalizes_and_fills_missing_fields_from_rules():
+    payload = json.dumps({"summary": "Outage", "category": "bug", "severity": "", "next_step": ""})
+    assistant = groq_assistant([payload])
+    assistant.fused = True
+
+    result = assistant.triage_fused("Major outage: checkout is down for everyone", [])
+
+    assert result["category"] == "Bug"
+    assert result["severity"] == "Critical"  # rules value for the empty field
+    assert result["suggested_next_step"] == "Escalate to backend team"
+    request = assistant._client.chat.completions.calls[0]
+    assert request["response_format"] == {"type": "json_object"}
+
+
+def test_fused_triage_uses_single_call_per_ticket():
+    payload = json.dumps(
+        {"summary": "Card declined", "category": "Billing", "severity": "High", "next_step": "Refund it."}
+    )
+    assistant = groq_assistant([payload])
+    assistant.fused = True
+    kb = KnowledgeBaseSearch(entries=[])
+    agent = TriageAgent(assistant, kb)
+
+    result = agent.triage("Card declined at checkout for all customers")
+
+    assert result["suggested_next_step"] == "Refund it."
+    assert result["severity"] == "High"
+    assert len(assistant._client.chat.completions.calls) == 1
+
+
+def test_warm_up_opens_connections_and_tolerates_failures():
+    from benchmarks.fake_groq import FakeGroqServer
+    from agent.groq_client import GroqAssistant
+
+    with FakeGroqServer() as server:
+        assistant = GroqAssistant(provider="groq", api_key="fake", base_url=server.base_url, timeout=2.0)
+        assert asyncio.run(assistant.warm_up_async()) is True
+
+    # The fake clients have no models endpoint: warm-up reports it, never raises.
+    assert asyncio.run(groq_assistant([]).warm_up_async()) is False
+
+
+def test_stream_next_action_yields_deltas_and_caches():
+    from benchmarks.fake_groq import FakeGroqServer
+    from agent.groq_client import GroqAssistant
+    from agent.response_cache import ResponseCache
+
+    async def collect(assistant):
+        return [delta async for delta in assistant.stream_next_action_async("Checkout down", "Bug", "Critical", [])]
+
+    with FakeGroqServer() as server:
+        assistant = GroqAssistant(
+            provider="groq", api_key="fake", base_url=server.base_url, timeout=2.0, cache=ResponseCache()
+        )
+        deltas = asyncio.run(collect(assistant))
+        assert len(deltas) > 1
+        assert "".join(deltas) == "Attach the matching KB article and follow up with the customer."
+        assert asyncio.run(collect(assistant)) == ["Attach the matching KB article and follow up with the customer."]
+        assert server.requests == 1
+
+    # Failure before the first token falls back to the rules in one delta.
+    failing = groq_assistant([RuntimeError("boom")], async_client=True)
+    assert asyncio.run(collect(failing)) == ["Escalate to backend team"]
@@ -0,0 +1,85 @@
+import sqlite3
+import threading
+import time
+
+from agent.jobs import TriageJobQueue
+
+
+def test_queued_jobs_survive_a_restart(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    seen = []
+
+    producer = TriageJobQueue(path, seen.append, workers=0)
+    job_ids = producer.submit(["first ticket text", "second ticket text"])
+    assert producer.stats()["queued"] == 2
+    producer.close()
+
+    def triage(description):
+        seen.append(description)
+        return {"echo": description}
+
+    consumer = TriageJobQueue(path, triage, workers=1, poll_interval=0.01)
+    assert consumer._claim() == (job_ids[0], "first ticket text")  # FIFO
+    consumer._run(job_ids[0], "first ticket text")
+    assert consumer.get(job_ids[0])["result"] == {"echo": "first ticket text"}
+    assert consumer.get(job_ids[1])["status"] == "queued"
+    consumer.close()
+
+
+def test_expired_leases_are_claimed_again(tmp_path):
+    now = [1000.0]
+    queue = TriageJobQueue(tmp_path / "jobs.sqlite3", lambda text: {}, workers=0, lease_seconds=60, clock=lambda: now[0])
+    (job_id,) = queue.submit(["a ticket that crashed"])
+    assert queue._claim() == (job_id, "a ticket that crashed")
+    assert queue._claim() is None  # still leased
+
+    now[0] += 61
+    assert queue._claim() == (job_id, "a ticket that crashed")
+    queue.close()
+
+
+def test_status_reads_do_not_wait_for_a_blocked_claim(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    queue = TriageJobQueue(path, lambda text: {}, workers=0)
+    (job_id,) = queue.submit(["a ticket waiting for a worker"])
+
+    # Another process holds the write lock, so a claim has to wait for it.
+    other = sqlite3.connect(str(path), isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    claimer = threading.Thread(target=queue._claim)
+    claimer.start()
+    time.sleep(0.1)
+
+    started = time.monotonic()
+    assert queue.get(job_id)["status"] == "queued"
+    assert queue.stats()["queued"] == 1
+    assert time.monotonic() - started < 1.0
+
+    other.execute("COMMIT")
+    claimer.join(5)
+    assert queue.get(job_id)["status"] == "running"
+    other.close()
+    queue.close()
+
+
+def test_worker_survives_a_failed_finish(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    queue = TriageJobQueue(path, lambda text: {"echo": text}, workers=1, poll_interval=0.01)
+    first, second = queue.submit(["first ticket text", "second ticket text"])
+
+    # Recording the first job's result fails like a write error would.
+    other = sqlite3.connect(str(path), isolation_level=None)
+    other.execute(
+        "CREATE TRIGGER fail_finish BEFORE UPDATE OF finished_at ON triage_jobs"
+        f" WHEN OLD.id = '{first}' BEGIN SELECT RAISE(ABORT, 'simulated write error'); END"
+    )
+    other.close()
+    queue.start()
+
+    deadline = time.monotonic() + 5
+    while queue.get(second)["status"] != "done" and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    assert queue.get(second)["result"] == {"echo": "second ticket text"}
+    assert queue.get(first)["status"] == "running"  # reclaimed once the lease expires
+    queue.close()
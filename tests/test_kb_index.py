@@ -0,0 +1,75 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from agent.kb_index import CompiledKBIndex, compile_kb, main
+from agent.kb_search import KnowledgeBaseSearch
+
+KB_PATH = Path(__file__).resolve().parent.parent / "kb" / "kb.json"
+
+
+def test_compiled_index_matches_in_memory_lookups(tmp_path):
+    kb = json.loads(KB_PATH.read_text(encoding="utf-8"))
+    index_path = tmp_path / "kb.idx"
+    stats = compile_kb(kb, index_path)
+    assert stats["entries"] == len(kb)
+
+    in_memory = KnowledgeBaseSearch(entries=kb)
+    compiled = KnowledgeBaseSearch(index_path=index_path)
+    vocabulary = sorted({word for entry in kb for s in entry["symptoms"] for word in s.split()})
+    rng = random.Random(11)
+
+    for _ in range(100):
+        description = " ".join(rng.choices(vocabulary + ["please", "zzz"], k=rng.randint(1, 10)))
+        assert compiled.lookup(description, limit=5) == in_memory.lookup(description, limit=5)
+    assert compiled.lookup_many(["checkout error", "login"]) == in_memory.lookup_many(["checkout error", "login"])
+
+
+def test_compiled_index_decodes_entries(tmp_path):
+    entries = [{"id": "KB1", "title": "Café crash", "category": "Bug", "symptoms": ["crash"], "recommended_action": "Act"}]
+    index_path = tmp_path / "kb.idx"
+    main(["build-index", str(_write(tmp_path, entries)), str(index_path)])
+
+    index = CompiledKBIndex(index_path)
+    assert list(index.entries) == entries
+    assert list(index.postings.get("crash")) == [0]
+    assert index.postings.get("missing") == ()
+
+
+def test_compiled_hits_match_in_memory_hits_for_sparse_entries(tmp_path):
+    entries = [{"symptoms": ["crash"]}, {"id": 7, "category": "Bug", "symptoms": ["crash", "login"]}]
+    index_path = tmp_path / "kb.idx"
+    compile_kb(entries, index_path)
+
+    compiled = KnowledgeBaseSearch(index_path=index_path).lookup("crash login", limit=5)
+
+    assert compiled == KnowledgeBaseSearch(entries=entries).lookup("crash login", limit=5)
+    assert {(hit["id"], hit["title"]) for hit in compiled} == {("UNKNOWN", "Untitled"), ("7", "Untitled")}
+
+
+def test_reload_reopens_compiled_index(tmp_path):
+    index_path = tmp_path / "kb.idx"
+    compile_kb([{"id": "A", "title": "Login", "category": "Login", "symptoms": []}], index_path)
+    search = KnowledgeBaseSearch(index_path=index_path)
+    assert search.lookup("checkout") == []
+
+    compile_kb([{"id": "B", "title": "Checkout", "category": "Billing", "symptoms": []}], index_path)
+    assert search.reload() == {"entries": 1}
+    assert [hit["id"] for hit in search.lookup("checkout")] == ["B"]
+
+
+def test_rejects_foreign_files_and_bm25(tmp_path):
+    bogus = tmp_path / "bogus.idx"
+    bogus.write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        CompiledKBIndex(bogus)
+    with pytest.raises(ValueError):
+        KnowledgeBaseSearch(index_path=bogus, scoring="bm25")
+
+
+def _write(tmp_path, entries):
+    path = tmp_path / "kb.json"
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    return path
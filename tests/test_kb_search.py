@@ -0,0 +1,223 @@
+import json
+import random
+import re
+import threading
+from pathlib import Path
+
+import pytest
+
+from agent.kb_search import KnowledgeBaseSearch
+from agent.kb_shards import ShardedIndexClosed
+
+KB_PATH = Path(__file__).resolve().parent.parent / "kb" / "kb.json"
+
+
+def _reference_lookup(kb, description, limit=3):
+    """Original linear-scan scorer, kept here to pin the ranking semantics."""
+
+    def tokens(text):
+        return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+    desc_tokens = tokens(description)
+    ranked = []
+    for entry in kb:
+        entry_tokens = tokens(entry["title"]) | tokens(entry["category"])
+        for symptom in entry["symptoms"]:
+            entry_tokens |= tokens(symptom)
+        overlap = desc_tokens & entry_tokens
+        base = len(overlap) / len(desc_tokens | entry_tokens) if desc_tokens else 0
+        if base == 0:
+            continue
+        bonus = 0.1 if any(s.strip().lower() in description.lower() for s in entry["symptoms"]) else 0.0
+        ranked.append((entry["id"], round(min(base + bonus, 1.0), 3)))
+    ranked.sort(key=lambda item: item[1], reverse=True)
+    return ranked[:limit]
+
+
+def test_lookup_matches_linear_scan():
+    kb = json.loads(KB_PATH.read_text(encoding="utf-8"))
+    search = KnowledgeBaseSearch(entries=kb)
+    vocabulary = sorted({word for entry in kb for s in entry["symptoms"] for word in s.split()})
+    rng = random.Random(7)
+
+    for _ in range(200):
+        description = " ".join(rng.choices(vocabulary + ["please", "help", "today"], k=rng.randint(1, 12)))
+        for limit in (1, 3, 10):
+            actual = [(hit["id"], hit["similarity"]) for hit in search.lookup(description, limit=limit)]
+            assert actual == _reference_lookup(kb, description, limit)
+
+
+def test_lookup_without_shared_tokens_returns_nothing():
+    search = KnowledgeBaseSearch(entries=[{"id": "KB1", "title": "Login", "category": "Login", "symptoms": []}])
+    assert search.lookup("zzz qqq") == []
+    assert search.lookup("!!!") == []
+
+
+def _entry(entry_id, title, symptoms):
+    return {"id": entry_id, "title": title, "category": "Bug", "symptoms": symptoms, "recommended_action": "Act"}
+
+
+def test_reload_applies_diff_and_swaps_index():
+    search = KnowledgeBaseSearch(
+        entries=[_entry("A", "Checkout error", ["checkout"]), _entry("B", "Login loop", ["login"])]
+    )
+    old_index = search._index
+
+    stats = search.reload(
+        [_entry("A", "Checkout error", ["checkout"]), _entry("C", "Invoice missing", ["invoice"])]
+    )
+
+    assert stats == {"entries": 2, "added": 1, "changed": 0, "unchanged": 1, "removed": 1}
+    assert search._index is not old_index
+    assert search._index.entry_tokens[0] is old_index.entry_tokens[0]
+    assert search.lookup("login loop") == []
+    assert search.lookup("invoice missing")[0]["id"] == "C"
+
+
+def test_reload_if_changed_picks_up_file_edits(tmp_path):
+    kb_file = tmp_path / "kb.json"
+    kb_file.write_text(json.dumps([_entry("A", "Checkout error", ["checkout"])]), encoding="utf-8")
+    search = KnowledgeBaseSearch(kb_path=kb_file)
+    assert search.reload_if_changed() is None
+
+    kb_file.write_text(json.dumps([_entry("A", "Checkout error on mobile", ["checkout", "mobile"])]), encoding="utf-8")
+
+    assert search.reload_if_changed()["changed"] == 1
+    assert search.lookup("mobile checkout")[0]["id"] == "A"
+
+
+def test_bm25_backend_downweights_common_tokens():
+    pytest.importorskip("scipy")
+    entries = [_entry(f"E{n}", f"Generic error number {n}", ["error"]) for n in range(20)]
+    entries.append(_entry("SSO", "SSO error", ["saml assertion"]))
+    search = KnowledgeBaseSearch(entries=entries, scoring="bm25")
+
+    hits = search.lookup("error while validating saml assertion", limit=3)
+
+    assert hits[0]["id"] == "SSO"
+    assert all(0 < hit["similarity"] <= 1 for hit in hits)
+    assert [hit["similarity"] for hit in hits] == sorted((hit["similarity"] for hit in hits), reverse=True)
+
+
+def test_bm25_batch_matches_single_lookups():
+    pytest.importorskip("scipy")
+    kb = json.loads(KB_PATH.read_text(encoding="utf-8"))
+    search = KnowledgeBaseSearch(entries=kb, scoring="bm25")
+    descriptions = ["Checkout 500 error on mobile card", "password reset email not received", "zzz", "slow dashboard"]
+
+    assert search.lookup_many(descriptions, limit=2) == [search.lookup(text, limit=2) for text in descriptions]
+    assert search.lookup("zzz") == []
+
+
+def test_fuzzy_backend_tolerates_typos_and_keeps_exact_scores():
+    pytest.importorskip("scipy")
+    kb = json.loads(KB_PATH.read_text(encoding="utf-8"))
+    fuzzy = KnowledgeBaseSearch(entries=kb, scoring="fuzzy")
+    exact = KnowledgeBaseSearch(entries=kb)
+
+    assert exact.lookup("dashbaord is very slwo") == []
+    assert fuzzy.lookup("dashbaord is very slwo")[0]["id"] == "ISSUE-105"
+    typo = fuzzy.lookup("webhok retires failing")[0]
+    assert typo["id"] == "ISSUE-108" and typo["similarity"] > exact.lookup("webhok retires failing")[0]["similarity"]
+
+    # Descriptions made of KB tokens only score exactly like Jaccard.
+    for text in ["Checkout 500 error on mobile card", "password reset email not received", "zzz"]:
+        assert fuzzy.lookup(text, limit=5) == exact.lookup(text, limit=5)
+
+
+def test_fuzzy_match_does_not_double_count_an_exact_token():
+    pytest.importorskip("scipy")
+    entries = [{"id": "A", "title": "login", "category": "", "symptoms": ["x"]}]
+    fuzzy = KnowledgeBaseSearch(entries=entries, scoring="fuzzy")
+
+    # "loging" is a typo of "login", which the description already contains.
+    assert fuzzy.lookup("login loging") == KnowledgeBaseSearch(entries=entries).lookup("login loging")
+    assert fuzzy.lookup("login loging")[0]["similarity"] == pytest.approx(1 / 3, abs=1e-3)
+
+
+def test_hits_come_from_immutable_records_with_string_fields():
+    from agent.kb_search import HitRecord
+
+    search = KnowledgeBaseSearch(entries=[{"id": 7, "title": "Checkout", "category": "Bug", "symptoms": ["checkout"]}])
+
+    hit = search.lookup("checkout broken")[0]
+    assert hit == {"id": "7", "title": "Checkout", "recommended_action": "", "similarity": hit["similarity"]}
+    with pytest.raises(AttributeError):
+        HitRecord({"id": "A"}).title = "changed"
+
+
+def test_unknown_scoring_backend_is_rejected():
+    with pytest.raises(ValueError):
+        KnowledgeBaseSearch(entries=[], scoring="cosine")
+
+
+@pytest.mark.parametrize("scoring", ["jaccard", "bm25", "fuzzy"])
+def test_sharded_search_matches_single_process(scoring):
+    from benchmarks.generators import generate_kb, generate_tickets
+
+    if scoring != "jaccard":
+        pytest.importorskip("scipy")
+    entries = generate_kb(300, seed=2)
+    # Typos exercise the fuzzy matcher against the whole-KB vocabulary.
+    tickets = list(generate_tickets(60, seed=3)) + ["chekout fials with eror", "pasword resett emial"]
+    single = KnowledgeBaseSearch(entries=entries, scoring=scoring)
+    sharded = KnowledgeBaseSearch(entries=entries, scoring=scoring, shards=3)
+    try:
+        assert sharded.lookup_many(tickets, limit=5) == single.lookup_many(tickets, limit=5)
+        assert sharded.lookup(tickets[0], limit=3) == single.lookup(tickets[0], limit=3)
+
+        new_kb = entries[:100] + [_entry("NEW", "Brand new checkout", ["checkout"])]
+        stats = sharded.reload(new_kb)
+        assert stats["added"] == 1 and stats["removed"] == 200 and stats["unchanged"] == 100
+        assert len(sharded.kb) == 101
+        assert sharded.lookup_many(tickets, limit=5) == KnowledgeBaseSearch(
+            entries=new_kb, scoring=scoring
+        ).lookup_many(tickets, limit=5)
+    finally:
+        sharded.close()
+
+
+def test_sharded_fuzzy_matches_typos_against_the_whole_vocabulary():
+    pytest.importorskip("scipy")
+    # One entry per shard: "logins" is only known to the second shard.
+    entries = [_entry("A", "login", ["password"]), _entry("B", "logins audit", ["export"])]
+    single = KnowledgeBaseSearch(entries=entries, scoring="fuzzy")
+    sharded = KnowledgeBaseSearch(entries=entries, scoring="fuzzy", shards=2)
+    try:
+        for text in ["logins", "loginn password", "loggin export"]:
+            assert sharded.lookup(text, limit=5) == single.lookup(text, limit=5)
+    finally:
+        sharded.close()
+
+
+def test_sharded_lookups_survive_concurrent_reloads():
+    from benchmarks.generators import generate_kb
+
+    entries = generate_kb(60, seed=5)
+    sharded = KnowledgeBaseSearch(entries=entries, shards=2)
+    errors = []
+    stop = threading.Event()
+
+    def query():
+        while not stop.is_set():
+            try:
+                sharded.lookup("checkout fails with 500 error", limit=3)
+            except Exception as exc:  # noqa: BLE001 - collected for the assertion
+                errors.append(exc)
+
+    threads = [threading.Thread(target=query) for _ in range(4)]
+    try:
+        for thread in threads:
+            thread.start()
+        retired = sharded._sharded
+        for _ in range(2):
+            sharded.reload(entries)
+        with pytest.raises(ShardedIndexClosed):
+            retired.lookup("checkout", 3)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(10)
+        sharded.close()
+
+    assert errors == []
@@ -0,0 +1,30 @@
+from agent.metrics import GROQ_FALLBACKS, MetricsRegistry
+from tests.fakes import groq_assistant
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    requests.inc(route="/triage")
+    requests.inc(2, route="/triage")
+    latency.observe(0.05, route="/triage")
+    latency.observe(0.5, route="/triage")
+
+    text = registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/triage"} 3' in text
+    assert 'latency_seconds_bucket{route="/triage",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/triage",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/triage",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{route="/triage"} 2' in text
+
+
+def test_groq_fallback_is_counted():
+    before = GROQ_FALLBACKS.value(operation="classify")
+    assistant = groq_assistant([RuntimeError("boom")])
+
+    assistant.classify_ticket("Checkout is down for every customer")
+
+    assert GROQ_FALLBACKS.value(operation="classify") == before + 1
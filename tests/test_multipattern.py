@@ -0,0 +1,55 @@
+import random
+
+from agent.multipattern import MultiPatternMatcher
+from agent.rules_classifier import RulesClassifier
+
+
+def test_find_matches_substring_checks():
+    rng = random.Random(3)
+    patterns = ["a", "ab", "abc", "bc", "cab", "b c", "ca", "abcab", "c.a"]
+    matcher = MultiPatternMatcher(patterns + [""])
+
+    for _ in range(500):
+        text = "".join(rng.choices("abc .", k=rng.randint(0, 12)))
+        assert matcher.find(text) == {pattern for pattern in patterns if pattern in text}
+
+
+def test_empty_matcher_finds_nothing():
+    assert MultiPatternMatcher([]).find("anything") == set()
+
+
+def _reference_classify(description):
+    lower_text = description.strip().lower()
+    category = next(
+        (
+            category
+            for category, keywords in RulesClassifier.CATEGORY_KEYWORDS.items()
+            if any(keyword in lower_text for keyword in keywords)
+        ),
+        "Other",
+    )
+    severity = next(
+        (
+            severity
+            for severity in ("Critical", "High", "Medium", "Low")
+            if any(keyword in lower_text for keyword in RulesClassifier.SEVERITY_KEYWORDS[severity])
+        ),
+        "Medium",
+    )
+    return category, severity
+
+
+def test_rules_classifier_keeps_precedence():
+    classifier = RulesClassifier()
+    words = [
+        keyword
+        for table in (RulesClassifier.CATEGORY_KEYWORDS, RulesClassifier.SEVERITY_KEYWORDS)
+        for keywords in table.values()
+        for keyword in keywords
+    ] + ["please", "TODAY", "the", "app"]
+    rng = random.Random(11)
+
+    for _ in range(500):
+        description = " ".join(rng.choices(words, k=rng.randint(0, 6)))
+        result = classifier.classify(description)
+        assert (result["category"], result["severity"]) == _reference_classify(description)
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from agent.profiling import StackProfiler
+from app.config import Settings
+
+
+def _busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profiler_samples_only_while_a_request_is_active():
+    profiler = StackProfiler(interval=0.001)
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy")
+    worker.start()
+    try:
+        time.sleep(0.05)
+        assert profiler.collapsed() == ""  # nothing sampled outside profile()
+        with profiler.profile("header"):
+            time.sleep(0.1)
+    finally:
+        stop.set()
+        worker.join()
+
+    lines = profiler.collapsed().splitlines()
+    busy = [line for line in lines if line.startswith("busy;")]
+    assert busy and all("_busy_loop" in line for line in busy)
+    stack, count = busy[0].rsplit(" ", 1)
+    assert int(count) > 0 and stack.endswith("test_profiling.py:_busy_loop")
+    assert profiler.stats()["profiled_requests"] == 1
+
+
+def test_profiler_window_drops_old_buckets():
+    clock = [100.0]
+    profiler = StackProfiler(window_seconds=30, bucket_seconds=10, clock=lambda: clock[0])
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy")
+    worker.start()
+    try:
+        profiler.sample()
+    finally:
+        stop.set()
+        worker.join()
+    assert profiler.collapsed()
+
+    clock[0] = 145.0
+    assert profiler.collapsed() == ""
+
+
+def test_profile_trigger_honours_header_token_and_sample_rate():
+    from app.main import profile_trigger
+
+    settings = Settings(profiling_sample_rate=0.5, profiling_token="s3cret")
+
+    assert profile_trigger("/health", {"X-Triage-Profile": "s3cret"}, settings) == "header"
+    assert profile_trigger("/health", {"X-Triage-Profile": "guess"}, settings) is None
+    assert profile_trigger("/triage", {}, settings, draw=lambda: 0.1) == "sample"
+    assert profile_trigger("/triage", {}, settings, draw=lambda: 0.9) is None
+    assert profile_trigger("/health", {}, settings, draw=lambda: 0.0) is None
+
+
+def test_profile_header_is_ignored_without_a_token():
+    from app.main import profile_trigger
+
+    settings = Settings(profiling_sample_rate=0.0, profiling_token=None)
+
+    assert profile_trigger("/triage", {"X-Triage-Profile": "1"}, settings, draw=lambda: 0.5) is None
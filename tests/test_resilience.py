@@ -0,0 +1,139 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from agent.groq_client import GroqAssistant
+from agent.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from benchmarks.fake_groq import FakeGroqServer
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_then_recovers_through_half_open_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(name="test", failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow_request()
+
+    clock.now = 10
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request() and not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now = 20
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow_request()
+
+
+@pytest.fixture
+def slow_groq():
+    with FakeGroqServer(latency=0.5) as server:
+        yield server
+
+
+def _assistant(server: FakeGroqServer, **kwargs) -> GroqAssistant:
+    return GroqAssistant(provider="groq", api_key="fake", base_url=server.base_url, **kwargs)
+
+
+def test_timeout_falls_back_within_budget_and_breaker_short_circuits(slow_groq):
+    breaker = CircuitBreaker(name="groq-test", failure_threshold=2, reset_timeout=60)
+    assistant = _assistant(slow_groq, timeout=0.1, breaker=breaker)
+
+    started = time.perf_counter()
+    for _ in range(2):
+        result = assistant.classify_ticket("Major outage: the dashboard is down")
+        assert result["severity"] == "Critical"  # rules fallback
+    assert time.perf_counter() - started < 0.9
+    assert breaker.state == OPEN
+
+    calls_before = slow_groq.requests
+    assistant.classify_ticket("Major outage: the dashboard is down")
+    assert slow_groq.requests == calls_before
+
+
+def test_hedged_request_wins_over_slow_first_attempt():
+    with FakeGroqServer() as server:
+        delays = [0.6, 0.0]
+        original = server.respond
+
+        def respond(body):
+            time.sleep(delays.pop(0) if delays else 0.0)
+            return original(body)
+
+        server.respond = respond  # type: ignore[assignment]
+        assistant = _assistant(server, timeout=2.0, hedge_delay=0.05)
+
+        started = time.perf_counter()
+        action = asyncio.run(assistant.suggest_next_action_async("Checkout broken", "Bug", "High", []))
+        elapsed = time.perf_counter() - started
+
+    assert action.startswith("Attach the matching KB article")
+    assert elapsed < 0.5
+    assert delays == []  # the hedge was sent
+
+
+class HangingCompletions:
+    """Async Groq completions that never answer, so the caller has to cancel."""
+
+    def __init__(self) -> None:
+        self.started = asyncio.Event()
+
+    async def create(self, **kwargs):
+        self.started.set()
+        await asyncio.Event().wait()
+
+
+def _half_open_assistant(completions: HangingCompletions):
+    clock = FakeClock()
+    breaker = CircuitBreaker(name="cancel-test", failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assistant = GroqAssistant(provider="groq", api_key="test-key", breaker=breaker)
+    assistant._async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return assistant, breaker
+
+
+def test_cancelled_half_open_probe_releases_its_slot():
+    completions = HangingCompletions()
+    assistant, breaker = _half_open_assistant(completions)
+
+    async def cancel_probe():
+        probe = asyncio.ensure_future(assistant.classify_ticket_async("Checkout keeps failing with 500 error"))
+        await completions.started.wait()
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+    asyncio.run(cancel_probe())
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_abandoned_half_open_stream_releases_its_slot():
+    completions = HangingCompletions()
+    assistant, breaker = _half_open_assistant(completions)
+
+    async def abandon_stream():
+        stream = assistant.stream_next_action_async("Checkout keeps failing", "Bug", "High", [])
+        reader = asyncio.ensure_future(stream.__anext__())
+        await completions.started.wait()
+        reader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await reader
+        await stream.aclose()
+
+    asyncio.run(abandon_stream())
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
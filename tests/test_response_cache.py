@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+from agent.response_cache import ResponseCache
+from tests.fakes import groq_assistant
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(ttl_seconds=10, clock=clock)
+    cache.set("key", {"severity": "High"})
+
+    clock.now += 9
+    assert cache.get("key") == {"severity": "High"}
+    clock.now += 2
+    assert cache.get("key") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "disk_hits": 0, "evictions": 0, "size": 0}
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    path = tmp_path / "llm_cache.sqlite"
+    ResponseCache(sqlite_path=path).set("key", "Refund the charge")
+
+    reopened = ResponseCache(sqlite_path=path)
+
+    assert reopened.get("key") == "Refund the charge"
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_groq_classification_is_cached_by_normalized_description():
+    payload = json.dumps({"summary": "Outage", "category": "Bug", "severity": "Critical"})
+    assistant = groq_assistant([payload])
+    assistant.cache = ResponseCache()
+
+    first = assistant.classify_ticket("Site is DOWN for all users")
+    second = assistant.classify_ticket("  site is down   for all users ")
+
+    assert first == second
+    assert len(assistant._client.chat.completions.calls) == 1
+    assert assistant.cache.stats()["hits"] == 1
+
+
+def test_groq_fallbacks_are_not_cached():
+    assistant = groq_assistant([RuntimeError("boom"), RuntimeError("boom")])
+    assistant.cache = ResponseCache()
+
+    assistant.classify_ticket("Site is down for all users")
+    assistant.classify_ticket("Site is down for all users")
+
+    assert len(assistant._client.chat.completions.calls) == 2
+    assert assistant.cache.stats()["size"] == 0
+
+
+def test_sqlite_hit_keeps_stored_expiry(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "llm_cache.sqlite"
+    ResponseCache(ttl_seconds=10, sqlite_path=path, clock=clock).set("key", "cached")
+
+    clock.now += 8
+    reopened = ResponseCache(ttl_seconds=10, sqlite_path=path, clock=clock)
+    assert reopened.get("key") == "cached"
+    clock.now += 3
+    assert reopened.get("key") is None
+
+
+def test_sqlite_tier_is_capped(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "llm_cache.sqlite"
+    cache = ResponseCache(sqlite_path=path, clock=clock, max_disk_entries=3)
+    for number in range(6):
+        clock.now += 1
+        cache.set(f"key-{number}", number)
+
+    reopened = ResponseCache(max_entries=1, sqlite_path=path, clock=clock, max_disk_entries=3)
+
+    assert reopened._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] == 3
+    assert [reopened.get(f"key-{number}") for number in range(6)] == [None, None, None, 3, 4, 5]
+
+
+def test_async_access_uses_sqlite_tier(tmp_path):
+    path = tmp_path / "llm_cache.sqlite"
+    asyncio.run(ResponseCache(sqlite_path=path).aset("key", {"severity": "High"}))
+
+    reopened = ResponseCache(sqlite_path=path)
+
+    assert asyncio.run(reopened.aget("key")) == {"severity": "High"}
+    assert asyncio.run(reopened.aget("missing")) is None
+    assert reopened.stats()["disk_hits"] == 1
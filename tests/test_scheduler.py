@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+
+from agent.scheduler import GroqScheduler, TokenBucket
+from tests.fakes import groq_assistant
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_refills_at_rate_up_to_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=4.0, clock=clock)
+    bucket.take(4.0)
+    assert bucket.wait_time(1.0) == 0.5
+
+    clock.now = 1.0
+    assert bucket.available() == 2.0
+    clock.now = 10.0
+    assert bucket.available() == 4.0
+    assert bucket.wait_time(100.0) == 0.0  # oversized requests only need a full bucket
+
+
+def _drained(**kwargs) -> GroqScheduler:
+    scheduler = GroqScheduler(requests_per_minute=300, **kwargs)  # 5 per second, burst of 5
+    for _ in range(5):
+        assert scheduler.acquire("Critical")
+    return scheduler
+
+
+def _wait_for_queue(scheduler: GroqScheduler, depth: int) -> None:
+    deadline = time.monotonic() + 2
+    while scheduler.queued < depth and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_critical_work_is_admitted_before_earlier_low_work():
+    scheduler = _drained(max_wait={"Low": 2.0})
+    admitted = []
+
+    def call(severity):
+        if scheduler.acquire(severity):
+            admitted.append(severity)
+
+    low = threading.Thread(target=call, args=("Low",))
+    low.start()
+    _wait_for_queue(scheduler, 1)
+    critical = threading.Thread(target=call, args=("Critical",))
+    critical.start()
+    for thread in (low, critical):
+        thread.join()
+    assert admitted == ["Critical", "Low"]
+
+
+def test_saturated_queue_sheds_low_priority_and_waits_are_bounded():
+    scheduler = _drained(max_queue=1, max_wait={"High": 1.0, "Low": 0.05})
+    waiting = threading.Thread(target=scheduler.acquire, args=("High",))
+    waiting.start()
+    _wait_for_queue(scheduler, 1)
+
+    started = time.monotonic()
+    assert scheduler.acquire("Low") is False
+    assert time.monotonic() - started < 0.02  # shed without queueing
+    waiting.join()
+
+    assert scheduler.acquire("Low") is False  # empty bucket, 50ms budget
+    assert scheduler.queued == 0
+
+
+def test_async_acquire_orders_by_severity():
+    async def scenario():
+        scheduler = _drained(max_wait={"Low": 2.0, "Medium": 2.0})
+        order = []
+
+        async def call(severity):
+            if await scheduler.acquire_async(severity):
+                order.append(severity)
+
+        tasks = [asyncio.ensure_future(call(severity)) for severity in ("Low", "Medium", "Critical")]
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["Critical", "Medium", "Low"]
+
+
+def test_assistant_falls_back_to_rules_when_not_admitted():
+    assistant = groq_assistant(['{"summary": "x", "category": "Bug", "severity": "Low"}'])
+    assistant.scheduler = GroqScheduler(requests_per_minute=60, max_queue=0)
+
+    result = assistant.classify_ticket("How do I export my invoices as CSV?")
+
+    assert result == assistant.rules_fallback.classify("How do I export my invoices as CSV?")
+    assert assistant._client.chat.completions.calls == []
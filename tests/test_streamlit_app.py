@@ -0,0 +1,67 @@
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+from ui import streamlit_app  # noqa: E402
+from ui.streamlit_app import BulkTriageJob, load_tickets  # noqa: E402
+
+
+def test_load_tickets_reads_csv_jsonl_and_json_arrays():
+    rows = [{"id": "T1", "text": "Checkout fails with 500 error"}, {"text": "Password reset email missing"}]
+    expected = [
+        {"id": "T1", "description": "Checkout fails with 500 error"},
+        {"id": 2, "description": "Password reset email missing"},
+    ]
+    csv_data = "id,text\nT1,Checkout fails with 500 error\n,Password reset email missing\n"
+    jsonl_data = "\n".join(json.dumps(row) for row in rows) + "\n"
+
+    assert load_tickets("export.csv", csv_data.encode(), "text") == expected
+    assert load_tickets("export.jsonl", jsonl_data.encode(), "text") == expected
+    assert load_tickets("export.json", json.dumps(rows, indent=2).encode(), "text") == expected
+    with pytest.raises(ValueError):
+        load_tickets("export.json", b'{"text": "not an array"}', "text")
+
+
+def test_bulk_job_triages_every_ticket_and_exports_results():
+    tickets = [
+        {"id": "T1", "description": "Checkout fails with 500 error on card payments"},
+        {"id": "T2", "description": None},
+        {"id": "T3", "description": "short"},
+    ]
+
+    job = BulkTriageJob(tickets, workers=2).start()
+    job._pool.shutdown(wait=True)
+
+    assert job.done and job.completed == 3
+    frame = job.frame()
+    assert list(frame["id"]) == ["T1", "T2", "T3"]
+    assert frame.loc[0, "category"] == "Billing" and frame.loc[0, "error"] is None
+    assert list(frame["error"][1:]) == ["Missing ticket description", "Description must be at least 10 characters long"]
+    assert [json.loads(line)["id"] for line in job.jsonl().splitlines()] == ["T1", "T2", "T3"]
+
+
+def test_cancel_waits_for_running_tickets_before_finishing(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_triage(description):
+        started.set()
+        release.wait(5)
+        return {"category": "Bug"}
+
+    monkeypatch.setattr(streamlit_app, "triage_cached", slow_triage)
+    tickets = [{"id": f"T{number}", "description": "Checkout fails with 500 error"} for number in range(3)]
+    job = BulkTriageJob(tickets, workers=1).start()
+    assert started.wait(5)
+
+    canceller = threading.Thread(target=job.cancel)
+    canceller.start()
+    canceller.join(0.1)
+    assert not job.done  # the first ticket is still running
+
+    release.set()
+    canceller.join(5)
+    assert job.done and job.completed == 1
+    assert job.results == [{"category": "Bug"}, None, None]
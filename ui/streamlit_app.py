@@ -1,40 +1,153 @@
+import csv
+import io
+import json
 import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
+from typing import Dict, List, Optional
 
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+import pandas as pd
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 from app.config import get_settings
-from agent.groq_client import GroqAssistant
-from agent.kb_search import KnowledgeBaseSearch
+from app.factory import build_agent
 from agent.triage_agent import TriageAgent
 
+RESULT_COLUMNS = ["summary", "category", "severity", "known_issue", "suggested_next_step"]
+
 
 @st.cache_resource(show_spinner=False)
 def get_agent() -> TriageAgent:
-    settings = get_settings()
-    llm_client = GroqAssistant(
-        provider=settings.llm_provider,
-        api_key=settings.groq_api_key,
-        match_threshold=settings.kb_similarity_threshold,
-    )
-    kb = KnowledgeBaseSearch(kb_path=settings.kb_path)
-    return TriageAgent(
-        llm_client=llm_client,
-        kb_search=kb,
-        match_threshold=settings.kb_similarity_threshold,
-        max_related=settings.max_related_results,
-    )
+    return build_agent(get_settings())
 
 
-def main() -> None:
-    st.set_page_config(page_title="Support Triage Agent")
-    st.title("Support Ticket Triage")
-    st.write("Enter a support description to identify likely category, severity, and next steps.")
+@st.cache_data(show_spinner=False, max_entries=100_000)
+def triage_cached(description: str) -> Dict[str, object]:
+    """Per-ticket result cache, so re-running an export only triages new tickets."""
+    return get_agent().triage(description)
+
+
+def load_tickets(name: str, data: bytes, field: str) -> List[Dict[str, object]]:
+    """Read ``{"id", "description"}`` rows from an uploaded CSV, JSON array or JSONL file."""
+    text = data.decode("utf-8-sig")
+    suffix = name.lower().rsplit(".", 1)[-1]
+    if suffix == "csv":
+        rows: List[object] = list(csv.DictReader(io.StringIO(text)))
+    elif suffix == "json":
+        rows = json.loads(text)
+        if not isinstance(rows, list):
+            raise ValueError("expected a JSON array of tickets")
+    else:
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    tickets = []
+    for number, row in enumerate(rows, start=1):
+        record = row if isinstance(row, dict) else {field: row}
+        tickets.append({"id": record.get("id") or number, "description": record.get(field)})
+    return tickets
+
+
+class BulkTriageJob:
+    """Triage uploaded tickets on a thread pool while the page keeps rendering."""
+
+    def __init__(self, tickets: List[Dict[str, object]], workers: int) -> None:
+        self.tickets = tickets
+        self.results: List[Optional[Dict[str, object]]] = [None] * len(tickets)
+        self.errors: List[Optional[str]] = [None] * len(tickets)
+        self.completed = 0
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+        # Worker threads share the session's script context so st.cache_data
+        # stores their results like any call made from the script itself.
+        ctx = get_script_run_ctx()
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="ui-bulk",
+            initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx),
+        )
+        self._futures: List[Future] = []
+        self._exports: Dict[str, object] = {}
+
+    def start(self) -> "BulkTriageJob":
+        if not self.tickets:
+            self.finished = self.started
+        for position, ticket in enumerate(self.tickets):
+            self._futures.append(self._pool.submit(self._run, position, ticket["description"]))
+        self._pool.shutdown(wait=False)
+        return self
+
+    def cancel(self) -> None:
+        """Drop queued tickets and wait for the running ones, so exports see final results."""
+        for future in self._futures:
+            future.cancel()
+        wait(self._futures)
+        with self._lock:
+            self.finished = self.finished or time.perf_counter()
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def throughput(self) -> float:
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    # Exports are only requested once the job is done, so they are built once.
+    def frame(self) -> pd.DataFrame:
+        if "frame" not in self._exports:
+            self._exports["frame"] = self._build_frame()
+        return self._exports["frame"]  # type: ignore[return-value]
+
+    def jsonl(self) -> str:
+        if "jsonl" not in self._exports:
+            self._exports["jsonl"] = self._build_jsonl()
+        return self._exports["jsonl"]  # type: ignore[return-value]
+
+    def _build_frame(self) -> pd.DataFrame:
+        rows = []
+        for ticket, result, error in zip(self.tickets, self.results, self.errors):
+            row: Dict[str, object] = {"id": ticket["id"], "description": ticket["description"]}
+            row.update({column: (result or {}).get(column) for column in RESULT_COLUMNS})
+            related = (result or {}).get("related_issues") or []
+            row["top_related_issue"] = related[0]["id"] if related else None  # type: ignore[index]
+            row["error"] = error
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def _build_jsonl(self) -> str:
+        lines = [
+            json.dumps({"id": ticket["id"], "result": result, "error": error}, ensure_ascii=False, default=str)
+            for ticket, result, error in zip(self.tickets, self.results, self.errors)
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _run(self, position: int, description: object) -> None:
+        try:
+            if not isinstance(description, str):
+                raise ValueError("Missing ticket description")
+            self.results[position] = triage_cached(description)
+        except ValueError as exc:
+            self.errors[position] = str(exc)
+        except Exception:  # noqa: BLE001 - one bad ticket must not stop the run
+            self.errors[position] = "Triage failed"
+        with self._lock:
+            self.completed += 1
+            if self.completed == len(self.tickets) and self.finished is None:
+                self.finished = time.perf_counter()
 
+
+def single_ticket() -> None:
     description = st.text_area("Ticket description", height=160)
     if st.button("Run triage"):
         if len(description.strip()) < 10:
@@ -59,5 +172,79 @@ def main() -> None:
             st.info("No related KB entries found.")
 
 
+def bulk_upload() -> None:
+    upload = st.file_uploader("Ticket export (CSV, JSON or JSONL)", type=["csv", "jsonl", "json"])
+    field = st.text_input("Description column / field", value="description")
+    workers = st.slider("Parallel workers", min_value=1, max_value=32, value=8)
+
+    job: Optional[BulkTriageJob] = st.session_state.get("bulk_job")
+    if upload is not None and st.button("Start bulk triage", disabled=job is not None and not job.done):
+        try:
+            tickets = load_tickets(upload.name, upload.getvalue(), field)
+        except (ValueError, UnicodeDecodeError) as exc:
+            st.error(f"Could not read {upload.name}: {exc}")
+            return
+        get_agent()  # build once here rather than racing in the workers
+        job = st.session_state["bulk_job"] = BulkTriageJob(tickets, workers).start()
+
+    if job is not None:
+        bulk_progress()
+        if job.done:
+            bulk_results(job)
+
+
+@st.fragment(run_every=1.0)
+def bulk_progress() -> None:
+    """Refreshes on its own every second; the rest of the page stays interactive."""
+    job: BulkTriageJob = st.session_state["bulk_job"]
+    total = len(job.tickets)
+    st.progress(job.completed / total if total else 1.0, text=f"{job.completed} / {total} tickets")
+    st.caption(f"{job.throughput:.1f} tickets/s · {job.elapsed:.1f}s elapsed")
+    if not job.done:
+        if st.button("Cancel"):
+            job.cancel()
+            st.rerun()
+    elif st.session_state.get("bulk_rendered") is not job:
+        # Re-run the whole page once so the results section appears.
+        st.session_state["bulk_rendered"] = job
+        st.rerun()
+
+
+def bulk_results(job: BulkTriageJob) -> None:
+    frame = job.frame()
+    triaged = frame[frame["error"].isna() & frame["category"].notna()]
+    st.subheader("Results")
+    st.write(f"{len(triaged)} triaged, {int(frame['error'].notna().sum())} errors.")
+
+    by_category, by_severity = st.columns(2)
+    with by_category:
+        st.caption("By category")
+        st.bar_chart(triaged["category"].value_counts())
+    with by_severity:
+        st.caption("By severity")
+        st.bar_chart(triaged["severity"].value_counts().reindex(["Critical", "High", "Medium", "Low"], fill_value=0))
+
+    st.dataframe(frame, use_container_width=True, hide_index=True)
+    csv_column, jsonl_column = st.columns(2)
+    csv_column.download_button(
+        "Download CSV", frame.to_csv(index=False), file_name="triage_results.csv", mime="text/csv"
+    )
+    jsonl_column.download_button(
+        "Download JSONL", job.jsonl(), file_name="triage_results.jsonl", mime="application/jsonl"
+    )
+
+
+def main() -> None:
+    st.set_page_config(page_title="Support Triage Agent")
+    st.title("Support Ticket Triage")
+    st.write("Enter a support description to identify likely category, severity, and next steps.")
+
+    mode = st.radio("Mode", ["Single ticket", "Bulk upload"], horizontal=True, label_visibility="collapsed")
+    if mode == "Bulk upload":
+        bulk_upload()
+    else:
+        single_ticket()
+
+
 if __name__ == "__main__":
     main()